@@ -1,12 +1,30 @@
 #!/usr/bin/env python3
 """
 Analyze batch simulation results: tables, heatmaps, and summary graphs.
+
+Incremental: every section of RESULTS_SUMMARY.md (overall table, one per
+case, cross-case comparison, paired differences, per-game distributions)
+is fingerprinted from the rows it is built from. Unchanged sections reuse
+their cached markdown fragment and charts (analysis_outputs/.cache); the
+charts of changed sections are rendered in a process pool (Agg backend).
+
+Win rates come with 95% intervals: Wilson / normal analytic intervals and
+a vectorized bootstrap over the games of every cell (src/simulation/
+intervals.py), shown in the tables and as error bars; strategies are
+compared pairwise with bootstrap and z tests.
 """
+import hashlib
+import io
+import json
+import multiprocessing
 import os
 import sys
 import re
+import argparse
 try:
     import pandas as pd
+    import matplotlib
+    matplotlib.use('Agg')
     import matplotlib.pyplot as plt
     import seaborn as sns
 except ImportError as e:
@@ -16,11 +34,336 @@ except ImportError as e:
     print("Please install analysis dependencies with: pip install -r requirements.txt")
     sys.exit(1)
 
+# Ensure src package is importable (per-game results store)
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from src.simulation.intervals import (
+    Z95, bootstrap_win_rates, group_means, mean_se, pairwise_tests, percentile_interval, wilson_interval
+)
+
 def safe_filename(s: str) -> str:
     """Convert a string to a filesystem-safe filename."""
     return re.sub(r'[^A-Za-z0-9]+', '_', s).strip('_')
 
+def write_per_game_analysis(md, store, outdir: str) -> list:
+    """Distributions from the columnar per-game store; only the needed columns are mapped."""
+    if not len(store):
+        return []
+    games = store.to_dataframe(['case', 'strategy1', 'strategy2', 'winner', 'steps'])
+    md.write('## Per-game Distributions\n\n')
+    md.write(f'{len(games):,} games loaded from `{store.directory}/`.\n\n')
+    grouped = games.groupby(['case', 'strategy1', 'strategy2'], observed=True)
+    table = grouped.agg(
+        games=('winner', 'size'),
+        win_rate1=('winner', lambda w: (w == 1).mean()),
+        draw_rate=('winner', lambda w: (w == 0).mean()),
+        steps_mean=('steps', 'mean'),
+        steps_median=('steps', 'median'),
+        steps_p95=('steps', lambda s: s.quantile(0.95)),
+        steps_max=('steps', 'max'),
+    )
+    md.write(table.to_markdown(floatfmt='.3f') + '\n\n')
+
+    # Game length distribution per case
+    steps = {case: rows.to_numpy() for case, rows in games.groupby('case', observed=True)['steps']}
+    md.write('![Game Length Distribution](game_length_distribution.png)\n\n')
+    return [('histogram', steps, os.path.join(outdir, 'game_length_distribution.png'))]
+
+def write_paired_differences(md, paired) -> None:
+    """Paired-difference estimates from a common-random-numbers batch run."""
+    md.write('## Paired Differences (Common Random Numbers)\n\n')
+    md.write('Win rate of strategy A minus strategy B against the same opponent, '
+             'estimated game by game on shared food streams. `se_unpaired` is what '
+             'the same data would give if the cells were treated as independent.\n\n')
+    paired = paired.copy()
+    paired['ci95'] = paired.apply(
+        lambda r: f"{r['diff']:+.3f} ± {1.96 * r['se_paired']:.3f}", axis=1)
+    paired['se_ratio'] = paired['se_unpaired'] / paired['se_paired']
+    for case, rows in paired.groupby('case', sort=False):
+        md.write(f'### {case}\n\n')
+        table = rows[['opponent', 'strategy_a', 'strategy_b', 'runs', 'diff', 'ci95',
+                      'se_paired', 'se_unpaired', 'se_ratio']]
+        md.write(table.to_markdown(index=False, floatfmt='.4f') + '\n\n')
+
+# --- Charts (rendered in worker processes) ------------------------------------
+
+def render_bar(values, errors, path: str) -> None:
+    fig, ax = plt.subplots(figsize=(6, 4))
+    values.plot.bar(ax=ax, color='skyblue')
+    # Intervalles bootstrap à 95 % (asymétriques)
+    ax.errorbar(range(len(values)), values, yerr=errors, fmt='none', ecolor='black', capsize=4)
+    ax.set_ylabel('Average Win Rate')
+    ax.set_ylim(0, 1)
+    ax.set_title('Overall Average Win Rate per Strategy')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+def render_heatmap(pivot, annotations, case: str, path: str) -> None:
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.heatmap(pivot, annot=annotations, fmt='', cmap='viridis', ax=ax)
+    ax.set_title(f'Win Rate Heatmap: {case}')
+    plt.yticks(rotation=0)
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+def render_lines(case_pivot, low, high, path: str) -> None:
+    fig, ax = plt.subplots(figsize=(10, 6))
+    positions = range(len(case_pivot.index))
+    for k, strategy in enumerate(case_pivot.columns):
+        # Léger décalage horizontal pour que les barres d'erreur ne se superposent pas
+        x = [position + 0.04 * (k - (len(case_pivot.columns) - 1) / 2) for position in positions]
+        values = case_pivot[strategy]
+        ax.errorbar(x, values, yerr=[values - low[strategy], high[strategy] - values],
+                    marker='o', capsize=3, label=strategy)
+    ax.set_xticks(list(positions))
+    ax.set_xticklabels(case_pivot.index)
+    ax.set_xlabel(case_pivot.index.name)
+    ax.legend(title=case_pivot.columns.name)
+    ax.set_ylabel('Average Win Rate')
+    ax.set_title('Strategy Win Rate Across Cases')
+    ax.set_ylim(0, 1)
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+def render_histogram(steps_by_case, path: str) -> None:
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for case, steps in steps_by_case.items():
+        ax.hist(steps, bins=100, histtype='step', log=True, label=case)
+    ax.set_xlabel('Steps per game')
+    ax.set_ylabel('Games (log)')
+    ax.set_title('Game Length Distribution')
+    ax.legend()
+    plt.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+RENDERERS = {'bar': render_bar, 'heatmap': render_heatmap, 'lines': render_lines,
+             'histogram': render_histogram}
+
+def init_renderer() -> None:
+    """Pool initializer: headless backend and the report style in every worker."""
+    matplotlib.use('Agg')
+    sns.set(style='whitegrid')
+
+def render_chart(job) -> str:
+    kind, *args = job
+    RENDERERS[kind](*args)
+    return args[-1]
+
+def render_charts(jobs, processes=None) -> None:
+    """Render chart jobs (kind, *args, path), in a process pool when there are several."""
+    if len(jobs) <= 1 or processes == 1:
+        init_renderer()
+        for job in jobs:
+            render_chart(job)
+        return
+    with multiprocessing.Pool(min(processes or os.cpu_count() or 1, len(jobs)), init_renderer) as pool:
+        for _ in pool.imap_unordered(render_chart, jobs):
+            pass
+
+# --- Incremental cache ----------------------------------------------------------
+
+CACHE_VERSION = 4   # à incrémenter quand le contenu d'un fragment ou d'un graphique change
+
+def fingerprint(*parts) -> str:
+    digest = hashlib.sha256(f'v{CACHE_VERSION}'.encode())
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+def frame_fingerprint(frame) -> str:
+    return fingerprint(frame.to_csv(index=False))
+
+class FragmentCache:
+    """Markdown fragment, input fingerprint and chart files of every section, in outdir/.cache."""
+
+    def __init__(self, outdir: str, force: bool = False):
+        self.outdir = outdir
+        self.directory = os.path.join(outdir, '.cache')
+        self.manifest_path = os.path.join(self.directory, 'manifest.json')
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest = {}
+        if not force and os.path.isfile(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        self.used = {}
+
+    def _fragment_path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{safe_filename(key)}.md')
+
+    def get(self, key: str, digest: str):
+        """Cached fragment if its inputs are unchanged and its charts still exist, else None."""
+        entry = self.manifest.get(key)
+        if not entry or entry['fingerprint'] != digest:
+            return None
+        if not all(os.path.isfile(os.path.join(self.outdir, name)) for name in entry['charts']):
+            return None
+        path = self._fragment_path(key)
+        if not os.path.isfile(path):
+            return None
+        self.used[key] = entry
+        with open(path) as f:
+            return f.read()
+
+    def put(self, key: str, digest: str, text: str, charts) -> None:
+        with open(self._fragment_path(key), 'w') as f:
+            f.write(text)
+        self.used[key] = {'fingerprint': digest, 'charts': sorted(charts)}
+
+    def save(self) -> None:
+        """Keep the sections of this run; charts of vanished sections are removed."""
+        kept = {name for entry in self.used.values() for name in entry['charts']}
+        for key, entry in self.manifest.items():
+            if key in self.used:
+                continue
+            for name in entry['charts']:
+                if name not in kept and os.path.isfile(os.path.join(self.outdir, name)):
+                    os.remove(os.path.join(self.outdir, name))
+            if os.path.isfile(self._fragment_path(key)):
+                os.remove(self._fragment_path(key))
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.used, f, indent=1)
+
+# --- Sections -------------------------------------------------------------------
+
+def format_interval(low: float, high: float) -> str:
+    return f"[{low:.3f}, {high:.3f}]"
+
+def format_p(p: float, floor: float = 1e-4, attainable: bool = False) -> str:
+    """
+    p-value, or '<floor' below it. With attainable=True the floor is the
+    smallest p-value the test can give (1 / (resamples + 1) for the
+    bootstrap), which is reached, so it reads '≤floor'.
+    """
+    if attainable:
+        # 1 / (B + 1) exactement, à l'arrondi flottant près
+        return f"{p:.4f}" if p > floor * (1 + 1e-9) else f"≤{floor:.1e}"
+    return f"{p:.4f}" if p >= floor else f"<{floor:.1e}"
+
+def overall_section(df, outdir: str, resamples: int, seed: int):
+    md = io.StringIO()
+    # Overall average win rate per strategy across all cases and opponents
+    md.write('## Overall Average Win Rate per Strategy\n\n')
+    overall = df.groupby('strategy1')['win_rate1'].mean().rename('avg_win_rate')
+    samples = bootstrap_win_rates(df['wins1'], df['runs'], resamples, seed)
+    labels, boot = group_means(samples, df['strategy1'])
+    overall = overall.reindex(labels)
+    se = mean_se(df['win_rate1'], df['runs'], df['strategy1'])
+    low, high = percentile_interval(boot)
+    table = pd.DataFrame({
+        'avg_win_rate': overall,
+        'ci95': [format_interval(value - Z95 * se[name], value + Z95 * se[name])
+                 for name, value in overall.items()],
+        'bootstrap_ci95': [format_interval(lo, hi) for lo, hi in zip(low, high)],
+    }, index=overall.index)
+    md.write(table.to_markdown() + '\n\n')
+    md.write(f'`ci95`: normal approximation; `bootstrap_ci95`: percentile interval of {resamples:,} '
+             'resamples of the games of every cell.\n\n')
+    md.write('![Overall Win Rate](overall_avg_win_rate.png)\n\n')
+
+    # Comparaisons deux à deux des moyennes (mêmes rééchantillonnages)
+    tests = pairwise_tests(list(labels), overall.to_numpy(), boot, se)
+    if tests:
+        md.write('### Pairwise Differences\n\n')
+        md.write('Difference of overall average win rates (A − B) with its bootstrap interval; '
+                 '`p_bootstrap` recentres the resampled differences on zero, `p_z` is the normal '
+                 f'test and `p_holm` the bootstrap p-value adjusted for {len(tests)} comparisons.\n\n')
+        tests_table = pd.DataFrame([{
+            'strategy_a': row['strategy_a'],
+            'strategy_b': row['strategy_b'],
+            'diff': f"{row['diff']:+.3f}",
+            'bootstrap_ci95': format_interval(row['ci_low'], row['ci_high']),
+            'p_bootstrap': format_p(row['p_bootstrap'], 1 / (resamples + 1), attainable=True),
+            'p_z': format_p(row['p_z']),
+            'p_holm': format_p(row['p_holm'], 1 / (resamples + 1), attainable=True),
+            'significant': 'yes' if row['p_holm'] < 0.05 else 'no',
+        } for row in tests])
+        md.write(tests_table.to_markdown(index=False, disable_numparse=True) + '\n\n')
+    errors = [overall.to_numpy() - low, high - overall.to_numpy()]
+    return md.getvalue(), [('bar', overall, errors, os.path.join(outdir, 'overall_avg_win_rate.png'))]
+
+def case_section(dfc, case: str, outdir: str, resamples: int, seed: int):
+    md = io.StringIO()
+    md.write(f'## Case: {case}\n\n')
+    # Pivot table of win rates
+    pivot = dfc.pivot(index='strategy1', columns='strategy2', values='win_rate1')
+    md.write('### Win Rate Matrix (Strategy1 vs Strategy2)\n\n')
+    md.write(pivot.to_markdown() + '\n\n')
+
+    # Intervalles par cellule : Wilson et bootstrap
+    wilson_low, wilson_high = wilson_interval(dfc['wins1'], dfc['runs'])
+    low, high = percentile_interval(bootstrap_win_rates(dfc['wins1'], dfc['runs'], resamples, seed))
+    cells = dfc[['strategy1', 'strategy2', 'runs', 'win_rate1']].copy()
+    cells['wilson_ci95'] = [format_interval(lo, hi) for lo, hi in zip(wilson_low, wilson_high)]
+    cells['bootstrap_ci95'] = [format_interval(lo, hi) for lo, hi in zip(low, high)]
+    md.write('### Win Rate Intervals (95%)\n\n')
+    md.write(cells.to_markdown(index=False) + '\n\n')
+
+    # Heatmap annotée avec la demi-largeur de l'intervalle bootstrap
+    half = dfc.assign(half=(high - low) / 2).pivot(index='strategy1', columns='strategy2', values='half')
+    annotations = pivot.apply(lambda column: column.map('{:.2f}'.format)) + '\n±' \
+        + half.apply(lambda column: column.map('{:.2f}'.format))
+    fname = f"heatmap_{safe_filename(case)}.png"
+    md.write(f'![Heatmap {case}]({fname})\n\n')
+    return md.getvalue(), [('heatmap', pivot, annotations, case, os.path.join(outdir, fname))]
+
+def across_cases_section(df, outdir: str, resamples: int, seed: int):
+    md = io.StringIO()
+    md.write('## Strategy Win Rate Across Cases\n\n')
+    # Average win rate of each strategy per case (averaged over opponents)
+    case_pivot = df.groupby(['case','strategy1'])['win_rate1']\
+                    .mean().unstack('strategy1')
+    md.write(case_pivot.to_markdown() + '\n\n')
+
+    samples = bootstrap_win_rates(df['wins1'], df['runs'], resamples, seed)
+    codes, groups = pd.factorize(pd.MultiIndex.from_frame(df[['case', 'strategy1']]))
+    labels, boot = group_means(samples, codes)
+    low, high = percentile_interval(boot)
+    index = pd.MultiIndex.from_tuples(groups[labels], names=['case', 'strategy1'])
+    low_pivot = pd.Series(low, index=index).unstack('strategy1').reindex_like(case_pivot)
+    high_pivot = pd.Series(high, index=index).unstack('strategy1').reindex_like(case_pivot)
+    md.write('### 95% Bootstrap Intervals\n\n')
+    intervals = case_pivot.copy().astype(object)
+    for strategy in case_pivot.columns:
+        intervals[strategy] = [format_interval(lo, hi) for lo, hi in zip(low_pivot[strategy], high_pivot[strategy])]
+    md.write(intervals.to_markdown() + '\n\n')
+    md.write('![Win Rate Across Cases](comparison_win_rate_cases.png)\n\n')
+    return md.getvalue(), [('lines', case_pivot, low_pivot, high_pivot,
+                            os.path.join(outdir, 'comparison_win_rate_cases.png'))]
+
+def paired_section(paired):
+    md = io.StringIO()
+    write_paired_differences(md, paired)
+    return md.getvalue(), []
+
+def per_game_section(store, outdir: str):
+    md = io.StringIO()
+    jobs = write_per_game_analysis(md, store, outdir)
+    return md.getvalue(), jobs
+
+def store_fingerprint(store) -> str:
+    """Chunks only grow through their row counter: names and counts identify the data."""
+    return fingerprint(*[(os.path.basename(path), sorted(attributes.items()), rows)
+                         for path, attributes, rows in store.chunks])
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--store', default='results_store',
+                        help='per-game columnar store written by the runner (skipped if missing)')
+    parser.add_argument('--processes', type=int, help='chart rendering processes (default: all cores)')
+    parser.add_argument('--force', action='store_true', help='ignore the cache and rebuild every section')
+    parser.add_argument('--resamples', type=int, default=10000, help='bootstrap resamples per cell')
+    parser.add_argument('--bootstrap-seed', type=int, default=0, help='seed of the bootstrap resamples')
+    args = parser.parse_args()
+
     csv_path = 'batch_results.csv'
     if not os.path.isfile(csv_path):
         print(f"Error: '{csv_path}' not found. Run batch simulations first.")
@@ -35,73 +378,50 @@ def main():
     # Prepare output directory
     outdir = 'analysis_outputs'
     os.makedirs(outdir, exist_ok=True)
-    sns.set(style='whitegrid')
+    cache = FragmentCache(outdir, force=args.force)
+
+    # (clé, empreinte des données d'entrée, construction différée du fragment et de ses graphiques)
+    bootstrap = (args.resamples, args.bootstrap_seed)
+    rates = ['strategy1', 'runs', 'wins1', 'win_rate1']
+    sections = [('overall', fingerprint(frame_fingerprint(df[rates]), bootstrap),
+                 lambda: overall_section(df, outdir, *bootstrap))]
+    for case in df['case'].unique():
+        dfc = df[df['case'] == case]
+        sections.append((f'case {case}', fingerprint(frame_fingerprint(dfc), bootstrap),
+                         lambda dfc=dfc, case=case: case_section(dfc, case, outdir, *bootstrap)))
+    sections.append(('across cases', fingerprint(frame_fingerprint(df[['case'] + rates]), bootstrap),
+                     lambda: across_cases_section(df, outdir, *bootstrap)))
+    paired_path = 'batch_paired_differences.csv'
+    if os.path.isfile(paired_path):
+        with open(paired_path, 'rb') as f:
+            paired_digest = fingerprint(f.read())
+        sections.append(('paired differences', paired_digest,
+                         lambda: paired_section(pd.read_csv(paired_path))))
+    if os.path.isdir(args.store):
+        from src.simulation.results_store import ResultsStore
+
+        store = ResultsStore(args.store)
+        sections.append(('per-game', store_fingerprint(store), lambda: per_game_section(store, outdir)))
 
-    # Summary markdown
+    fragments, jobs, rebuilt = [], [], 0
+    for key, digest, build in sections:
+        text = cache.get(key, digest)
+        if text is None:
+            text, section_jobs = build()
+            cache.put(key, digest, text, [os.path.basename(job[-1]) for job in section_jobs])
+            jobs.extend(section_jobs)
+            rebuilt += 1
+        fragments.append(text)
+    render_charts(jobs, args.processes)
+    cache.save()
+
+    # Summary markdown, assembled from the fragments
     md_path = os.path.join(outdir, 'RESULTS_SUMMARY.md')
     with open(md_path, 'w') as md:
         md.write('# Simulation Results Analysis\n\n')
-
-        # Overall average win rate per strategy across all cases and opponents
-        md.write('## Overall Average Win Rate per Strategy\n\n')
-        overall = df.groupby('strategy1')['win_rate1'].mean().rename('avg_win_rate')
-        md.write(overall.to_markdown() + '\n\n')
-
-        # Generate bar chart for overall win rates
-        fig, ax = plt.subplots(figsize=(6, 4))
-        overall.plot.bar(ax=ax, color='skyblue')
-        ax.set_ylabel('Average Win Rate')
-        ax.set_ylim(0, 1)
-        ax.set_title('Overall Average Win Rate per Strategy')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        barfile = os.path.join(outdir, 'overall_avg_win_rate.png')
-        fig.savefig(barfile)
-        plt.close(fig)
-        md.write(f'![Overall Win Rate]({os.path.basename(barfile)})\n\n')
-
-        # Per-case analyses
-        cases = df['case'].unique()
-        for case in cases:
-            md.write(f'## Case: {case}\n\n')
-            dfc = df[df['case'] == case]
-            # Pivot table of win rates
-            pivot = dfc.pivot(index='strategy1', columns='strategy2', values='win_rate1')
-            md.write('### Win Rate Matrix (Strategy1 vs Strategy2)\n\n')
-            md.write(pivot.to_markdown() + '\n\n')
-            # Heatmap
-            fig, ax = plt.subplots(figsize=(8, 6))
-            sns.heatmap(pivot, annot=True, fmt='.2f', cmap='viridis', ax=ax)
-            ax.set_title(f'Win Rate Heatmap: {case}')
-            plt.yticks(rotation=0)
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            fname = f"heatmap_{safe_filename(case)}.png"
-            fpath = os.path.join(outdir, fname)
-            fig.savefig(fpath)
-            plt.close(fig)
-            md.write(f'![Heatmap {case}]({fname})\n\n')
-
-    # Append comparison of win rates across cases to markdown and generate a plot
-    with open(md_path, 'a') as md:
-        md.write('## Strategy Win Rate Across Cases\n\n')
-        # Average win rate of each strategy per case (averaged over opponents)
-        case_pivot = df.groupby(['case','strategy1'])['win_rate1']\
-                        .mean().unstack('strategy1')
-        md.write(case_pivot.to_markdown() + '\n\n')
-        # Plot comparison
-        fig, ax = plt.subplots(figsize=(10, 6))
-        case_pivot.plot(ax=ax, marker='o')
-        ax.set_ylabel('Average Win Rate')
-        ax.set_title('Strategy Win Rate Across Cases')
-        ax.set_ylim(0, 1)
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        cmp_file = os.path.join(outdir, 'comparison_win_rate_cases.png')
-        fig.savefig(cmp_file)
-        plt.close(fig)
-        md.write(f'![Win Rate Across Cases](comparison_win_rate_cases.png)\n\n')
-    print(f"Analysis complete. Outputs in '{outdir}/' (markdown and images).")
+        md.write(''.join(fragments))
+    print(f"Analysis complete: {rebuilt}/{len(sections)} sections rebuilt, {len(jobs)} charts rendered. "
+          f"Outputs in '{outdir}/' (markdown and images).")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
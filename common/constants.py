@@ -13,62 +13,10 @@ DEFAULT_SNAKE1_DIRECTION = Direction.RIGHT
 DEFAULT_SNAKE2_DIRECTION = Direction.LEFT
 
 #################### A MODIFIER POUR LES SIMULATIONS ####################
-CASE = 1  # Modifiable à 1, 2, 3, ou 4 selon le scénario
-
-#####CAS 1
-#CUSTOM_SNAKE1_POSITION = [(6, 12), (5, 12)]
-#CUSTOM_SNAKE2_POSITION = [(44, 12), (45, 12)] #cas initial, positions symétriques par rapport à la coinbase
-
-#####CAS 2
-#CUSTOM_SNAKE1_POSITION = [(25, 12), (24, 12), (23, 12)]
-#CUSTOM_SNAKE2_POSITION = [(27, 12), (28, 12)] #commence par faire haut gauche bas, donc 1 case de retard (2D, même ligne)
-
-#####CAS 3
-#CUSTOM_SNAKE1_POSITION = [(25, 12), (24, 12), (23, 12)]
-#CUSTOM_SNAKE2_POSITION = [(26, 11), (27, 11)] #commence par faire haut gauche, donc 2 cases de retard (1D 1H)
-
-#####CAS 4
-#CUSTOM_SNAKE1_POSITION = [(25, 12), (24, 12), (23, 12)]
-#CUSTOM_SNAKE2_POSITION = [(27, 10), (28, 10)] #commence par faire haut haut gauche, donc 3 cases de retard et deux lignes en haut & une de retard en horizontal
-
-
-if CASE == 1:
-    CUSTOM_SNAKE1_POSITION = [(6, 12), (5, 12)]
-    CUSTOM_SNAKE2_POSITION = [(44, 12), (45, 12)] #cas initial, positions symétriques par rapport à la coinbase
-    STARTING_SCORE_SNAKE1 = 50000
-    STARTING_SCORE_SNAKE2 = 50000
-    SNAKE1_LENGTH = 2
-    SNAKE2_LENGTH = 2
-    
-elif CASE == 2:
-    CUSTOM_SNAKE1_POSITION = [(25, 12), (24, 12), (23, 12)]
-    CUSTOM_SNAKE2_POSITION = [(27, 12), (28, 12)] #commence par faire haut gauche bas, donc 1 case de retard (2D, même ligne)
-    STARTING_SCORE_SNAKE1 = 52000
-    STARTING_SCORE_SNAKE2 = 50000
-    SNAKE1_LENGTH = 3
-    SNAKE2_LENGTH = 2
-    
-elif CASE == 3:
-    CUSTOM_SNAKE1_POSITION = [(25, 12), (24, 12), (23, 12)]
-    CUSTOM_SNAKE2_POSITION = [(26, 11), (27, 11)] #commence par faire haut gauche, donc 2 cases de retard (1D 1H)    
-    STARTING_SCORE_SNAKE1 = 52000
-    STARTING_SCORE_SNAKE2 = 50000
-    SNAKE1_LENGTH = 3
-    SNAKE2_LENGTH = 2
-    
-elif CASE == 4:
-    CUSTOM_SNAKE1_POSITION = [(25, 12), (24, 12), (23, 12)]
-    CUSTOM_SNAKE2_POSITION = [(27, 10), (28, 10)] #commence par faire haut haut gauche, donc 3 cases de retard et deux lignes en haut & une de retard en horizontal
-    STARTING_SCORE_SNAKE1 = 52000
-    STARTING_SCORE_SNAKE2 = 50000
-    SNAKE1_LENGTH = 3
-    SNAKE2_LENGTH = 2
-    
-else:
-    raise ValueError("CASE invalide dans constants.py")
-
-CUSTOM_SNAKE1_DIRECTION = Direction.RIGHT
-CUSTOM_SNAKE2_DIRECTION = Direction.LEFT
+# Scénario utilisé par défaut par le menu interactif (voir common/scenarios.json).
+# Les positions, scores et longueurs de chaque cas sont désormais des données :
+# le runner, le script batch et GameCanvas reçoivent un Scenario explicitement.
+CASE = 1
 
 
 @dataclass
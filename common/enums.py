@@ -18,6 +18,7 @@ class GameMode(Enum):
     PLAYER_VS_AI = "Player vs AI"
     AI_VS_AI = "AI vs AI"
     SIMULATION = "Simulation"
+    REPLAY = "Replay"
 
 
 class Strategy(Enum):
@@ -0,0 +1,25 @@
+# src/common/rng.py
+from typing import Optional
+
+MASK64 = (1 << 64) - 1
+
+
+def splitmix64(value: int) -> int:
+    """One round of the SplitMix64 mixer (stable across Python versions)."""
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def derive_seed(base_seed: Optional[int], *parts: int) -> Optional[int]:
+    """
+    Derive a reproducible 63-bit seed from a base seed and integer parts
+    (game index, matchup index, ...). Returns None if base_seed is None.
+    """
+    if base_seed is None:
+        return None
+    value = splitmix64(base_seed & MASK64)
+    for part in parts:
+        value = splitmix64(value ^ (part & MASK64))
+    return value >> 1
@@ -0,0 +1,94 @@
+# src/common/scenarios.py
+import json
+import os
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+from .enums import Direction
+from .constants import (
+    GRID_WIDTH,
+    DEFAULT_SNAKE1_POSITION,
+    DEFAULT_SNAKE2_POSITION,
+    DEFAULT_SNAKE1_DIRECTION,
+    DEFAULT_SNAKE2_DIRECTION
+)
+
+Position = Tuple[int, int]
+
+SCENARIOS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scenarios.json')
+
+
+def _positions(values) -> List[Position]:
+    return [tuple(p) for p in values]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Initial situation of a duel, passed explicitly to the runner, the batch script and the UI."""
+    id: int
+    name: str
+    snake1: List[Position]
+    snake2: List[Position]
+    direction1: Direction
+    direction2: Direction
+    score1: int
+    score2: int
+    food_position: Optional[Position] = None  # First food; random if None
+    reset1: List[Position] = field(default_factory=lambda: list(DEFAULT_SNAKE1_POSITION))
+    reset2: List[Position] = field(default_factory=lambda: list(DEFAULT_SNAKE2_POSITION))
+    reset_direction1: Direction = DEFAULT_SNAKE1_DIRECTION
+    reset_direction2: Direction = DEFAULT_SNAKE2_DIRECTION
+    description: str = ''
+
+    def is_mirror_symmetric(self, grid_width: int = GRID_WIDTH) -> bool:
+        """True if swapping seats is the same as mirroring the board horizontally."""
+        def mirror(positions):
+            return [(grid_width - 1 - x, y) for x, y in positions]
+
+        return (mirror(self.snake1) == list(self.snake2)
+                and mirror(self.reset1) == list(self.reset2)
+                and self.direction1 in (Direction.LEFT, Direction.RIGHT)
+                and Direction.opposite(self.direction1) == self.direction2
+                and Direction.opposite(self.reset_direction1) == self.reset_direction2
+                and self.score1 == self.score2
+                and (self.food_position is None or self.food_position[0] == grid_width - 1 - self.food_position[0]))
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        for key in ('direction1', 'direction2', 'reset_direction1', 'reset_direction2'):
+            data[key] = data[key].name
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Scenario':
+        data = dict(data)
+        for key in ('snake1', 'snake2', 'reset1', 'reset2'):
+            if key in data:
+                data[key] = _positions(data[key])
+        for key in ('direction1', 'direction2', 'reset_direction1', 'reset_direction2'):
+            if key in data:
+                data[key] = Direction[data[key]]
+        if data.get('food_position') is not None:
+            data['food_position'] = tuple(data['food_position'])
+        return cls(**data)
+
+
+def load_scenarios(path: str = SCENARIOS_FILE) -> Dict[int, Scenario]:
+    """Load a scenario file, keyed by scenario id (file order is kept)."""
+    with open(path) as f:
+        data = json.load(f)
+    scenarios = [Scenario.from_dict(item) for item in data['scenarios']]
+    return {scenario.id: scenario for scenario in scenarios}
+
+
+def save_scenarios(scenarios: List[Scenario], path: str) -> None:
+    """Write scenarios (e.g. generated ones) in the format read by load_scenarios."""
+    with open(path, 'w') as f:
+        json.dump({'scenarios': [scenario.to_dict() for scenario in scenarios]}, f, indent=2)
+
+
+def get_scenario(scenario_id: int, path: str = SCENARIOS_FILE) -> Scenario:
+    scenarios = load_scenarios(path)
+    if scenario_id not in scenarios:
+        raise ValueError(f"Scénario inconnu : {scenario_id} (disponibles : {sorted(scenarios)})")
+    return scenarios[scenario_id]
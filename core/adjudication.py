@@ -0,0 +1,78 @@
+# src/core/adjudication.py
+"""
+Early draw adjudication for games that cannot end.
+
+Two strategies that do not draw random numbers play the same moves from the
+same position. If the full state (engine keyframe, strategy histories,
+global RNG) ever comes back, the game loops until the step cap and ends as
+a draw, so it can be called a draw at the first repetition.
+Repetition is found with Brent's method: the state is saved at ticks 1, 2,
+4, 8, ... and every tick compares engine.position_hash() to the saved hash;
+only a matching hash triggers the exact comparison.
+
+The optional stall rule calls a draw after `stall_limit` ticks without food.
+Unlike a cycle, this changes outcomes (a late win becomes a draw).
+"""
+import copy
+import random
+from typing import Optional, Sequence
+
+from .engine import GameEngine, EAT1, EAT2
+
+CYCLE = 1
+STALL = 2
+ADJUDICATIONS = {0: 'none', CYCLE: 'cycle', STALL: 'stall'}
+
+
+class Adjudicator:
+    """Call check(events) after every engine.step; non-zero means: stop, it is a draw."""
+
+    def __init__(self, engine: GameEngine, strategies: Sequence, detect_cycles: bool = True,
+                 stall_limit: Optional[int] = None):
+        self.engine = engine
+        self.strategies = strategies
+        self.detect_cycles = detect_cycles
+        self.stall_limit = stall_limit
+        self._last_eat = engine.steps
+        self._saved_hash = None
+        self._saved_state = None
+        self._power = 1
+        self._distance = 0
+
+    def fork(self, engine: GameEngine, strategies: Sequence) -> 'Adjudicator':
+        """
+        Copy bound to another engine and strategies (a game resumed from a
+        snapshot). The saved RNG state becomes the current one, which is only
+        right if no random number was drawn since the save.
+        """
+        forked = copy.copy(self)
+        forked.engine, forked.strategies = engine, strategies
+        if forked._saved_state is not None:
+            forked._saved_state = forked._saved_state[:2] + (random.getstate(),)
+        return forked
+
+    def _signature(self) -> tuple:
+        return tuple(strategy.state_signature() for strategy in self.strategies)
+
+    def _exact_state(self) -> tuple:
+        # Compteurs (steps, resets) exclus : ils avancent même quand la position boucle
+        return self.engine.keyframe()[:11], self._signature(), random.getstate()
+
+    def check(self, events: int) -> int:
+        engine = self.engine
+        if events & (EAT1 | EAT2):
+            self._last_eat = engine.steps
+        elif self.stall_limit and engine.steps - self._last_eat >= self.stall_limit:
+            return STALL
+
+        if self.detect_cycles:
+            current = hash((engine.position_hash(), self._signature()))
+            if current == self._saved_hash and self._exact_state() == self._saved_state:
+                return CYCLE
+            self._distance += 1
+            if self._distance == self._power:
+                self._saved_hash = current
+                self._saved_state = self._exact_state()
+                self._power *= 2
+                self._distance = 0
+        return 0
@@ -0,0 +1,280 @@
+# src/core/engine.py
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..common.enums import Direction
+from ..common.constants import (
+    GameConfig,
+    DEFAULT_SNAKE1_POSITION,
+    DEFAULT_SNAKE2_POSITION,
+    DEFAULT_SNAKE1_DIRECTION,
+    DEFAULT_SNAKE2_DIRECTION
+)
+from .snake import Snake
+from .game_state import GameState
+
+Position = Tuple[int, int]
+FoodPlacer = Callable[[List[Position], List[Position]], Position]
+
+# Event flags returned by GameEngine.step
+RESET1 = 1
+RESET2 = 2
+EAT1 = 4
+EAT2 = 8
+
+_ZOBRIST: Dict[Tuple[int, int], Tuple[Dict[Position, int], Dict[Position, int]]] = {}
+
+
+def zobrist_tables(width: int, height: int) -> Tuple[Dict[Position, int], Dict[Position, int]]:
+    """One random 64-bit key per cell and per snake (fixed seed, never the global RNG)."""
+    tables = _ZOBRIST.get((width, height))
+    if tables is None:
+        rng = random.Random(0x5EED)
+        tables = _ZOBRIST[(width, height)] = tuple(
+            {(x, y): rng.getrandbits(64) for x in range(-1, width + 1) for y in range(-1, height + 1)}
+            for _ in range(2))
+    return tables
+
+
+class GameEngine:
+    """
+    Tick rules of a duel, shared by the simulation runner and replays.
+
+    Food placement is delegated to a callable so that callers decide where
+    randomness comes from (live RNG, recorded food positions, ...).
+    """
+
+    def __init__(self,
+                 snake1: List[Position],
+                 snake2: List[Position],
+                 direction1: Direction,
+                 direction2: Direction,
+                 food_position: Position,
+                 score1: int,
+                 score2: int,
+                 place_food: FoodPlacer,
+                 config: Optional[GameConfig] = None,
+                 reset1: Tuple[List[Position], Direction] = (DEFAULT_SNAKE1_POSITION, DEFAULT_SNAKE1_DIRECTION),
+                 reset2: Tuple[List[Position], Direction] = (DEFAULT_SNAKE2_POSITION, DEFAULT_SNAKE2_DIRECTION)):
+        self.config = config or GameConfig()
+        self.place_food = place_food
+        self.reset1 = reset1
+        self.reset2 = reset2
+        self.snake1 = Snake(list(snake1), direction1)
+        self.snake2 = Snake(list(snake2), direction2)
+        self.state = GameState(
+            snake1=self.snake1.body,
+            snake2=self.snake2.body,
+            food_position=food_position,
+            grid_width=self.config.GRID_WIDTH,
+            grid_height=self.config.GRID_HEIGHT,
+            score1=score1,
+            score2=score2
+        )
+        self.steps = 0
+        self.resets1 = 0
+        self.resets2 = 0
+        # Hachage incrémental des corps (Zobrist) : tête ajoutée, queue retirée à chaque tick
+        self._zobrist1, self._zobrist2 = zobrist_tables(self.config.GRID_WIDTH, self.config.GRID_HEIGHT)
+        self._rehash()
+        # Pile d'annulation de make_move (recherche en place, sans copie)
+        self._undo: List[tuple] = []
+
+    def _body_hash(self, body: List[Position], table: Dict[Position, int]) -> int:
+        h = 0
+        for cell in body:
+            h ^= table[cell]
+        return h
+
+    def _rehash(self) -> None:
+        self._hash1 = self._body_hash(self.snake1.body, self._zobrist1)
+        self._hash2 = self._body_hash(self.snake2.body, self._zobrist2)
+
+    def position_hash(self) -> int:
+        """
+        Rolling hash of the full game state (bodies, heads, directions, food,
+        scores). Equal states give equal hashes; compare keyframes to be sure.
+        """
+        s1, s2, state = self.snake1, self.snake2, self.state
+        return hash((self._hash1, self._hash2, s1.body[0], s2.body[0], s1.direction, s1.next_direction,
+                     s1.growing, s2.direction, s2.next_direction, s2.growing,
+                     state.food_position, state.score1, state.score2))
+
+    @classmethod
+    def from_scenario(cls, scenario, food_position: Position, place_food: FoodPlacer,
+                      config: Optional[GameConfig] = None) -> 'GameEngine':
+        return cls(
+            scenario.snake1,
+            scenario.snake2,
+            scenario.direction1,
+            scenario.direction2,
+            food_position,
+            scenario.score1,
+            scenario.score2,
+            place_food=place_food,
+            config=config,
+            reset1=(scenario.reset1, scenario.reset_direction1),
+            reset2=(scenario.reset2, scenario.reset_direction2)
+        )
+
+    @property
+    def winner(self) -> int:
+        """1 or 2 once a snake reached the winning score, 0 otherwise."""
+        if self.state.score1 >= self.config.WINNING_SCORE:
+            return 1
+        if self.state.score2 >= self.config.WINNING_SCORE:
+            return 2
+        return 0
+
+    def _reset_snake(self, snake_id: int) -> None:
+        if snake_id == 1:
+            self.snake1 = Snake(list(self.reset1[0]), self.reset1[1])
+            self.resets1 += 1
+            self._hash1 = self._body_hash(self.snake1.body, self._zobrist1)
+        else:
+            self.snake2 = Snake(list(self.reset2[0]), self.reset2[1])
+            self.resets2 += 1
+            self._hash2 = self._body_hash(self.snake2.body, self._zobrist2)
+
+    def step(self, direction1: Direction, direction2: Direction) -> int:
+        """
+        Apply one joint move: collisions and resets, then food and scoring.
+        Returns a bitmask of RESET1, RESET2, EAT1, EAT2.
+        """
+        state = self.state
+        snake1, snake2 = self.snake1, self.snake2
+        width, height = state.grid_width, state.grid_height
+        events = 0
+
+        next_head1 = (snake1.head[0] + direction1.value[0], snake1.head[1] + direction1.value[1])
+        next_head2 = (snake2.head[0] + direction2.value[0], snake2.head[1] + direction2.value[1])
+
+        hit_wall1 = not (0 <= next_head1[0] < width and 0 <= next_head1[1] < height)
+        hit_wall2 = not (0 <= next_head2[0] < width and 0 <= next_head2[1] < height)
+
+        collide1 = next_head1 in set(snake1.body[:-1]) or next_head1 in snake2.body
+        collide2 = next_head2 in set(snake2.body[:-1]) or next_head2 in snake1.body
+
+        if next_head1 == next_head2:
+            # Collision frontale : les deux serpents repartent
+            self._reset_snake(1)
+            self._reset_snake(2)
+            events = RESET1 | RESET2
+        else:
+            if hit_wall1 or collide1:
+                self._reset_snake(1)
+                events |= RESET1
+            else:
+                body = snake1.body
+                head, tail, length = body[0], body[-1], len(body)
+                snake1.set_direction(direction1)
+                snake1.move(width, height, snake2)
+                if body[0] != head:
+                    self._hash1 ^= self._zobrist1[body[0]]
+                    if len(body) == length:
+                        self._hash1 ^= self._zobrist1[tail]
+
+            if hit_wall2 or collide2:
+                self._reset_snake(2)
+                events |= RESET2
+            else:
+                body = snake2.body
+                head, tail, length = body[0], body[-1], len(body)
+                snake2.set_direction(direction2)
+                snake2.move(width, height, self.snake1)
+                if body[0] != head:
+                    self._hash2 ^= self._zobrist2[body[0]]
+                    if len(body) == length:
+                        self._hash2 ^= self._zobrist2[tail]
+
+        snake1, snake2 = self.snake1, self.snake2
+        state.snake1 = snake1.body
+        state.snake2 = snake2.body
+
+        # Nourriture
+        if snake1.head == state.food_position:
+            points = self.config.calculate_points(len(snake1.body))
+            snake1.grow()
+            state.score1 = state.score1 + points
+            state.score2 = max(0, state.score2 - points)    # Pas de score négatif
+            state.food_position = self.place_food(state.snake1, state.snake2)
+            events |= EAT1
+
+        elif snake2.head == state.food_position:
+            points = self.config.calculate_points(len(snake2.body))
+            snake2.grow()
+            state.score2 = state.score2 + points
+            state.score1 = max(0, state.score1 - points)    # Pas de score négatif
+            state.food_position = self.place_food(state.snake1, state.snake2)
+            events |= EAT2
+
+        self.steps += 1
+        return events
+
+    def make_move(self, direction1: Direction, direction2: Direction) -> int:
+        """
+        step() that can be undone with unmake_move(), for search without
+        copying snakes or states. Food eaten here is placed by place_food as
+        usual: searches should give the engine a deterministic placer (the
+        global RNG is not rewound by unmake_move).
+        """
+        snake1, snake2, state = self.snake1, self.snake2, self.state
+        body1, body2 = snake1.body, snake2.body
+        self._undo.append((
+            snake1, body1[0], body1[-1], len(body1), snake1.direction, snake1.next_direction, snake1.growing,
+            snake2, body2[0], body2[-1], len(body2), snake2.direction, snake2.next_direction, snake2.growing,
+            state.food_position, state.score1, state.score2, self.resets1, self.resets2,
+            self._hash1, self._hash2,
+        ))
+        return self.step(direction1, direction2)
+
+    def unmake_move(self) -> None:
+        """Undo the last make_move exactly (bodies, directions, growth, scores, food, counters)."""
+        (snake1, head1, tail1, length1, dir1, next1, grow1,
+         snake2, head2, tail2, length2, dir2, next2, grow2,
+         food, score1, score2, self.resets1, self.resets2,
+         self._hash1, self._hash2) = self._undo.pop()
+        # Un serpent remis à zéro a été remplacé : l'ancien objet n'a pas bougé
+        for snake, head, tail, length in ((snake1, head1, tail1, length1), (snake2, head2, tail2, length2)):
+            body = snake.body
+            if body[0] != head:
+                del body[0]
+                if len(body) < length:
+                    body.append(tail)
+        snake1.direction, snake1.next_direction, snake1.growing = dir1, next1, grow1
+        snake2.direction, snake2.next_direction, snake2.growing = dir2, next2, grow2
+        self.snake1, self.snake2 = snake1, snake2
+        state = self.state
+        state.snake1, state.snake2 = snake1.body, snake2.body
+        state.food_position, state.score1, state.score2 = food, score1, score2
+        self.steps -= 1
+
+    @property
+    def search_depth(self) -> int:
+        """Number of make_move calls not undone yet."""
+        return len(self._undo)
+
+    def keyframe(self) -> tuple:
+        """Cheap in-memory copy of everything step() depends on."""
+        s1, s2 = self.snake1, self.snake2
+        return (
+            s1.body.copy(), s1.direction, s1.next_direction, s1.growing,
+            s2.body.copy(), s2.direction, s2.next_direction, s2.growing,
+            self.state.food_position, self.state.score1, self.state.score2,
+            self.steps, self.resets1, self.resets2
+        )
+
+    def restore(self, keyframe: tuple) -> None:
+        (body1, dir1, next1, grow1, body2, dir2, next2, grow2,
+         food, score1, score2, self.steps, self.resets1, self.resets2) = keyframe
+        self.snake1 = Snake(body1.copy(), dir1)
+        self.snake1.next_direction, self.snake1.growing = next1, grow1
+        self.snake2 = Snake(body2.copy(), dir2)
+        self.snake2.next_direction, self.snake2.growing = next2, grow2
+        self.state.snake1 = self.snake1.body
+        self.state.snake2 = self.snake2.body
+        self.state.food_position = food
+        self.state.score1 = score1
+        self.state.score2 = score2
+        self._rehash()
+        self._undo.clear()
@@ -1,20 +1,43 @@
 # main.py
-import tkinter as tk
-from src.common.constants import GameConfig
+"""
+Chain Duel entry point.
+
+Without arguments: interactive menu. `python main.py headless STRATEGY1
+STRATEGY2 --games N` plays one match-up without the UI; its import graph is
+the engine, the strategies and the runner only. tkinter, pandas, tqdm and
+numpy are imported on first use.
+"""
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import os
+import sys
+from typing import TYPE_CHECKING
+from src.common.constants import GameConfig, CASE
 from src.common.enums import GameMode
+from src.common.scenarios import load_scenarios, get_scenario
 from src.ui.setup import get_game_settings
-from src.ui.game_canvas import GameCanvas
 from src.utils.debug import DebugLogger
 from src.simulation.runner import ScenarioSimulationRunner
+from src.simulation.aggregate import MatchupAggregate
+from src.strategies.registry import get_strategy_class
 from src.strategies.ai import (
     AggressiveAnticipationStrategy,
     NoisyAdaptiveAggressiveStrategy,
     SafeFoodSeekingStrategy,
     SuperiorAdaptiveStrategy
 )
-import pandas as pd
 
-def setup_game_window(root: tk.Tk, config: GameConfig) -> None:
+if TYPE_CHECKING:
+    import tkinter as tk
+
+# Modules lourds qui ne doivent pas être chargés par le chemin headless
+HEAVY_MODULES = ('tkinter', 'pandas', 'tqdm', 'numpy', 'matplotlib')
+
+
+def setup_game_window(root: 'tk.Tk', config: GameConfig) -> None:
     """Setup the main game window and center it on screen."""
     root.title("Chain Duel")
     screen_width = root.winfo_screenwidth()
@@ -23,9 +46,16 @@ def setup_game_window(root: tk.Tk, config: GameConfig) -> None:
     y = (screen_height - config.WINDOW_HEIGHT) // 2
     root.geometry(f'{config.WINDOW_WIDTH}x{config.WINDOW_HEIGHT}+{x}+{y}')
 
-def create_controls_label(root: tk.Tk, mode: GameMode, config: GameConfig) -> None:
+def create_controls_label(root: 'tk.Tk', mode: GameMode, config: GameConfig) -> None:
     """Create and display the controls help text."""
-    controls_text = "Controls: Arrow Keys (Green) | R: Restart | ESC: Quit" if mode == GameMode.PLAYER_VS_AI else "Controls: R: Restart | ESC: Quit"
+    import tkinter as tk
+
+    if mode == GameMode.REPLAY:
+        controls_text = "Controls: Space: Pause | Left/Right: Step | PgUp/PgDn: 1000 steps | Home/End | Up/Down: Speed | R: Restart | ESC: Quit"
+    elif mode == GameMode.PLAYER_VS_AI:
+        controls_text = "Controls: Arrow Keys (Green) | R: Restart | ESC: Quit"
+    else:
+        controls_text = "Controls: R: Restart | ESC: Quit"
     controls = tk.Label(
         root,
         text=controls_text,
@@ -34,15 +64,21 @@ def create_controls_label(root: tk.Tk, mode: GameMode, config: GameConfig) -> No
     )
     controls.pack(side='bottom')
 
-def run_interactive_mode(mode: GameMode, strategy1, strategy2, debug: DebugLogger, runner=None) -> None:
+def run_interactive_mode(mode: GameMode, strategy1, strategy2, debug: DebugLogger, runner=None, replay=None) -> None:
     """Run the game in interactive mode (with visual display)."""
+    import tkinter as tk
+    from src.ui.game_canvas import GameCanvas
+    from src.simulation.winprob import load_table
+
     root = tk.Tk()
     config = GameConfig()
     
     setup_game_window(root, config)
     
-    # Create and setup game canvas
-    game = GameCanvas(root, mode, config, strategy1, strategy2, debug)
+    # Create and setup game canvas (probabilités de victoire affichées si la table existe)
+    game = GameCanvas(root, mode, config, strategy1, strategy2, debug, replay=replay,
+                      win_table=load_table(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        'win_probability.npz')))
     game.pack(expand=True, fill='both')
     create_controls_label(root, mode, config)
 
@@ -58,13 +94,72 @@ def run_interactive_mode(mode: GameMode, strategy1, strategy2, debug: DebugLogge
     debug.log("Starting main game loop")
     root.mainloop()
 
+REPLAY_PROMPT = ("\nPartie à rejouer, vide = nouvelle partie :\n"
+                 "  dossier d'enregistrement (record_dir) ou de résultats (results_dir)\n"
+                 "  [cas:]seed:index [crn] [mirror] [stall=N] [nocycle]   seed = celui du runner, ou de la\n"
+                 "  cellule d'un tournoi (cell_seed) ; options = celles du run\n> ")
+
+
+def parse_replay_seed(text: str):
+    """'[case:]seed:index [crn] [mirror] [stall=N] [nocycle]' -> (case, seed, index, options)."""
+    address, *flags = text.split()
+    parts = [int(part) for part in address.split(':')]
+    if len(parts) not in (2, 3):
+        raise ValueError(f"{address} : attendu [cas:]seed:index")
+    case, seed, game_index = parts if len(parts) == 3 else [CASE] + parts
+    options = {}
+    for flag in flags:
+        if flag in ('crn', 'mirror'):
+            options[flag] = True
+        elif flag == 'nocycle':
+            options['detect_cycles'] = False
+        elif flag.startswith('stall='):
+            options['stall_limit'] = int(flag[len('stall='):])
+        else:
+            raise ValueError(f"Option inconnue : {flag}")
+    return case, seed, game_index, options
+
+
+def load_replay(strategy1, strategy2):
+    """
+    Ask which game to replay: a recording directory, a results store (seed and
+    options read from it), or [case:]seed:game_index with the run's options.
+    Asks again on malformed input.
+    """
+    from src.simulation.replay import GameReplay
+    from src.simulation.recorder import META_FILE
+
+    strategy1_class, strategy2_class = strategy1.__class__, strategy2.__class__
+    while True:
+        source = input(REPLAY_PROMPT).strip()
+        if not source:
+            return None
+        try:
+            if os.path.isdir(source):
+                if os.path.exists(os.path.join(source, META_FILE)):
+                    return GameReplay.from_store(source, int(input("Numéro de la partie : ")))
+                case = input(f"Cas (vide = {CASE}) : ").strip()
+                scenario = get_scenario(int(case) if case else CASE)
+                return GameReplay.from_results(source, strategy1_class, strategy2_class,
+                                               int(input("Numéro de la partie : ")), scenario=scenario)
+            case, seed, game_index, options = parse_replay_seed(source)
+            return GameReplay.from_seed(strategy1_class, strategy2_class, seed, game_index,
+                                        scenario=get_scenario(case), **options)
+        except (ValueError, KeyError) as error:
+            print(f"Partie introuvable : {error}")
+
+
 def run_simulation_mode(strategy1, strategy2, num_runs: int) -> None:
     """Run the game in simulation mode (batch processing or visual simulation)."""
     choice = input("\nVisualiser la simulation ? (y/n): ").lower()
     if choice == 'y':
-        # Mode graphique comme un vrai match IA vs IA
         debug = DebugLogger(False)
-        run_interactive_mode(GameMode.AI_VS_AI, strategy1, strategy2, debug)
+        replay = load_replay(strategy1, strategy2)
+        if replay is not None:
+            run_interactive_mode(GameMode.REPLAY, strategy1, strategy2, debug, replay=replay)
+        else:
+            # Mode graphique comme un vrai match IA vs IA
+            run_interactive_mode(GameMode.AI_VS_AI, strategy1, strategy2, debug)
     else:
         # Mode batch sans interface
         print("\nStarting simulation...")
@@ -99,6 +194,10 @@ def run_game_mode(mode: GameMode, strategy1, strategy2, debug_enabled: bool, num
 
 
 def run_all_matchups():
+    import pandas as pd
+    from src.simulation.batch import run_tournament, tournament_cells
+    from src.simulation.shared_results import SharedResults
+
     strategies = [
         AggressiveAnticipationStrategy,
         NoisyAdaptiveAggressiveStrategy,
@@ -106,38 +205,81 @@ def run_all_matchups():
         SuperiorAdaptiveStrategy
     ]
 
-    results = []
-
-    for strat1 in strategies:
-        for strat2 in strategies:
-            print(f"\nRunning: {strat1.__name__} vs {strat2.__name__}")
-            runner = ScenarioSimulationRunner(strat1, strat2, num_runs=10000, silent=True)
-            runner.run_parallel()
+    # Tous les scénarios du registre dans un seul pool de workers ; les parties sont écrites
+    # en mémoire partagée puis versées d'un coup dans le stockage colonnaire
+    scenarios = list(load_scenarios().values())
+    with SharedResults(tournament_cells(scenarios, strategies), 10000) as shared:
+        aggregates, _ = run_tournament(scenarios, strategies, num_runs=10000, shared=shared)
+        shared.to_store('results_store')
 
-            
-            #LANCEMENT 
-
-            wins1 = runner.stats['wins1']
-            wins2 = runner.stats['wins2']
-            draws = runner.stats.get('draws', 0)
-            total = wins1 + wins2 + draws
-
-            results.append({
-                'Player 1': strat1.__name__,
-                'Player 2': strat2.__name__,
-                'Wins P1': wins1,
-                'Wins P2': wins2,
-                'Draws': draws,
-                '% P1': f"{wins1 / total * 100:.1f}%",
-                '% P2': f"{wins2 / total * 100:.1f}%",
-                '% Draws': f"{draws / total * 100:.1f}%"
-            })
+    results = []
+    for (case, name1, name2), aggregate in aggregates.items():
+        wins1, wins2, draws = aggregate.wins1, aggregate.wins2, aggregate.draws
+        total = aggregate.games
+        results.append({
+            'Case': case,
+            'Player 1': name1,
+            'Player 2': name2,
+            'Wins P1': wins1,
+            'Wins P2': wins2,
+            'Draws': draws,
+            '% P1': f"{wins1 / total * 100:.1f}%",
+            '% P2': f"{wins2 / total * 100:.1f}%",
+            '% Draws': f"{draws / total * 100:.1f}%"
+        })
 
     df = pd.DataFrame(results)
     print(df.to_string(index=False))
 
 
+def run_headless(argv) -> None:
+    """One match-up without any UI; prints the result, throughput and startup time."""
+    parser = argparse.ArgumentParser(prog='main.py headless',
+                                     description="Headless simulation of one match-up")
+    parser.add_argument('strategy1', help="strategy name, with or without the Strategy suffix")
+    parser.add_argument('strategy2')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--case', type=int, default=CASE, help="scenario id (common/scenarios.json)")
+    parser.add_argument('--no-cycle-detection', action='store_true', help="play repeated positions to the cap")
+    parser.add_argument('--stall-limit', type=int, help="draw after this many ticks without food")
+    args = parser.parse_args(argv)
+    startup = time.perf_counter() - _STARTED
+
+    try:
+        strategy1_class = get_strategy_class(args.strategy1)
+        strategy2_class = get_strategy_class(args.strategy2)
+    except ValueError as error:
+        raise SystemExit(error)
+    scenario = get_scenario(args.case)
+    runner = ScenarioSimulationRunner(strategy1_class, strategy2_class, num_runs=args.games,
+                                      silent=True, seed=args.seed, scenario=scenario,
+                                      detect_cycles=not args.no_cycle_detection, stall_limit=args.stall_limit)
+    aggregate = MatchupAggregate(scenario.name, strategy1_class.__name__, strategy2_class.__name__)
+    started = time.perf_counter()
+    for game_index in range(args.games):
+        aggregate.add(runner.play_game(game_index if args.seed is not None else None))
+    elapsed = time.perf_counter() - started
+
+    games = max(aggregate.games, 1)
+    print(f"{scenario.name}: {aggregate.strategy1} vs {aggregate.strategy2}, {aggregate.games} games")
+    print(f"Player 1: {aggregate.wins1} ({aggregate.wins1 / games * 100:.1f}%)  "
+          f"Player 2: {aggregate.wins2} ({aggregate.wins2 / games * 100:.1f}%)  "
+          f"Draws: {aggregate.draws} ({aggregate.draws / games * 100:.1f}%)")
+    print(f"Time: {elapsed:.2f}s ({aggregate.games / max(elapsed, 1e-9):.1f} games/s, "
+          f"{aggregate.sum_steps / max(elapsed, 1e-9):.0f} ticks/s)")
+    if aggregate.cycles or aggregate.stalls:
+        print(f"Early draws: {aggregate.cycles} repeated positions, {aggregate.stalls} without food, "
+              f"{aggregate.ticks_saved:,} ticks saved")
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"Startup (imports): {startup * 1000:.0f} ms; heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'headless':
+        run_headless(sys.argv[2:])
+        return
+
     settings = get_game_settings()
 
     # Mode batch pour tous les match-ups
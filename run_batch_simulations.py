@@ -2,22 +2,53 @@
 """
 Batch simulation runner for all AI strategies over multiple initial cases.
 Generates a CSV of results and a Markdown summary of strategies and cases.
+
+Without arguments the script asks its questions interactively. For headless
+and multi-node runs:
+
+    python run_batch_simulations.py run --games 100000 --seed 7 --shard 3/16 --out partials
+    python run_batch_simulations.py merge partials/partial_*.json
+
+or with a work queue (blocks of dead workers are re-queued):
+
+    export CHAINDUEL_AUTHKEY=...   # same secret everywhere; peers are unpickled, trusted hosts only
+    python run_batch_simulations.py coordinator --games 100000 --seed 7 --bind :50000
+    python run_batch_simulations.py worker --connect coordinator-host:50000 --processes 32
+
+or with a total budget spent where the answer is still uncertain (racing):
+
+    python run_batch_simulations.py race --budget 200000 --question rank --seed 7
+
+or for the probability of a rare outcome of one match-up (multilevel splitting):
+
+    python run_batch_simulations.py rare AggressiveAnticipation SafeFoodSeeking --event win2 --seed 7
+
+or to learn the win-probability table used by the UI and as a leaf evaluator:
+
+    python run_batch_simulations.py winprob --games 2000 --seed 7
 """
 import os
 import sys
 import random
 import csv
-from statistics import mean
-from datetime import datetime
+import argparse
+import multiprocessing
 
 # Ensure src package is importable
 ROOT = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, ROOT)
 
-from src.common.constants import GameConfig
-from src.common.enums import Direction
-from src.core.game_state import GameState
-from src.core.snake import Snake
+from src.common.scenarios import SCENARIOS_FILE, load_scenarios, Scenario
+from src.simulation.batch import run_tournament, plan_blocks, tournament_cells
+from src.simulation.telemetry import Telemetry
+from src.simulation.profiling import ProfileConfig, merge_profiles
+from src.simulation.memory import MemoryConfig
+from src.simulation.coordinator import (DEFAULT_HOST, DEFAULT_PORT, coordinator_authkey, parse_address,
+                                        run_coordinator, run_worker, worker_authkey)
+from src.simulation.shards import (
+    parse_shard, resolve_strategies, tournament_config, run_shard,
+    partial_path, write_partial, load_partial, merge_partials
+)
 from src.strategies.ai import (
     AggressiveAnticipationStrategy,
     NoisyAdaptiveAggressiveStrategy,
@@ -26,175 +57,71 @@ from src.strategies.ai import (
 )
 
 
-def place_food_empty(snake1_body, snake2_body, cfg):
-    """Place food at a random empty cell."""
-    while True:
-        x = random.randint(0, cfg.GRID_WIDTH - 1)
-        y = random.randint(0, cfg.GRID_HEIGHT - 1)
-        if (x, y) not in snake1_body and (x, y) not in snake2_body:
-            return (x, y)
-
-
-def simulate_one_game(case_cfg, strat1, strat2, cfg):
-    """Simulate a single game for given case and strategies; return metrics."""
-    # Unpack case configuration
-    body1_init = [tuple(p) for p in case_cfg['snake1_body']]
-    body2_init = [tuple(p) for p in case_cfg['snake2_body']]
-    dir1_init = case_cfg['snake1_dir']
-    dir2_init = case_cfg['snake2_dir']
-    score1_init = case_cfg['score1']
-    score2_init = case_cfg['score2']
-    # Place initial food
-    if case_cfg.get('random_food', False):
-        food_init = place_food_empty(body1_init, body2_init, cfg)
-    else:
-        food_init = case_cfg['food_position']
-
-    # Initialize game state and snakes
-    state = GameState(
-        snake1=list(body1_init),
-        snake2=list(body2_init),
-        food_position=food_init,
-        grid_width=cfg.GRID_WIDTH,
-        grid_height=cfg.GRID_HEIGHT,
-        score1=score1_init,
-        score2=score2_init,
-    )
-    snake1 = Snake(list(body1_init), dir1_init)
-    snake2 = Snake(list(body2_init), dir2_init)
-    history = []
-    max_steps = 1000
-
-    for step in range(max_steps):
-        # Get moves
-        d1 = strat1.get_next_move(state, 1)
-        d2 = strat2.get_next_move(state, 2)
-        snake1.set_direction(d1)
-        snake2.set_direction(d2)
-
-        # Move snakes, reset on wall collision
-        if not snake1.move(cfg.GRID_WIDTH, cfg.GRID_HEIGHT):
-            # reset to initial positions for this case
-            snake1 = Snake(list(body1_init), dir1_init)
-        if not snake2.move(cfg.GRID_WIDTH, cfg.GRID_HEIGHT):
-            snake2 = Snake(list(body2_init), dir2_init)
-
-        # Update state bodies
-        state.snake1 = list(snake1.body)
-        state.snake2 = list(snake2.body)
-
-        # Collisions between snakes
-        if snake1.check_collision(snake2):
-            snake1 = Snake(list(body1_init), dir1_init)
-            state.snake1 = list(snake1.body)
-        if snake2.check_collision(snake1):
-            snake2 = Snake(list(body2_init), dir2_init)
-            state.snake2 = list(snake2.body)
-
-        # Food collection and scoring
-        # Snake1 eats
-        if snake1.head == state.food_position:
-            snake1.grow()
-            pts = cfg.calculate_points(len(snake1.body))
-            state.score1 += pts
-            state.score2 -= pts
-            if state.score1 >= cfg.WINNING_SCORE:
-                history.append((state.score1, len(snake1.body), state.score2, len(snake2.body)))
-                break
-            state.food_position = place_food_empty(state.snake1, state.snake2, cfg)
-        # Snake2 eats
-        if snake2.head == state.food_position:
-            snake2.grow()
-            pts = cfg.calculate_points(len(snake2.body))
-            state.score2 += pts
-            state.score1 -= pts
-            if state.score2 >= cfg.WINNING_SCORE:
-                history.append((state.score1, len(snake1.body), state.score2, len(snake2.body)))
-                break
-            state.food_position = place_food_empty(state.snake1, state.snake2, cfg)
-
-        # Record snapshot: (score1, len1, score2, len2)
-        history.append((state.score1, len(snake1.body), state.score2, len(snake2.body)))
-
-    # Final metrics
-    final = history[-1] if history else (state.score1, len(snake1.body), state.score2, len(snake2.body))
-    scores1 = [h[0] for h in history]
-    scores2 = [h[2] for h in history]
-    lengths1 = [h[1] for h in history]
-    lengths2 = [h[3] for h in history]
-    wins1 = 1 if final[0] > final[2] else 0
-    wins2 = 1 - wins1
-    return {
-        'wins1': wins1,
-        'wins2': wins2,
-        'avg_score1': final[0],
-        'avg_score2': final[2],
-        'max_length1': max(lengths1) if lengths1 else len(body1_init),
-        'max_length2': max(lengths2) if lengths2 else len(body2_init),
-        'game_length': len(history),
-    }
+def per_seed_wins(winners, mirror):
+    """Strategy1 win indicator per seed (mean of the two seats under mirrored pairing)."""
+    won = (winners == 1).astype(float)
+    if mirror:
+        won = won[:len(won) // 2 * 2].reshape(-1, 2).mean(axis=1)
+    return list(won)
 
 
-def main():
-    cfg = GameConfig()
-    # Prepare strategies
-    strategies = [
-        AggressiveAnticipationStrategy(),
-        NoisyAdaptiveAggressiveStrategy(),
-        SafeFoodSeekingStrategy(),
-        SuperiorAdaptiveStrategy(),
-    ]
-    strat_names = [type(s).__name__ for s in strategies]
-
-    # Define cases
-    cx = cfg.GRID_WIDTH // 2
-    cy = cfg.GRID_HEIGHT // 2
-    base_len = cfg.INITIAL_SNAKE_LENGTH
-    # Points for one food at L=base_len+1
-    pts1 = cfg.calculate_points(base_len + 1)
-    cases = [
-        {
-            'name': 'Classic Start',
-            'snake1_body': [(2 - i, cy) for i in range(base_len)],
-            'snake1_dir': Direction.RIGHT,
-            'snake2_body': [(cfg.GRID_WIDTH - 3 + i, cy) for i in range(base_len)],
-            'snake2_dir': Direction.LEFT,
-            'score1': cfg.STARTING_SCORE,
-            'score2': cfg.STARTING_SCORE,
-            'food_position': (cx, cy),
-            'random_food': False,
-        },
-        {
-            'name': 'First Food Eaten; P2 at (26,13)',
-            'snake1_body': [(cx - i, cy) for i in range(base_len + 1)],
-            'snake1_dir': Direction.LEFT,
-            'snake2_body': [(cx + 1, cy + 1), (cx + 2, cy + 1)],
-            'snake2_dir': Direction.LEFT,
-            'score1': cfg.STARTING_SCORE + pts1,
-            'score2': cfg.STARTING_SCORE - pts1,
-            'random_food': True,
-        },
-        {
-            'name': 'First Food Eaten; P2 at (27,14)',
-            'snake1_body': [(cx - i, cy) for i in range(base_len + 1)],
-            'snake1_dir': Direction.LEFT,
-            'snake2_body': [(cx + 2, cy + 2), (cx + 3, cy + 2)],
-            'snake2_dir': Direction.LEFT,
-            'score1': cfg.STARTING_SCORE + pts1,
-            'score2': cfg.STARTING_SCORE - pts1,
-            'random_food': True,
-        },
-        {
-            'name': 'First Food Eaten; P2 at (27,12)',
-            'snake1_body': [(cx - i, cy) for i in range(base_len + 1)],
-            'snake1_dir': Direction.LEFT,
-            'snake2_body': [(cx + 2, cy), (cx + 3, cy)],
-            'snake2_dir': Direction.LEFT,
-            'score1': cfg.STARTING_SCORE + pts1,
-            'score2': cfg.STARTING_SCORE - pts1,
-            'random_food': True,
-        },
-    ]
+DEFAULT_STRATEGIES = [
+    AggressiveAnticipationStrategy,
+    NoisyAdaptiveAggressiveStrategy,
+    SafeFoodSeekingStrategy,
+    SuperiorAdaptiveStrategy,
+]
+
+FIELDNAMES = [
+    'case', 'strategy1', 'strategy2', 'runs',
+    'wins1', 'wins2', 'win_rate1', 'win_rate2',
+    'avg_score1', 'avg_score2', 'max_length1', 'max_length2', 'avg_game_length',
+    'draws', 'pairing', 'se_win_rate1', 'cycles', 'stalls', 'ticks_saved'
+]
+
+
+def write_batch_csv(csv_file, cases, aggregates, crn):
+    """One row per (case, strategy1, strategy2), in the batch_results.csv format."""
+    with open(csv_file, 'w', newline='') as cf:
+        writer = csv.DictWriter(cf, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for case in cases:
+            mirror = crn and case.is_mirror_symmetric()
+            pairing = 'crn+mirror' if mirror else ('crn' if crn else 'independent')
+            for key, aggregate in aggregates.items():
+                if key[0] != case.name:
+                    continue
+                row = aggregate.to_row()
+                row['pairing'] = pairing
+                se = aggregate.se_win_rate1
+                row['se_win_rate1'] = f"{se:.4f}" if se is not None else ''
+                writer.writerow(row)
+    print(f"\nBatch results saved to {csv_file}")
+
+
+def write_markdown(md_file, strategies, cases):
+    with open(md_file, 'w') as mf:
+        mf.write('# AI Strategies\n\n')
+        for strat in strategies:
+            name = strat.__name__
+            desc = (strat.__doc__ or '').strip().replace('\n', ' ')
+            mf.write(f"- **{name}**: {desc}\n")
+        mf.write('\n# Initial Cases\n\n')
+        for case in cases:
+            mf.write(f"{case.id}. **{case.name}**: {case.description}\n")
+    print(f"Markdown summary saved to {md_file}")
+
+
+def interactive_main():
+    # numpy (mémoire partagée, appariements) seulement ici : les workers démarrés
+    # en mode spawn réimportent ce script
+    from src.simulation.shared_results import SharedResults
+    from src.simulation.pairing import paired_differences
+
+    strategies = DEFAULT_STRATEGIES
+
+    # Cases come from the scenario registry (src/common/scenarios.json)
+    cases = list(load_scenarios().values())
 
     # Prompt for runs
     while True:
@@ -206,73 +133,336 @@ def main():
         except ValueError:
             print('Invalid input; please enter an integer.')
 
+    # Variance reduction: game k of every match-up of a case shares the same food stream
+    # (common random numbers); symmetric cases also replay each seed with seats swapped
+    crn = input('Use common random numbers and mirrored pairing? (y/n): ').strip().lower() == 'y'
+    seed_text = input('Base seed (empty = random): ').strip()
+    base_seed = int(seed_text) if seed_text else random.getrandbits(32)
+    if crn:
+        print(f"Common random numbers enabled (seed={base_seed})")
+
     # Prepare output
     csv_file = os.path.join(ROOT, 'batch_results.csv')
+    paired_file = os.path.join(ROOT, 'batch_paired_differences.csv')
     md_file = os.path.join(ROOT, 'STRATEGIES_AND_CASES.md')
-    fieldnames = [
-        'case', 'strategy1', 'strategy2', 'runs',
-        'wins1', 'wins2', 'win_rate1', 'win_rate2',
-        'avg_score1', 'avg_score2', 'max_length1', 'max_length2', 'avg_game_length'
-    ]
-    # Run simulations and write CSV
-    with open(csv_file, 'w', newline='') as cf:
-        writer = csv.DictWriter(cf, fieldnames=fieldnames)
-        writer.writeheader()
-        for case_cfg in cases:
-            case_name = case_cfg['name']
-            print(f"\n=== Case: {case_name} ===")
-            for i, strat1 in enumerate(strategies):
-                for j, strat2 in enumerate(strategies):
-                    print(f"Running {strat_names[i]} vs {strat_names[j]} x{n}")
-                    # Accumulate metrics
-                    wins1 = wins2 = 0
-                    scores1 = []
-                    scores2 = []
-                    lengths1 = []
-                    lengths2 = []
-                    games = []
-                    for _ in range(n):
-                        m = simulate_one_game(case_cfg, strat1, strat2, cfg)
-                        wins1 += m['wins1']
-                        wins2 += m['wins2']
-                        scores1.append(m['avg_score1'])
-                        scores2.append(m['avg_score2'])
-                        lengths1.append(m['max_length1'])
-                        lengths2.append(m['max_length2'])
-                        games.append(m['game_length'])
-                    # Write row
-                    row = {
-                        'case': case_name,
-                        'strategy1': strat_names[i],
-                        'strategy2': strat_names[j],
-                        'runs': n,
-                        'wins1': wins1,
-                        'wins2': wins2,
-                        'win_rate1': f"{wins1/n:.3f}",
-                        'win_rate2': f"{wins2/n:.3f}",
-                        'avg_score1': f"{mean(scores1):.1f}",
-                        'avg_score2': f"{mean(scores2):.1f}",
-                        'max_length1': max(lengths1),
-                        'max_length2': max(lengths2),
-                        'avg_game_length': f"{mean(games):.1f}",
-                    }
-                    writer.writerow(row)
+    # Every case and match-up runs in one worker pool, with the runner's game rules;
+    # workers write each game's winner into shared memory instead of pickling it back
+    with SharedResults(tournament_cells(cases, strategies), n) as shared:
+        aggregates, winners = run_tournament(cases, strategies, n, seed=base_seed, crn=crn,
+                                             keep_outcomes=True, shared=shared)
+        # Per-seed outcome of strategy1 for every cell (copied out of the shared buffers)
+        mirrored = {case.name for case in cases if case.is_mirror_symmetric()}
+        outcomes = {key: per_seed_wins(winners[key], key[0] in mirrored) for key in aggregates}
+        del winners
+    write_batch_csv(csv_file, cases, aggregates, crn)
+    print_adjudications(aggregates)
 
-    print(f"\nBatch results saved to {csv_file}")
+    # Paired differences between strategies facing the same opponent
+    if crn:
+        paired_rows = paired_differences(outcomes)
+        with open(paired_file, 'w', newline='') as pf:
+            writer = csv.DictWriter(pf, fieldnames=list(paired_rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(paired_rows)
+        print(f"Paired differences saved to {paired_file}")
 
-    # Write Markdown summary
-    with open(md_file, 'w') as mf:
-        mf.write('# AI Strategies\n\n')
-        for strat in strategies:
-            name = type(strat).__name__
-            desc = (strat.__doc__ or '').strip().replace('\n', ' ')
-            mf.write(f"- **{name}**: {desc}\n")
-        mf.write('\n# Initial Cases\n\n')
-        mf.write('1. **Classic Start**: Both snakes start at opposite edges (length=2), first food at center.\n')
-        mf.write('2. **First Food Eaten; P2 at (26,13)**: P1 has eaten first food, head at (25,12) length=3; P2 head at (26,13) length=2; next food spawned randomly.\n')
-        mf.write('3. **First Food Eaten; P2 at (27,14)**: P1 as above; P2 head at (27,14) length=2; next food spawned randomly.\n')
-        mf.write('4. **First Food Eaten; P2 at (27,12)**: P1 as above; P2 head at (27,12) length=2; next food spawned randomly.\n')
-    print(f"Markdown summary saved to {md_file}")
+    write_markdown(md_file, strategies, cases)
+
+
+def select_scenarios(path, ids):
+    scenarios = load_scenarios(path)
+    if not ids:
+        return list(scenarios.values())
+    wanted = [int(i) for i in ids.split(',')]
+    unknown = [i for i in wanted if i not in scenarios]
+    if unknown:
+        raise SystemExit(f"Unknown scenario ids: {unknown} (available: {sorted(scenarios)})")
+    return [scenarios[i] for i in wanted]
+
+
+def run_command(args):
+    """Play one shard (all games by default) and write its partial-aggregate file."""
+    index, count = parse_shard(args.shard)
+    scenarios = select_scenarios(args.scenarios, args.ids)
+    strategies = resolve_strategies(args.strategies.split(',')) if args.strategies else DEFAULT_STRATEGIES
+    config = tournament_config(scenarios, strategies, args.games, args.seed, args.crn,
+                               args.block_size, count, not args.no_cycle_detection, args.stall_limit)
+    partial = run_shard(config, index, processes=args.processes, progress=not args.quiet,
+                        monitor=make_monitor(args, f'telemetry_shard_{index:05d}'),
+                        profile=make_profile(args), memory=make_memory(args),
+                        spectator=make_spectator(args))
+    if args.profile_dir:
+        print(f"Profile: {merge_profiles(args.profile_dir)}")
+    path = partial_path(args.out, index, count)
+    write_partial(partial, path)
+    print(f"Shard {index}/{count}: {partial['games']} games in {partial['elapsed_seconds']:.1f}s -> {path}")
+    if count == 1:
+        merge_command(argparse.Namespace(partials=[path], output=args.output, allow_missing=False))
+
+
+def merge_command(args):
+    """Combine shard files into batch_results.csv."""
+    partials = [load_partial(path) for path in args.partials]
+    config, aggregates = merge_partials(partials, allow_missing=args.allow_missing)
+    cases = [Scenario.from_dict(data) for data in config['scenarios']]
+    write_batch_csv(args.output, cases, aggregates, config['crn'])
+    expected = len(cases) * len(config['strategies']) ** 2 * config['games']
+    games = sum(aggregate.games for aggregate in aggregates.values())
+    print(f"Merged {len(partials)}/{config['num_shards']} shards: {games}/{expected} games")
+    print_adjudications(aggregates)
+
+
+def race_command(args):
+    """Adaptive allocation of a game budget to answer 'best' or 'rank'."""
+    from src.simulation.racing import race, format_race
+
+    scenarios = select_scenarios(args.scenarios, args.ids)
+    strategies = resolve_strategies(args.strategies.split(',')) if args.strategies else DEFAULT_STRATEGIES
+    result = race(scenarios, strategies, args.budget, args.question, seed=args.seed, crn=args.crn,
+                  delta=args.delta, block_size=args.block_size, processes=args.processes,
+                  detect_cycles=not args.no_cycle_detection, stall_limit=args.stall_limit,
+                  progress=not args.quiet)
+    print()
+    print(format_race(result, args.delta))
+    write_batch_csv(args.output, scenarios, result.aggregates, args.crn)
+    print_adjudications(result.aggregates)
+
+
+def rare_command(args):
+    """Probability of a rare outcome by multilevel splitting, optionally against plain simulation."""
+    from src.simulation.splitting import (
+        win_event, draw_event, split_estimate, brute_force_estimate, format_splitting
+    )
+
+    scenario = select_scenarios(args.scenarios, str(args.case))[0]
+    strategy1, strategy2 = resolve_strategies([args.strategy1, args.strategy2])
+    if args.event == 'draw':
+        event = draw_event(args.levels)
+    else:
+        player = int(args.event[-1])
+        event = win_event(player, args.levels, scenario.score1 if player == 1 else scenario.score2)
+    brute = None
+    if args.brute:
+        brute = brute_force_estimate(strategy1, strategy2, event, args.brute, scenario, seed=args.seed)
+        print(f"Plain simulation, {args.brute} games:")
+        print(format_splitting(brute))
+    result = split_estimate(strategy1, strategy2, event, scenario, args.effort, args.replications, args.seed,
+                            mean_game_ticks=brute and brute.mean_game_ticks)
+    print(f"Multilevel splitting, milestones {', '.join(f'{t:g}' for t in event.thresholds)}:")
+    print(format_splitting(result))
+
+
+def winprob_command(args):
+    """Simulate games and count their sampled positions into the win-probability table."""
+    from src.simulation.winprob import WinProbabilityTable, build_table
+
+    scenarios = select_scenarios(args.scenarios, args.ids)
+    strategies = resolve_strategies(args.strategies.split(',')) if args.strategies else DEFAULT_STRATEGIES
+    table = WinProbabilityTable.load(args.output) if args.extend and os.path.exists(args.output) else None
+    table = build_table(scenarios, strategies, args.games, args.seed, every=args.every,
+                        block_size=args.block_size, processes=args.processes, table=table,
+                        progress=not args.quiet)
+    table.save(args.output)
+    print(f"{table.positions:,} positions in {len(table.matchups)} match-ups -> {args.output}")
+
+
+def print_adjudications(aggregates):
+    """Early draws and ticks not simulated thanks to them."""
+    cycles = sum(aggregate.cycles for aggregate in aggregates.values())
+    stalls = sum(aggregate.stalls for aggregate in aggregates.values())
+    if cycles or stalls:
+        saved = sum(aggregate.ticks_saved for aggregate in aggregates.values())
+        played = sum(aggregate.sum_steps for aggregate in aggregates.values())
+        print(f"Early draws: {cycles} repeated positions, {stalls} without food; "
+              f"{saved:,} ticks saved ({saved / max(saved + played, 1):.0%} of the capped total)")
+
+
+def coordinator_command(args):
+    """Own the block queue; workers anywhere pull blocks and push back aggregates."""
+    scenarios = select_scenarios(args.scenarios, args.ids)
+    strategies = resolve_strategies(args.strategies.split(',')) if args.strategies else DEFAULT_STRATEGIES
+    jobs = plan_blocks(scenarios, strategies, args.games, args.seed, args.crn, args.block_size,
+                       detect_cycles=not args.no_cycle_detection, stall_limit=args.stall_limit)
+    address = parse_address(args.bind)
+    aggregates = run_coordinator(jobs, address, coordinator_authkey(address[0]), args.lease_timeout,
+                                 args.local_workers, progress=not args.quiet,
+                                 monitor=make_monitor(args, 'telemetry_coordinator'))
+    write_batch_csv(args.output, scenarios, aggregates, args.crn)
+    print_adjudications(aggregates)
+
+
+def worker_command(args):
+    address = parse_address(args.connect, default_host='localhost')
+    authkey = worker_authkey()
+    if args.processes == 1:
+        played = run_worker(address, authkey)
+        print(f"Worker done: {played} blocks")
+        return
+    workers = [multiprocessing.Process(target=run_worker, args=(address, authkey))
+               for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def make_spectator(args):
+    """Live view of one game at a time (--spectate); frames are dropped, never waited for."""
+    if not args.spectate:
+        return None
+    from src.simulation.spectate import Spectator
+    return Spectator()
+
+
+def make_monitor(args, name):
+    """Live telemetry (JSON lines + Prometheus text file) when --telemetry-dir is given."""
+    if not args.telemetry_dir:
+        return None
+    processes = getattr(args, 'processes', None) or getattr(args, 'local_workers', 0) or os.cpu_count() or 1
+    # Un slot par worker vivant ; marge pour le remplaçant d'un worker recyclé qui n'est pas encore sorti
+    slots = max(4 * (os.cpu_count() or 1), 2 * processes)
+    return Telemetry(args.telemetry_dir, interval=args.telemetry_interval, slots=slots, name=name)
+
+
+def make_profile(args):
+    """Sampled profiling of the workers when --profile-dir is given."""
+    if not args.profile_dir:
+        return None
+    return ProfileConfig(args.profile_dir, every=args.profile_every,
+                         fraction=None if args.profile_every else args.profile_fraction)
+
+
+def make_memory(args):
+    """Per-worker RSS / tracemalloc reports and memory budget (--memory-dir, --memory-budget-mb)."""
+    if not args.memory_dir and not args.memory_budget_mb:
+        return None
+    return MemoryConfig(args.memory_dir or os.path.join(args.out, 'memory'), interval=args.memory_interval,
+                        budget_mb=args.memory_budget_mb, tracemalloc=not args.no_tracemalloc)
+
+
+def add_tournament_arguments(parser):
+    parser.add_argument('--scenarios', default=SCENARIOS_FILE, help="scenario file (JSON)")
+    parser.add_argument('--ids', help="comma-separated scenario ids (default: all)")
+    parser.add_argument('--strategies', help="comma-separated strategy names (default: all four)")
+    parser.add_argument('--games', type=int, required=True, help="games per case and match-up")
+    parser.add_argument('--seed', type=int, required=True, help="base seed, identical on every shard")
+    parser.add_argument('--crn', action='store_true', help="common random numbers and mirrored pairing")
+    parser.add_argument('--block-size', type=int, default=250, help="games per work unit")
+    parser.add_argument('--no-cycle-detection', action='store_true',
+                        help="play repeated positions up to the step cap instead of calling a draw")
+    parser.add_argument('--stall-limit', type=int,
+                        help="call a draw after this many ticks without food (changes outcomes)")
+    parser.add_argument('--quiet', action='store_true', help="no progress bar")
+    parser.add_argument('--telemetry-dir', help="write <name>.jsonl and <name>.prom every few seconds")
+    parser.add_argument('--telemetry-interval', type=float, default=5.0, help="seconds between telemetry samples")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Headless batch simulations (no prompts).")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="play one shard of a tournament")
+    add_tournament_arguments(run)
+    run.add_argument('--shard', default='0/1', help="i/N: play the i-th of N slices (0-based)")
+    run.add_argument('--processes', type=int, help="worker processes (default: all cores)")
+    run.add_argument('--out', default='partials', help="directory of partial-aggregate files")
+    run.add_argument('--output', default=os.path.join(ROOT, 'batch_results.csv'),
+                     help="CSV written directly when there is a single shard")
+    run.add_argument('--spectate', action='store_true',
+                     help="open a window showing one live game of the run at a time")
+    run.add_argument('--memory-dir', help="per-worker RSS samples, tracemalloc top allocations, memory.txt")
+    run.add_argument('--memory-interval', type=float, default=60.0, help="seconds between memory snapshots")
+    run.add_argument('--memory-budget-mb', type=float,
+                     help="recycle a worker (keeping its partial results) before its RSS reaches this")
+    run.add_argument('--no-tracemalloc', action='store_true', help="RSS only (tracemalloc slows games down)")
+    run.add_argument('--profile-dir', help="profile a sample of the games (pstats + collapsed stacks)")
+    run.add_argument('--profile-every', type=int, default=0, help="profile games whose index is a multiple of N")
+    run.add_argument('--profile-fraction', type=float, default=0.02,
+                     help="otherwise keep profiled time under this share of wall time")
+    run.set_defaults(func=run_command)
+
+    coordinator = commands.add_parser('coordinator', help="serve a tournament's block queue to TCP workers")
+    add_tournament_arguments(coordinator)
+    coordinator.add_argument('--bind', default=f'{DEFAULT_HOST}:{DEFAULT_PORT}',
+                             help="host:port to listen on (default: loopback only; ':port' for all "
+                                  "interfaces, which requires CHAINDUEL_AUTHKEY)")
+    coordinator.add_argument('--lease-timeout', type=float, default=120.0,
+                             help="seconds without heartbeat before a block is re-queued")
+    coordinator.add_argument('--local-workers', type=int, default=0, help="worker processes started here")
+    coordinator.add_argument('--output', default=os.path.join(ROOT, 'batch_results.csv'))
+    coordinator.set_defaults(func=coordinator_command)
+
+    worker = commands.add_parser('worker', help="pull blocks from a coordinator")
+    worker.add_argument('--connect', required=True, help="coordinator host:port")
+    worker.add_argument('--processes', type=int, default=1, help="worker processes on this host")
+    worker.set_defaults(func=worker_command)
+
+    race = commands.add_parser('race', help="spend a game budget where the ranking is still uncertain")
+    race.add_argument('--scenarios', default=SCENARIOS_FILE, help="scenario file (JSON)")
+    race.add_argument('--ids', help="comma-separated scenario ids (default: all)")
+    race.add_argument('--strategies', help="comma-separated strategy names (default: all four)")
+    race.add_argument('--budget', type=int, required=True, help="maximum number of games in total")
+    race.add_argument('--question', choices=('best', 'rank'), default='best',
+                      help="best average win rate, or the full ranking")
+    race.add_argument('--delta', type=float, default=0.05, help="error level of the answer")
+    race.add_argument('--seed', type=int, help="base seed (same cells and games as 'run')")
+    race.add_argument('--crn', action='store_true', help="common random numbers and mirrored pairing")
+    race.add_argument('--block-size', type=int, default=50, help="games per allocation step and cell")
+    race.add_argument('--processes', type=int, help="worker processes (default: all cores)")
+    race.add_argument('--no-cycle-detection', action='store_true',
+                      help="play repeated positions up to the step cap instead of calling a draw")
+    race.add_argument('--stall-limit', type=int,
+                      help="call a draw after this many ticks without food (changes outcomes)")
+    race.add_argument('--quiet', action='store_true', help="no per-round progress")
+    race.add_argument('--output', default=os.path.join(ROOT, 'batch_results.csv'),
+                      help="CSV of the games played per cell")
+    race.set_defaults(func=race_command)
+
+    rare = commands.add_parser('rare', help="probability of a rare outcome by multilevel splitting")
+    rare.add_argument('strategy1', help="strategy name, with or without the Strategy suffix")
+    rare.add_argument('strategy2')
+    rare.add_argument('--event', choices=('win1', 'win2', 'draw'), default='win2',
+                      help="strategy1 wins, strategy2 wins, or the game reaches the step cap")
+    rare.add_argument('--levels', type=int, default=4, help="milestones on the way to the event")
+    rare.add_argument('--effort', type=int, default=200, help="trials per milestone")
+    rare.add_argument('--replications', type=int, default=10, help="independent runs (error bar)")
+    rare.add_argument('--scenarios', default=SCENARIOS_FILE, help="scenario file (JSON)")
+    rare.add_argument('--case', type=int, default=1, help="scenario id")
+    rare.add_argument('--seed', type=int, help="base seed")
+    rare.add_argument('--brute', type=int, default=0, help="also play this many plain games to compare")
+    rare.set_defaults(func=rare_command)
+
+    winprob = commands.add_parser('winprob', help="learn the win-probability table from simulated positions")
+    winprob.add_argument('--scenarios', default=SCENARIOS_FILE, help="scenario file (JSON)")
+    winprob.add_argument('--ids', help="comma-separated scenario ids (default: all)")
+    winprob.add_argument('--strategies', help="comma-separated strategy names (default: all four)")
+    winprob.add_argument('--games', type=int, required=True, help="games per case and match-up")
+    winprob.add_argument('--seed', type=int, required=True, help="base seed (same games as 'run')")
+    winprob.add_argument('--every', type=int, default=5, help="sample one position every N ticks")
+    winprob.add_argument('--block-size', type=int, default=200, help="games per work unit")
+    winprob.add_argument('--processes', type=int, help="worker processes (default: all cores)")
+    winprob.add_argument('--output', default=os.path.join(ROOT, 'win_probability.npz'))
+    winprob.add_argument('--extend', action='store_true', help="add to the counts of an existing table")
+    winprob.add_argument('--quiet', action='store_true', help="no progress bar")
+    winprob.set_defaults(func=winprob_command)
+
+    merge = commands.add_parser('merge', help="combine partial-aggregate files into a CSV")
+    merge.add_argument('partials', nargs='+', help="partial_*.json files")
+    merge.add_argument('--output', default=os.path.join(ROOT, 'batch_results.csv'))
+    merge.add_argument('--allow-missing', action='store_true', help="merge even if some shards are missing")
+    merge.set_defaults(func=merge_command)
+    return parser.parse_args(argv)
+
+
+def main():
+    if len(sys.argv) == 1:
+        interactive_main()
+        return
+    args = parse_args(sys.argv[1:])
+    try:
+        args.func(args)
+    except ValueError as error:
+        raise SystemExit(f"error: {error}")
 
 
 if __name__ == '__main__':  # noqa: C901
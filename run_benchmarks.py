@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the engine and strategy hot paths.
+
+    python run_benchmarks.py run -o benchmarks/baseline.json          # micro + macro + scaling + search + startup
+    python run_benchmarks.py run --quick --suite micro -o new.json
+    python run_benchmarks.py compare benchmarks/baseline.json new.json --threshold 0.10
+
+`compare` exits with status 1 when a benchmark got slower than the threshold
+(widened by the measured noise of both runs).
+"""
+import os
+import sys
+import argparse
+
+# Ensure src package is importable
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from src.common.scenarios import SCENARIOS_FILE, load_scenarios
+from src.simulation.benchmarks import (
+    micro_benchmarks, macro_benchmarks, scaling_benchmarks, startup_benchmarks, prefix_benchmarks,
+    search_benchmarks,
+    save_results, load_results, compare_results
+)
+from src.simulation.shards import resolve_strategies
+
+DEFAULT_STRATEGIES = [
+    'AggressiveAnticipationStrategy',
+    'NoisyAdaptiveAggressiveStrategy',
+    'SafeFoodSeekingStrategy',
+    'SuperiorAdaptiveStrategy',
+]
+
+
+def run_command(args):
+    scenarios = load_scenarios(args.scenarios)
+    if args.ids:
+        scenarios = {i: scenarios[i] for i in (int(i) for i in args.ids.split(','))}
+    scenarios = list(scenarios.values())
+    strategies = resolve_strategies(args.strategies.split(',') if args.strategies else DEFAULT_STRATEGIES)
+    repeats = 3 if args.quick else args.repeats
+    results = {}
+
+    if 'micro' in args.suite:
+        print("Micro-benchmarks...")
+        results.update(micro_benchmarks(strategies, scenarios[0], repeats=repeats,
+                                        min_time=0.05 if args.quick else 0.2))
+    if 'macro' in args.suite:
+        print("Macro-benchmarks...")
+        results.update(macro_benchmarks(scenarios, strategies, games=1 if args.quick else args.games,
+                                        seed=args.seed, repeats=1 if args.quick else repeats))
+    if 'scaling' in args.suite:
+        counts = [int(p) for p in args.processes.split(',')] if args.processes else scaling_counts()
+        print(f"Scaling curve ({counts} processes)...")
+        results.update(scaling_benchmarks(scenarios, strategies, counts,
+                                          games=2 if args.quick else args.games * 2, seed=args.seed))
+
+    if 'prefix' in args.suite:
+        print("Opening-prefix sharing (speedup and equivalence)...")
+        prefix = prefix_benchmarks(scenarios, strategies, games=2 if args.quick else args.games * 2,
+                                   seed=args.seed)
+        results.update(prefix)
+        different = [name for name, result in prefix.items() if not result['equivalent']]
+        if different:
+            print(f"NOT EQUIVALENT with prefix sharing: {', '.join(different)}")
+
+    if 'search' in args.suite:
+        print("Search (make/unmake vs copy per node)...")
+        results.update(search_benchmarks(scenarios[0], strategies, depth=2 if args.quick else 3,
+                                         repeats=repeats))
+
+    if 'startup' in args.suite:
+        print("Startup (process imports, pool workers)...")
+        results.update(startup_benchmarks(repeats=repeats, processes=min(2, os.cpu_count() or 1)))
+
+    print_results(results)
+    if args.output:
+        save_results(results, args.output)
+        print(f"\nBaseline saved to {args.output}")
+
+
+def scaling_counts():
+    """1, 2, 4, ... up to the number of cores (always ending with it)."""
+    cores = os.cpu_count() or 1
+    counts, processes = [], 1
+    while processes < cores:
+        counts.append(processes)
+        processes *= 2
+    return counts + [cores]
+
+
+def print_results(results):
+    width = max(len(name) for name in results) if results else 0
+    for name, result in results.items():
+        extra = ''
+        if 'ticks_per_sec' in result:
+            extra = f"  {result['ticks_per_sec']:,.0f} ticks/s"
+        elif 'nodes_per_sec' in result:
+            extra = (f"  {result['nodes_per_sec']:,} nodes/s  "
+                     f"{'identical' if result['equivalent'] else 'DIFFERENT'}")
+        elif 'prefix_ticks' in result:
+            extra = (f"  prefix {result['prefix_ticks']} ticks  speedup {result['speedup']:.2f}x  "
+                     f"(discovery {result['discovery'] * 1e3:.0f} ms once, amortised over "
+                     f"{result['games']} games {format_value(result['amortised'], 's/game')} = "
+                     f"{result['amortised_speedup']:.2f}x)  "
+                     f"{'identical' if result['equivalent'] else 'DIFFERENT'}")
+        elif 'speedup' in result:
+            extra = f"  speedup {result['speedup']:.2f}x  efficiency {result['efficiency']:.0%}"
+        elif 'heavy_modules' in result:
+            imports = f"  imports {result['import_seconds'] * 1e3:.0f} ms" if 'import_seconds' in result else ''
+            extra = f"{imports}  heavy: {', '.join(result['heavy_modules']) or 'none'}"
+        print(f"{name:<{width}}  {format_value(result['value'], result['unit'])}"
+              f"  (±{result['stdev'] / result['value'] * 100 if result['value'] else 0:.1f}%){extra}")
+
+
+def format_value(value, unit):
+    if unit.startswith('s/call') or unit == 's/node':
+        return f"{value * 1e6:10.2f} µs/{unit.split('/', 1)[1]}"
+    return f"{value * 1e3:10.2f} ms/{unit.split('/', 1)[1]}"
+
+
+def compare_command(args):
+    rows = compare_results(load_results(args.baseline), load_results(args.current),
+                           threshold=args.threshold, noise_factor=args.noise_factor)
+    width = max((len(row['name']) for row in rows), default=0)
+    for row in rows:
+        marker = {'regression': '!!', 'improvement': '++'}.get(row['status'], '  ')
+        print(f"{marker} {row['name']:<{width}}  {row['change'] * 100:+7.1f}%  (limit ±{row['limit'] * 100:.1f}%)  {row['status']}")
+    regressions = [row for row in rows if row['status'] == 'regression']
+    print(f"\n{len(rows)} benchmarks compared, {len(regressions)} regression(s)")
+    if regressions:
+        sys.exit(1)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Engine and strategy benchmarks with JSON baselines.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run the benchmarks")
+    run.add_argument('--suite', default='micro,macro,scaling,search,startup',
+                     help="comma-separated: micro, macro, scaling, startup, prefix, search "
+                          "(default: micro,macro,scaling,search,startup)")
+    run.add_argument('--scenarios', default=SCENARIOS_FILE, help="scenario file (JSON)")
+    run.add_argument('--ids', help="comma-separated scenario ids (default: all)")
+    run.add_argument('--strategies', help="comma-separated strategy names (default: all four)")
+    run.add_argument('--games', type=int, default=4, help="seeded games per match-up and case (macro)")
+    run.add_argument('--seed', type=int, default=1)
+    run.add_argument('--repeats', type=int, default=5, help="repeats per benchmark")
+    run.add_argument('--processes', help="process counts of the scaling curve, e.g. 1,2,4,8")
+    run.add_argument('--quick', action='store_true', help="short run (smoke test, noisy)")
+    run.add_argument('-o', '--output', help="JSON baseline to write")
+    run.set_defaults(func=run_command)
+
+    compare = commands.add_parser('compare', help="compare two JSON baselines")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10, help="relative slowdown flagged (0.10 = 10%%)")
+    compare.add_argument('--noise-factor', type=float, default=2.0,
+                         help="the threshold is widened to this many times the measured spread")
+    compare.set_defaults(func=compare_command)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    args.suite = args.suite.split(',') if hasattr(args, 'suite') else None
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# src/simulation/aggregate.py
+from dataclasses import dataclass, asdict
+from typing import Dict, NamedTuple, Optional
+
+from ..core.adjudication import CYCLE
+
+
+class GameResult(NamedTuple):
+    """Outcome of one game, always seen from strategy1's side (whatever the seat)."""
+    game_index: int
+    seed: Optional[int]
+    winner: int  # 1, 2, or 0 for a draw
+    score1: int
+    score2: int
+    length1: int
+    length2: int
+    steps: int
+    resets1: int
+    resets2: int
+    mirrored: bool = False
+    adjudication: int = 0   # 0, or CYCLE / STALL (core.adjudication) for an early draw
+    ticks_saved: int = 0    # step cap minus the ticks played, for adjudicated games
+
+
+@dataclass
+class MatchupAggregate:
+    """Mergeable per-matchup counters: what survives a block of games."""
+    case: str
+    strategy1: str
+    strategy2: str
+    games: int = 0
+    wins1: int = 0
+    wins2: int = 0
+    draws: int = 0
+    sum_score1: int = 0
+    sum_score2: int = 0
+    max_length1: int = 0
+    max_length2: int = 0
+    sum_steps: int = 0
+    sum_resets1: int = 0
+    sum_resets2: int = 0
+    # Indicateur de victoire de strategy1 par seed (moyenne des deux sièges en miroir)
+    seeds: int = 0
+    sum_seed_wins1: float = 0.0
+    sum_sq_seed_wins1: float = 0.0
+    # Nuls déclarés avant la limite de ticks (répétition exacte, ou pas de nourriture)
+    cycles: int = 0
+    stalls: int = 0
+    ticks_saved: int = 0
+
+    @property
+    def key(self):
+        return (self.case, self.strategy1, self.strategy2)
+
+    def add(self, result: GameResult) -> None:
+        self.games += 1
+        if result.winner == 1:
+            self.wins1 += 1
+        elif result.winner == 2:
+            self.wins2 += 1
+        else:
+            self.draws += 1
+        self.sum_score1 += result.score1
+        self.sum_score2 += result.score2
+        self.max_length1 = max(self.max_length1, result.length1)
+        self.max_length2 = max(self.max_length2, result.length2)
+        self.sum_steps += result.steps
+        self.sum_resets1 += result.resets1
+        self.sum_resets2 += result.resets2
+        if result.adjudication:
+            if result.adjudication == CYCLE:
+                self.cycles += 1
+            else:
+                self.stalls += 1
+            self.ticks_saved += result.ticks_saved
+
+    def add_seed(self, win1: float) -> None:
+        self.seeds += 1
+        self.sum_seed_wins1 += win1
+        self.sum_sq_seed_wins1 += win1 * win1
+
+    @property
+    def se_win_rate1(self) -> Optional[float]:
+        """Standard error of strategy1's win rate over seeds (None below two seeds)."""
+        if self.seeds < 2:
+            return None
+        mean = self.sum_seed_wins1 / self.seeds
+        variance = max(0.0, (self.sum_sq_seed_wins1 - self.seeds * mean * mean) / (self.seeds - 1))
+        return (variance / self.seeds) ** 0.5
+
+    def merge(self, other: 'MatchupAggregate') -> 'MatchupAggregate':
+        if other.key != self.key:
+            raise ValueError(f"Cannot merge {other.key} into {self.key}")
+        for name in ('games', 'wins1', 'wins2', 'draws', 'sum_score1', 'sum_score2',
+                     'sum_steps', 'sum_resets1', 'sum_resets2',
+                     'seeds', 'sum_seed_wins1', 'sum_sq_seed_wins1', 'cycles', 'stalls', 'ticks_saved'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.max_length1 = max(self.max_length1, other.max_length1)
+        self.max_length2 = max(self.max_length2, other.max_length2)
+        return self
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MatchupAggregate':
+        return cls(**data)
+
+    def to_row(self) -> Dict:
+        """Row in the batch_results.csv format."""
+        n = max(self.games, 1)
+        return {
+            'case': self.case,
+            'strategy1': self.strategy1,
+            'strategy2': self.strategy2,
+            'runs': self.games,
+            'wins1': self.wins1,
+            'wins2': self.wins2,
+            'win_rate1': f"{self.wins1 / n:.3f}",
+            'win_rate2': f"{self.wins2 / n:.3f}",
+            'avg_score1': f"{self.sum_score1 / n:.1f}",
+            'avg_score2': f"{self.sum_score2 / n:.1f}",
+            'max_length1': self.max_length1,
+            'max_length2': self.max_length2,
+            'avg_game_length': f"{self.sum_steps / n:.1f}",
+            'draws': self.draws,
+            'cycles': self.cycles,
+            'stalls': self.stalls,
+            'ticks_saved': self.ticks_saved,
+        }
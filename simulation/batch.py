@@ -0,0 +1,275 @@
+# src/simulation/batch.py
+"""
+Tournament over several scenarios with one warm worker pool.
+
+Every (scenario, strategy1, strategy2) cell is cut into blocks of games.
+A block carries everything a worker needs (scenario data, strategy classes,
+seed, game range), so the same pool runs every case and generated scenario
+without reimporting or restarting anything.
+"""
+import multiprocessing
+import random
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from ..common.rng import derive_seed
+from ..common.scenarios import Scenario
+from .aggregate import MatchupAggregate
+from .runner import ScenarioSimulationRunner
+from . import telemetry
+from .profiling import ProfileConfig, flush_profilers, merge_profiles
+from .memory import MemoryConfig, get_memory_monitor, recycling_imap, write_memory_summary
+
+# numpy n'est chargé que pour keep_outcomes / la mémoire partagée (démarrage des workers)
+if TYPE_CHECKING:
+    import numpy as np
+    from .shared_results import SharedResults, SharedResultsSpec
+
+CellKey = Tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class BlockJob:
+    """Games [start, stop) of one (scenario, strategy1, strategy2) cell."""
+    scenario: Scenario
+    strategy1_class: type
+    strategy2_class: type
+    seed: int
+    start: int
+    stop: int
+    crn: bool = False
+    mirror: bool = False
+    results_dir: Optional[str] = None
+    keep_outcomes: bool = False
+    profile: Optional[ProfileConfig] = None
+    memory: Optional[MemoryConfig] = None
+    shared: Optional['SharedResultsSpec'] = None
+    detect_cycles: bool = True
+    stall_limit: Optional[int] = None
+
+    @property
+    def key(self) -> CellKey:
+        return (self.scenario.name, self.strategy1_class.__name__, self.strategy2_class.__name__)
+
+
+def cell_seed(seed: int, scenario: Scenario, i: int, j: int, crn: bool) -> int:
+    """
+    Seed of one cell. Under common random numbers every match-up of a
+    scenario shares the seed, hence the same food stream for game k.
+    """
+    if crn:
+        return derive_seed(seed, scenario.id)
+    return derive_seed(seed, scenario.id, i, j)
+
+
+def plan_blocks(scenarios: Sequence[Scenario], strategies: Sequence[type], num_runs: int,
+                seed: int, crn: bool = False, block_size: int = 250,
+                results_dir: Optional[str] = None, keep_outcomes: bool = False,
+                profile: Optional[ProfileConfig] = None,
+                memory: Optional[MemoryConfig] = None,
+                shared: Optional['SharedResultsSpec'] = None, detect_cycles: bool = True,
+                stall_limit: Optional[int] = None) -> List[BlockJob]:
+    """All blocks of a tournament, in a deterministic order."""
+    jobs = []
+    for scenario in scenarios:
+        mirror = crn and scenario.is_mirror_symmetric()
+        # En miroir, une paire (2k, 2k+1) ne doit jamais être coupée entre deux blocs
+        size = block_size + (block_size % 2) if mirror else block_size
+        for i, strategy1_class in enumerate(strategies):
+            for j, strategy2_class in enumerate(strategies):
+                for start in range(0, num_runs, size):
+                    jobs.append(BlockJob(scenario, strategy1_class, strategy2_class,
+                                         cell_seed(seed, scenario, i, j, crn),
+                                         start, min(start + size, num_runs),
+                                         crn, mirror, results_dir, keep_outcomes, profile, memory,
+                                         shared, detect_cycles, stall_limit))
+    return jobs
+
+
+def tournament_cells(scenarios: Sequence[Scenario], strategies: Sequence[type]) -> List[CellKey]:
+    """Cell keys of a tournament, in plan_blocks order (rows of SharedResults)."""
+    return [(scenario.name, strategy1_class.__name__, strategy2_class.__name__)
+            for scenario in scenarios
+            for strategy1_class in strategies
+            for strategy2_class in strategies]
+
+
+def run_block(job: BlockJob) -> Tuple[CellKey, int, MatchupAggregate, Optional['np.ndarray']]:
+    """Play one block; returns its aggregate and, if asked, the winner of every game."""
+    runner = ScenarioSimulationRunner(job.strategy1_class, job.strategy2_class,
+                                      num_runs=job.stop - job.start, silent=True,
+                                      seed=job.seed, results_dir=job.results_dir,
+                                      crn=job.crn, mirror=job.mirror, scenario=job.scenario,
+                                      profile=job.profile, memory=job.memory,
+                                      detect_cycles=job.detect_cycles, stall_limit=job.stall_limit)
+    monitor = get_memory_monitor(job.memory) if job.memory and job.memory.budget_mb else None
+    aggregate = MatchupAggregate(*job.key)
+    winners = None
+    if job.keep_outcomes:
+        import numpy as np
+        winners = np.zeros(job.stop - job.start, dtype=np.int8)
+    if job.shared:
+        from .shared_results import attach
+        shared = attach(job.shared)
+        cell = shared.cell_index[job.key]
+    pending = []
+    for game_index in range(job.start, job.stop):
+        started = time.perf_counter()
+        result = runner.play_game(game_index)
+        telemetry.record_game(result.steps, time.perf_counter() - started)
+        aggregate.add(result)
+        if job.shared:
+            shared.write(cell, result)
+        if winners is not None:
+            winners[game_index - job.start] = result.winner
+        # Une seed = une partie, ou une paire de parties sièges inversés en miroir
+        pending.append(1.0 if result.winner == 1 else 0.0)
+        if not job.mirror or len(pending) == 2:
+            aggregate.add_seed(sum(pending) / len(pending))
+            pending = []
+            # Proche du budget mémoire : on rend le bloc partiel, le reste est remis en file
+            if monitor and game_index + 1 < job.stop and monitor.over_budget():
+                winners = winners[:aggregate.games] if winners is not None else None
+                break
+    telemetry.flush()
+    if job.profile:
+        flush_profilers()
+    return job.key, job.start, aggregate, winners
+
+
+def remaining_block(job: BlockJob, result) -> Optional[BlockJob]:
+    """Games of a block stopped early (memory budget) that still have to be played."""
+    played = result[2].games
+    if job.start + played >= job.stop:
+        return None
+    return replace(job, start=job.start + played)
+
+
+def init_workers(*setups) -> None:
+    """Pool initializer running several (initializer, initargs) pairs."""
+    for initializer, initargs in setups:
+        initializer(*initargs)
+
+
+def worker_setup(*helpers) -> Tuple:
+    """Pool (initializer, initargs) for parent-side helpers (Telemetry, Spectator) that may be None."""
+    setups = tuple((helper.initializer, helper.initargs) for helper in helpers if helper)
+    if len(setups) <= 1:
+        return setups[0] if setups else (None, ())
+    return init_workers, setups
+
+
+def block_results(jobs: Sequence[BlockJob], processes: Optional[int] = None, initializer=None,
+                  initargs=(), memory: Optional[MemoryConfig] = None):
+    """
+    Yield run_block results in completion order: in-process for processes=1,
+    a multiprocessing pool otherwise, or recycled workers under a memory budget.
+    """
+    if processes == 1:
+        if initializer:
+            initializer(*initargs)
+        for job in jobs:
+            result = run_block(job)
+            yield result
+            rest = remaining_block(job, result)
+            while rest is not None:
+                result = run_block(rest)
+                yield result
+                rest = remaining_block(rest, result)
+    elif memory and memory.budget_mb:
+        yield from recycling_imap(run_block, jobs, processes, memory, remaining_block,
+                                  initializer, initargs)
+    else:
+        with multiprocessing.Pool(processes=processes, initializer=initializer, initargs=initargs) as pool:
+            yield from pool.imap_unordered(run_block, jobs)
+
+
+def collect(results: Iterable[Tuple[CellKey, int, MatchupAggregate, Optional['np.ndarray']]],
+            num_runs: int, keep_outcomes: bool = False):
+    """Merge block results into per-cell aggregates (and per-game winners)."""
+    aggregates: Dict[CellKey, MatchupAggregate] = {}
+    outcomes: Dict[CellKey, 'np.ndarray'] = {}
+    for key, start, aggregate, winners in results:
+        if key in aggregates:
+            aggregates[key].merge(aggregate)
+        else:
+            aggregates[key] = aggregate
+        if keep_outcomes and winners is not None:
+            if key not in outcomes:
+                import numpy as np
+                outcomes[key] = np.zeros(num_runs, dtype=np.int8)
+            cell = outcomes[key]
+            cell[start:start + len(winners)] = winners
+    return aggregates, outcomes
+
+
+def run_tournament(scenarios: Sequence[Scenario], strategies: Sequence[type], num_runs: int,
+                   seed: Optional[int] = None, crn: bool = False, processes: Optional[int] = None,
+                   block_size: int = 250, results_dir: Optional[str] = None,
+                   keep_outcomes: bool = False, progress: bool = True,
+                   monitor: Optional[telemetry.Telemetry] = None,
+                   profile: Optional[ProfileConfig] = None,
+                   memory: Optional[MemoryConfig] = None,
+                   shared: Optional['SharedResults'] = None, detect_cycles: bool = True,
+                   stall_limit: Optional[int] = None, spectator=None):
+    """
+    Run every scenario and match-up in one pool.
+    Returns ({(case, strategy1, strategy2): MatchupAggregate}, {key: winners}),
+    ordered like the scenarios and strategies given. `monitor` streams live
+    throughput (see telemetry.Telemetry); `profile` profiles a sample of the
+    games in every worker and merges the profiles at the end; `memory`
+    samples RSS / tracemalloc per worker and recycles workers over budget.
+    With `shared` (see tournament_cells), workers write every game into the
+    shared buffers and the outcomes returned are views of its winner column.
+    Repeated positions end as draws unless detect_cycles is False;
+    `stall_limit` also ends games after that many ticks without food.
+    `spectator` (see spectate.Spectator) streams one live game at a time
+    to its viewer window.
+    """
+    from tqdm import tqdm
+
+    if seed is None:
+        seed = random.getrandbits(63)
+    if memory and memory.directory is None:
+        raise ValueError("MemoryConfig.directory is required for a tournament")
+    if shared and shared.spec.games < num_runs:
+        raise ValueError(f"Shared buffers hold {shared.spec.games} games per cell, {num_runs} requested")
+    jobs = plan_blocks(scenarios, strategies, num_runs, seed, crn, block_size, results_dir,
+                       keep_outcomes and not shared, profile, memory, shared and shared.spec,
+                       detect_cycles, stall_limit)
+    if shared and any(job.key not in shared.cell_index for job in jobs):
+        raise ValueError("Shared buffers do not cover every cell of the tournament")
+    total = len(scenarios) * len(strategies) ** 2 * num_runs
+    with tqdm(total=total, desc="Tournament", unit="game", dynamic_ncols=True,
+              disable=not progress) as progress_bar:
+        def tracked(results):
+            for result in results:
+                progress_bar.update(result[2].games)
+                if monitor:
+                    monitor.block_done(result[2])
+                yield result
+
+        initializer, initargs = worker_setup(monitor, spectator)
+        if monitor:
+            monitor.start(len(jobs))
+        if spectator:
+            spectator.start()
+        try:
+            results = block_results(jobs, processes, initializer, initargs, memory)
+            aggregates, outcomes = collect(tracked(results), num_runs, keep_outcomes)
+        finally:
+            if monitor:
+                monitor.stop()
+            if spectator:
+                spectator.stop()
+    if profile:
+        merge_profiles(profile.directory)
+    if memory:
+        write_memory_summary(memory.directory)
+
+    order = list(dict.fromkeys(job.key for job in jobs))
+    if shared and keep_outcomes:
+        outcomes = {key: shared.column('winner', key)[:num_runs] for key in order}
+    return ({key: aggregates[key] for key in order if key in aggregates},
+            {key: outcomes[key] for key in order if key in outcomes})
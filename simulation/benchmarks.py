@@ -0,0 +1,456 @@
+# src/simulation/benchmarks.py
+"""
+Benchmark suite for the engine and strategy hot paths.
+
+- micro: Snake.move, MovementHistory.would_oscillate, PathFinder.find_path on
+  crafted boards, get_next_move of every strategy on fixed positions;
+- macro: full games per match-up per scenario (seconds per game, ticks/s);
+- scaling: the pool path (batch.run_tournament) with 1..N processes;
+- prefix: games with and without opening-prefix sharing (speedup, and a
+  check that every GameResult is identical);
+- search: full-width joint-move tree search with make_move/unmake_move
+  against copying snakes and states per node (nodes/s, same leaf values);
+- startup: interpreter + import time of the headless entry points, and the
+  time for a pool of each start method (fork, spawn, ...) to be ready.
+
+Every result is {'value': median, 'unit', 'min', 'max', 'stdev', ...} where
+a lower value is better. Results are saved as JSON baselines and two files
+are compared with a noise-aware threshold (compare_results).
+"""
+import copy
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence
+
+from ..common.constants import GameConfig
+from ..common.enums import Direction
+from ..common.scenarios import Scenario
+from ..core.engine import GameEngine
+from ..core.game_state import GameState
+from ..core.snake import Snake
+from ..strategies.ai import MovementHistory, PathFinder
+from .runner import ScenarioSimulationRunner
+
+
+def measure(func: Callable[[], object], repeats: int = 5, min_time: float = 0.2) -> Dict:
+    """
+    Time `func` per call: the call count is calibrated so that one repeat
+    lasts at least `min_time`, then `repeats` repeats are taken.
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 4 or number >= 1 << 24:
+            break
+        number *= 4
+    number = max(1, int(number * (min_time / max(elapsed, 1e-9))))
+
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    return summarize(samples, unit='s/call', number=number)
+
+
+def summarize(samples: Sequence[float], unit: str, **extra) -> Dict:
+    return {
+        'value': statistics.median(samples),
+        'unit': unit,
+        'min': min(samples),
+        'max': max(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'samples': list(samples),
+        **extra,
+    }
+
+
+# --- Plateaux de test -------------------------------------------------------
+
+def open_board(config: GameConfig):
+    """Empty board, corner to corner."""
+    return (0, 0), (config.GRID_WIDTH - 1, config.GRID_HEIGHT - 1), set()
+
+
+def wall_board(config: GameConfig):
+    """Vertical wall in the middle with a single gap at the bottom."""
+    x = config.GRID_WIDTH // 2
+    blocked = {(x, y) for y in range(config.GRID_HEIGHT - 1)}
+    return (2, 2), (config.GRID_WIDTH - 3, 2), blocked
+
+
+def enclosed_board(config: GameConfig):
+    """Unreachable goal: the whole reachable area is explored."""
+    gx, gy = config.GRID_WIDTH - 5, config.GRID_HEIGHT // 2
+    blocked = {(gx + dx, gy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)}
+    return (0, 0), (gx, gy), blocked
+
+
+BOARDS = {'open': open_board, 'wall': wall_board, 'enclosed': enclosed_board}
+
+
+def midgame_state(scenario: Scenario, strategy1_class, strategy2_class, seed: int = 1,
+                  steps: int = 200) -> GameState:
+    """Position reached after `steps` ticks of a seeded game (longer snakes than the start)."""
+    runner = ScenarioSimulationRunner(strategy1_class, strategy2_class, num_runs=1, silent=True,
+                                      seed=seed, scenario=scenario)
+    random.seed(runner.game_seed(0))
+    engine = runner.init_engine(None)
+    strategy1, strategy2 = strategy1_class(), strategy2_class()
+    for _ in range(steps):
+        engine.step(strategy1.get_next_move(engine.state, 1), strategy2.get_next_move(engine.state, 2))
+        if engine.winner:
+            break
+    state = engine.state
+    return GameState(list(state.snake1), list(state.snake2), state.food_position,
+                     state.grid_width, state.grid_height, state.score1, state.score2)
+
+
+# --- Suites -------------------------------------------------------------------
+
+def micro_benchmarks(strategies: Sequence[type], scenario: Scenario, repeats: int = 5,
+                     min_time: float = 0.2) -> Dict[str, Dict]:
+    config = GameConfig()
+    results = {}
+
+    body = [(20 - i, 12) for i in range(12)]
+    other = Snake([(40 + i, 5) for i in range(6)], Direction.LEFT)
+    snake = Snake(list(body), Direction.RIGHT)
+
+    def snake_move():
+        snake.body = body.copy()
+        snake.move(config.GRID_WIDTH, config.GRID_HEIGHT, other)
+
+    results['micro/Snake.move'] = measure(snake_move, repeats, min_time)
+
+    history = MovementHistory()
+    for direction in (Direction.UP, Direction.LEFT, Direction.UP, Direction.LEFT):
+        history.add_move(direction)
+    directions = list(Direction)
+
+    def would_oscillate():
+        for direction in directions:
+            history.would_oscillate(direction)
+
+    results['micro/MovementHistory.would_oscillate'] = measure(would_oscillate, repeats, min_time)
+    results['micro/MovementHistory.would_oscillate']['calls_per_iteration'] = len(directions)
+
+    for name, board in BOARDS.items():
+        start, goal, blocked = board(config)
+        results[f'micro/PathFinder.find_path[{name}]'] = measure(
+            lambda: PathFinder.find_path(start, goal, blocked, config.GRID_WIDTH, config.GRID_HEIGHT),
+            repeats, min_time)
+
+    positions = {'start': None, 'midgame': midgame_state(scenario, strategies[0], strategies[-1])}
+    for strategy_class in strategies:
+        for position, state in positions.items():
+            if state is None:
+                state = GameState(list(scenario.snake1), list(scenario.snake2),
+                                  scenario.food_position or (config.GRID_WIDTH // 2, config.GRID_HEIGHT // 2),
+                                  config.GRID_WIDTH, config.GRID_HEIGHT, scenario.score1, scenario.score2)
+            strategy = strategy_class()
+
+            def next_move(strategy=strategy, state=state):
+                # Historique vidé : chaque appel part de la même situation
+                strategy.movement_history.history.clear()
+                strategy.get_next_move(state, 1)
+
+            random.seed(0)
+            results[f'micro/{strategy_class.__name__}.get_next_move[{position}]'] = measure(
+                next_move, repeats, min_time)
+    return results
+
+
+def macro_benchmarks(scenarios: Sequence[Scenario], strategies: Sequence[type], games: int = 4,
+                     seed: int = 1, repeats: int = 3) -> Dict[str, Dict]:
+    """
+    The same seeded games played in-process `repeats` times; value is the
+    median over repeats of the mean seconds per game.
+    """
+    results = {}
+    for scenario in scenarios:
+        for strategy1_class in strategies:
+            for strategy2_class in strategies:
+                runner = ScenarioSimulationRunner(strategy1_class, strategy2_class, num_runs=games,
+                                                  silent=True, seed=seed, scenario=scenario)
+                samples, steps = [], 0
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    steps = sum(runner.play_game(game_index).steps for game_index in range(games))
+                    samples.append((time.perf_counter() - started) / games)
+                name = f'macro/{scenario.id}/{strategy1_class.__name__}-vs-{strategy2_class.__name__}'
+                results[name] = summarize(samples, unit='s/game', games=games, ticks=steps,
+                                          ticks_per_sec=round(steps / games / statistics.median(samples), 1))
+    return results
+
+
+def prefix_benchmarks(scenarios: Sequence[Scenario], strategies: Sequence[type], games: int = 8,
+                      seed: int = 1, crn: bool = False) -> Dict[str, Dict]:
+    """
+    The same seeded games with share_prefix off then on. value is the time per
+    game with sharing, once the opening is known: its one-off discovery is
+    timed apart (`discovery`) and spread over the games in `amortised`, so a
+    short run does not report the discovery as a slowdown. `equivalent` is
+    False if any GameResult differs.
+    """
+    results = {}
+    for scenario in scenarios:
+        mirror = crn and scenario.is_mirror_symmetric()
+        for strategy1_class in strategies:
+            for strategy2_class in strategies:
+                timings, outcomes, prefix, discovery = [], [], 0, 0.0
+                for share_prefix in (False, True):
+                    runner = ScenarioSimulationRunner(strategy1_class, strategy2_class, num_runs=games,
+                                                      silent=True, seed=seed, scenario=scenario, crn=crn,
+                                                      mirror=mirror, share_prefix=share_prefix)
+                    if share_prefix:
+                        # Découverte de l'ouverture (une fois par placement) hors de la boucle chronométrée
+                        started = time.perf_counter()
+                        opening = runner.opening(False)
+                        if mirror:
+                            runner.opening(True)
+                        discovery = time.perf_counter() - started
+                        prefix = opening.steps if opening else 0
+                    started = time.perf_counter()
+                    outcomes.append([runner.play_game(game_index) for game_index in range(games)])
+                    timings.append((time.perf_counter() - started) / games)
+                name = f'prefix/{scenario.id}/{strategy1_class.__name__}-vs-{strategy2_class.__name__}'
+                amortised = timings[1] + discovery / games
+                results[name] = summarize([timings[1]], unit='s/game', games=games, prefix_ticks=prefix,
+                                          baseline=timings[0], speedup=round(timings[0] / timings[1], 3),
+                                          discovery=discovery, amortised=amortised,
+                                          amortised_speedup=round(timings[0] / amortised, 3),
+                                          equivalent=outcomes[0] == outcomes[1])
+    return results
+
+
+def first_free_cell(config: GameConfig):
+    """Deterministic food placer for searches (no RNG drawn inside the tree)."""
+    cells = [(x, y) for y in range(config.GRID_HEIGHT) for x in range(config.GRID_WIDTH)]
+
+    def place_food(snake1, snake2):
+        return next(cell for cell in cells if cell not in snake1 and cell not in snake2)
+    return place_food
+
+
+def _search_in_place(engine: GameEngine, depth: int, directions) -> tuple:
+    if depth == 0:
+        return 1, engine.state.score1 - engine.state.score2
+    nodes, total = 1, 0
+    for direction1 in directions:
+        for direction2 in directions:
+            engine.make_move(direction1, direction2)
+            child_nodes, value = _search_in_place(engine, depth - 1, directions)
+            engine.unmake_move()
+            nodes += child_nodes
+            total += value
+    return nodes, total
+
+
+def _copy_engine(engine: GameEngine) -> GameEngine:
+    # Ce que ferait une recherche sans make/unmake : Snake.copy() et nouveau GameState par nœud
+    child = copy.copy(engine)
+    child.snake1, child.snake2 = engine.snake1.copy(), engine.snake2.copy()
+    state = engine.state
+    child.state = GameState(child.snake1.body, child.snake2.body, state.food_position,
+                            state.grid_width, state.grid_height, state.score1, state.score2)
+    return child
+
+
+def _search_copying(engine: GameEngine, depth: int, directions) -> tuple:
+    if depth == 0:
+        return 1, engine.state.score1 - engine.state.score2
+    nodes, total = 1, 0
+    for direction1 in directions:
+        for direction2 in directions:
+            child = _copy_engine(engine)
+            child.step(direction1, direction2)
+            child_nodes, value = _search_copying(child, depth - 1, directions)
+            nodes += child_nodes
+            total += value
+    return nodes, total
+
+
+def search_benchmarks(scenario: Scenario, strategies: Sequence[type], depth: int = 2,
+                      repeats: int = 5) -> Dict[str, Dict]:
+    """
+    The same depth-limited tree (all 16 joint moves per node) from a midgame
+    position, once with make_move/unmake_move and once copying per node.
+    value is seconds per node; `equivalent` is False if the trees differ.
+    """
+    config = GameConfig()
+    state = midgame_state(scenario, strategies[0], strategies[-1])
+    engine = GameEngine(state.snake1, state.snake2, scenario.direction1, scenario.direction2,
+                        state.food_position, state.score1, state.score2, first_free_cell(config), config,
+                        reset1=(scenario.reset1, scenario.reset_direction1),
+                        reset2=(scenario.reset2, scenario.reset_direction2))
+    directions = list(Direction)
+    start = engine.keyframe()
+    results, trees = {}, {}
+    for name, search in (('make-unmake', _search_in_place), ('copy', _search_copying)):
+        samples = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            trees[name] = search(engine, depth, directions)
+            samples.append((time.perf_counter() - started) / trees[name][0])
+        results[f'search/{name}[depth={depth}]'] = summarize(
+            samples, unit='s/node', nodes=trees[name][0],
+            nodes_per_sec=round(1 / statistics.median(samples)))
+    equivalent = trees['make-unmake'] == trees['copy'] and engine.keyframe() == start
+    for result in results.values():
+        result['equivalent'] = equivalent
+    return results
+
+
+def scaling_benchmarks(scenarios: Sequence[Scenario], strategies: Sequence[type],
+                       process_counts: Sequence[int], games: int = 8, seed: int = 1,
+                       block_size: int = 4) -> Dict[str, Dict]:
+    """Wall time of the same tournament with the pool path at several process counts."""
+    from .batch import run_tournament
+
+    results = {}
+    reference = None
+    for processes in process_counts:
+        started = time.perf_counter()
+        aggregates, _ = run_tournament(scenarios, strategies, games, seed=seed, processes=processes,
+                                       block_size=block_size, progress=False)
+        wall = time.perf_counter() - started
+        total = sum(aggregate.games for aggregate in aggregates.values())
+        per_game = wall / total
+        # Accélération relative au premier point de la courbe
+        reference = reference or (processes, per_game)
+        speedup = reference[1] / per_game
+        results[f'scaling/processes={processes}'] = summarize(
+            [per_game], unit='s/game (wall)', processes=processes, games=total,
+            speedup=round(speedup, 3), efficiency=round(speedup * reference[0] / processes, 3))
+    return results
+
+
+# Modules lourds : le chemin headless et les workers ne doivent pas les charger
+HEAVY_MODULES = ('tkinter', 'pandas', 'tqdm', 'numpy', 'matplotlib')
+STARTUP_MODULES = ('src.simulation.runner', 'src.simulation.batch', 'src.main')
+
+
+def _loaded_heavy_modules() -> List[str]:
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def _worker_probe(_) -> List[str]:
+    """What a freshly started pool worker has imported once it can play a block."""
+    from . import batch  # noqa: F401
+    return _loaded_heavy_modules()
+
+
+def startup_benchmarks(repeats: int = 5, processes: int = 2,
+                       modules: Sequence[str] = STARTUP_MODULES) -> Dict[str, Dict]:
+    """
+    startup/process[<module>]: wall time of `python -c "import <module>"` (with
+    interpreter startup; `python -c pass` is the reference) and, in the
+    result, the import time alone and the heavy modules it loaded.
+    startup/workers[<method>]: time until `processes` fresh pool workers
+    have each answered one task.
+    """
+    package_parent = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    package = os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_parent,
+                                                                      os.environ.get('PYTHONPATH')])))
+    results = {}
+    for module in (None,) + tuple(modules):
+        if module:
+            module = module.replace('src.', f'{package}.', 1)
+        code = ("import json, sys, time\nstarted = time.perf_counter()\n"
+                + (f"import {module}\n" if module else "")
+                + "print(json.dumps([time.perf_counter() - started, "
+                + f"[m for m in {HEAVY_MODULES!r} if m in sys.modules]]))")
+        walls, imports, heavy = [], [], []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                    env=env, check=True).stdout
+            walls.append(time.perf_counter() - started)
+            import_seconds, heavy = json.loads(output.strip().splitlines()[-1])
+            imports.append(import_seconds)
+        results[f'startup/process[{module or "python"}]'] = summarize(
+            walls, unit='s/process', import_seconds=statistics.median(imports), heavy_modules=heavy)
+
+    for method in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context(method)
+        samples, heavy = [], []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            with context.Pool(processes) as pool:
+                loaded = pool.map(_worker_probe, range(processes), chunksize=1)
+                samples.append(time.perf_counter() - started)
+            heavy = sorted(set().union(*loaded))
+        results[f'startup/workers[{method}]'] = summarize(samples, unit='s/pool', processes=processes,
+                                                          heavy_modules=heavy)
+    return results
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'commit': commit,
+    }
+
+
+def save_results(results: Dict[str, Dict], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+
+def load_results(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.10,
+                    noise_factor: float = 2.0) -> List[Dict]:
+    """
+    Relative change of every benchmark present in both files. A benchmark is
+    flagged when it is slower by more than max(threshold, noise_factor x the
+    relative spread of both runs), so noisy benchmarks need a bigger change.
+    """
+    rows = []
+    for name, base in baseline['results'].items():
+        new = current['results'].get(name)
+        if new is None or not base['value']:
+            continue
+        change = new['value'] / base['value'] - 1.0
+        noise = noise_factor * (_spread(base) + _spread(new))
+        limit = max(threshold, noise)
+        status = 'regression' if change > limit else ('improvement' if change < -limit else 'unchanged')
+        rows.append({'name': name, 'unit': base['unit'], 'baseline': base['value'], 'current': new['value'],
+                     'change': change, 'limit': limit, 'status': status})
+    return rows
+
+
+def _spread(result: Dict) -> float:
+    """Relative noise of a result: robust spread of its samples around the median."""
+    samples = result.get('samples') or [result['value']]
+    if len(samples) < 2 or not result['value']:
+        return 0.0
+    deviations = sorted(abs(sample - result['value']) for sample in samples)
+    return statistics.median(deviations) / result['value']
@@ -0,0 +1,265 @@
+# src/simulation/coordinator.py
+"""
+Coordinator / worker mode over TCP (multiprocessing.managers).
+
+The coordinator owns the block queue of a tournament (batch.plan_blocks).
+Workers on any host connect, lease one block at a time, play it with
+batch.run_block and push back its MatchupAggregate. A lease is renewed by a
+heartbeat thread while the block runs; if a worker dies, its lease expires
+after `lease_timeout` seconds and the block goes back to the queue. Late
+results of an expired lease are still accepted once, duplicates are dropped.
+
+Trust boundary: multiprocessing.managers unpickles whatever a connected peer
+sends, so anyone holding the authkey can run code in the coordinator (and a
+coordinator in its workers). The coordinator listens on 127.0.0.1 by default;
+on any other address it refuses to start unless the shared secret is set in
+CHAINDUEL_AUTHKEY, and it should only be reachable from trusted hosts
+(private network, SSH tunnel or VPN).
+"""
+import ipaddress
+import itertools
+import os
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing.managers import BaseManager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .aggregate import MatchupAggregate
+from .batch import BlockJob, CellKey, run_block
+
+DEFAULT_PORT = 50000
+DEFAULT_HOST = '127.0.0.1'
+AUTHKEY_ENV = 'CHAINDUEL_AUTHKEY'
+
+
+class WorkQueue:
+    """Thread-safe block queue with leases; lives in the coordinator process."""
+
+    def __init__(self, jobs: Sequence[BlockJob], lease_timeout: float = 120.0):
+        self.jobs = list(jobs)
+        self.lease_timeout = lease_timeout
+        self.pending = deque(range(len(self.jobs)))
+        self.leases: Dict[int, List] = {}  # lease_id -> [block, worker, deadline]
+        self.results: Dict[int, MatchupAggregate] = {}
+        self.workers: Dict[str, float] = {}
+        self.requeued = 0
+        self._lease_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        for lease_id, (block, worker, deadline) in list(self.leases.items()):
+            if deadline < now:
+                del self.leases[lease_id]
+                if block not in self.results:
+                    self.pending.appendleft(block)
+                    self.requeued += 1
+
+    def lease(self, worker: str) -> Optional[Tuple[int, int, BlockJob]]:
+        """Next (lease_id, block, job), or None if nothing is available right now."""
+        now = time.time()
+        with self._lock:
+            self.workers[worker] = now
+            self._expire(now)
+            while self.pending:
+                block = self.pending.popleft()
+                if block in self.results:
+                    continue
+                lease_id = next(self._lease_ids)
+                self.leases[lease_id] = [block, worker, now + self.lease_timeout]
+                return lease_id, block, self.jobs[block]
+            return None
+
+    def renew(self, lease_id: int) -> bool:
+        with self._lock:
+            lease = self.leases.get(lease_id)
+            if lease is None:
+                return False
+            lease[2] = time.time() + self.lease_timeout
+            self.workers[lease[1]] = time.time()
+            return True
+
+    def complete(self, lease_id: int, block: int, aggregate: MatchupAggregate) -> bool:
+        """Store a block result; False if the block was already done by another worker."""
+        with self._lock:
+            self.leases.pop(lease_id, None)
+            if block in self.results:
+                return False
+            self.results[block] = aggregate
+            return True
+
+    def heartbeat_interval(self) -> float:
+        return self.lease_timeout / 3
+
+    def finished(self) -> bool:
+        with self._lock:
+            return len(self.results) == len(self.jobs)
+
+    def status(self) -> Dict:
+        with self._lock:
+            self._expire(time.time())
+            return {
+                'blocks': len(self.jobs),
+                'done': len(self.results),
+                'pending': len(self.pending),
+                'leased': len(self.leases),
+                'requeued': self.requeued,
+                'games': sum(aggregate.games for aggregate in self.results.values()),
+                'workers': len(self.workers),
+            }
+
+
+class CoordinatorManager(BaseManager):
+    pass
+
+
+def parse_address(text: str, default_host: str = '') -> Tuple[str, int]:
+    """'host:port', ':port' or 'host' -> (host, port); ':port' keeps an empty host (all interfaces)."""
+    host, _, port = text.rpartition(':') if ':' in text else (text, '', '')
+    return host or default_host, int(port) if port else DEFAULT_PORT
+
+
+def is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def coordinator_authkey(host: str) -> bytes:
+    """
+    CHAINDUEL_AUTHKEY, required unless the coordinator only listens on
+    loopback; there a random key is used when it is unset (local workers only).
+    """
+    key = os.environ.get(AUTHKEY_ENV)
+    if key:
+        return key.encode()
+    if not is_loopback(host):
+        raise ValueError(f"{AUTHKEY_ENV} must be set to listen on {host or 'all interfaces'} "
+                         f"(peers are unpickled: only trusted hosts should hold the key)")
+    return os.urandom(32)
+
+
+def worker_authkey() -> bytes:
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        raise ValueError(f"{AUTHKEY_ENV} must be set to the coordinator's key")
+    return key.encode()
+
+
+def run_worker(address: Tuple[str, int], authkey: bytes,
+               worker_id: Optional[str] = None, poll_interval: float = 1.0) -> int:
+    """Pull and play blocks until the coordinator has everything; returns the blocks played."""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    CoordinatorManager.register('get_queue')
+    manager = CoordinatorManager(address=address, authkey=authkey)
+    manager.connect()
+    queue = manager.get_queue()
+    heartbeat_interval = queue.heartbeat_interval()
+    played = 0
+    try:
+        while True:
+            leased = queue.lease(worker_id)
+            if leased is None:
+                if queue.finished():
+                    break
+                time.sleep(poll_interval)
+                continue
+            lease_id, block, job = leased
+
+            # Le heartbeat garde le bail tant que le bloc tourne (proxy séparé par thread)
+            running = threading.Event()
+            heartbeat = threading.Thread(target=_heartbeat, args=(manager, lease_id, running, heartbeat_interval),
+                                         daemon=True)
+            heartbeat.start()
+            try:
+                _, _, aggregate, _ = run_block(job)
+            finally:
+                running.set()
+                heartbeat.join()
+            queue.complete(lease_id, block, aggregate)
+            played += 1
+    except (EOFError, ConnectionError):
+        # Coordinateur parti : tout est fini ou il a été arrêté
+        pass
+    return played
+
+
+def _heartbeat(manager: CoordinatorManager, lease_id: int, stop: threading.Event, interval: float) -> None:
+    queue = manager.get_queue()
+    while not stop.wait(interval):
+        try:
+            queue.renew(lease_id)
+        except (EOFError, ConnectionError):
+            return
+
+
+def run_coordinator(jobs: Sequence[BlockJob], address: Tuple[str, int] = (DEFAULT_HOST, DEFAULT_PORT),
+                    authkey: Optional[bytes] = None, lease_timeout: float = 120.0,
+                    local_workers: int = 0, progress: bool = True,
+                    poll_interval: float = 1.0, monitor=None) -> Dict[CellKey, MatchupAggregate]:
+    """
+    Serve the queue until every block is done and return the merged aggregates.
+    `local_workers` starts worker processes on this machine (tests, single node).
+    Without `authkey`, coordinator_authkey decides (and refuses a non-loopback
+    address without CHAINDUEL_AUTHKEY).
+    """
+    import multiprocessing
+    from tqdm import tqdm
+
+    if authkey is None:
+        authkey = coordinator_authkey(address[0])
+    queue = WorkQueue(jobs, lease_timeout)
+    CoordinatorManager.register('get_queue', callable=lambda: queue)
+    manager = CoordinatorManager(address=address, authkey=authkey)
+    server = manager.get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    bound = server.address
+
+    connect_host = 'localhost' if bound[0] in ('', '0.0.0.0') else bound[0]
+    workers = [multiprocessing.Process(target=run_worker, args=((connect_host, bound[1]), authkey),
+                                       kwargs={'poll_interval': poll_interval}, daemon=True)
+               for _ in range(local_workers)]
+    for worker in workers:
+        worker.start()
+
+    if monitor:
+        monitor.start(len(jobs))
+    reported = set()
+    total = sum(job.stop - job.start for job in jobs)
+    with tqdm(total=total, desc=f"Coordinator {bound[0] or '*'}:{bound[1]}", unit="game",
+              dynamic_ncols=True, disable=not progress) as progress_bar:
+        while not queue.finished():
+            time.sleep(poll_interval)
+            status = queue.status()
+            if monitor:
+                monitor.set_queue_depth(status['pending'])
+                for block in set(queue.results) - reported:
+                    monitor.block_done(queue.results[block])
+                    reported.add(block)
+            progress_bar.update(status['games'] - progress_bar.n)
+            progress_bar.set_postfix(workers=status['workers'], leased=status['leased'],
+                                     requeued=status['requeued'])
+
+    if monitor:
+        for block in set(queue.results) - reported:
+            monitor.block_done(queue.results[block])
+        monitor.set_queue_depth(0)
+        monitor.stop()
+
+    # Laisse aux workers le temps de voir que tout est fini
+    for worker in workers:
+        worker.join(timeout=max(5.0, 3 * poll_interval))
+    time.sleep(poll_interval)
+
+    aggregates: Dict[CellKey, MatchupAggregate] = {}
+    for block in range(len(jobs)):
+        aggregate = queue.results[block]
+        if aggregate.key in aggregates:
+            aggregates[aggregate.key].merge(aggregate)
+        else:
+            aggregates[aggregate.key] = aggregate
+    return aggregates
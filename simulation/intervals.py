@@ -0,0 +1,109 @@
+# src/simulation/intervals.py
+"""
+Confidence intervals and significance tests for tournament win rates.
+
+A cell (case, strategy1, strategy2) is summarised by its games and
+strategy1's wins. Resampling its games with replacement gives a
+Binomial(games, wins / games) win count, so the nonparametric bootstrap of
+every cell is a single rng.binomial call over a (cells, resamples) array,
+however many games were played. Averages over cells (per strategy, per
+case and strategy) are one matrix product of those resamples, and pairwise
+differences are row differences. Analytic intervals (Wilson for cells,
+normal for averages) are given alongside.
+
+Cells are resampled independently. Under common random numbers, cells of a
+case share their food streams and are positively correlated, which makes
+the intervals of differences conservative.
+"""
+import math
+from itertools import combinations
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+Z95 = 1.959963984540054
+
+
+def wilson_interval(wins, games, z: float = Z95) -> Tuple[np.ndarray, np.ndarray]:
+    """Wilson score interval of wins / games, element-wise."""
+    wins = np.asarray(wins, dtype=float)
+    games = np.maximum(np.asarray(games, dtype=float), 1)
+    p = wins / games
+    denominator = 1 + z * z / games
+    centre = (p + z * z / (2 * games)) / denominator
+    half = z * np.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return centre - half, centre + half
+
+
+def bootstrap_win_rates(wins, games, resamples: int = 10000, seed: int = 0) -> np.ndarray:
+    """Bootstrap win rates, shaped (cells, resamples)."""
+    games = np.asarray(games, dtype=np.int64)
+    n = np.maximum(games, 1)
+    p = np.asarray(wins, dtype=float) / n
+    rng = np.random.default_rng(seed)
+    return rng.binomial(games[:, None], p[:, None], size=(len(games), resamples)) / n[:, None]
+
+
+def percentile_interval(samples: np.ndarray, level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """Percentile interval of every row of a resample array."""
+    alpha = (1 - level) / 2
+    low, high = np.quantile(samples, [alpha, 1 - alpha], axis=1)
+    return low, high
+
+
+def group_means(samples: np.ndarray, groups: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mean of the cells of every group, for every resample at once:
+    returns (labels, means shaped (groups, resamples)).
+    """
+    labels, inverse = np.unique(np.asarray(groups), return_inverse=True)
+    weights = np.zeros((len(labels), len(inverse)))
+    weights[inverse, np.arange(len(inverse))] = 1.0
+    weights /= weights.sum(axis=1, keepdims=True)
+    return labels, weights @ samples
+
+
+def mean_se(rates, games, groups: Sequence) -> Dict:
+    """Normal-approximation standard error of every group mean of independent cell rates."""
+    rates = np.asarray(rates, dtype=float)
+    variances = rates * (1 - rates) / np.maximum(np.asarray(games, dtype=float), 1)
+    groups = np.asarray(groups)
+    return {label: math.sqrt(variances[groups == label].sum()) / (groups == label).sum()
+            for label in np.unique(groups)}
+
+
+def holm(p_values: Sequence[float]) -> List[float]:
+    """Holm-Bonferroni adjusted p-values (family-wise error)."""
+    order = sorted(range(len(p_values)), key=lambda i: p_values[i])
+    adjusted = [0.0] * len(p_values)
+    running = 0.0
+    for rank, i in enumerate(order):
+        running = max(running, min(1.0, (len(p_values) - rank) * p_values[i]))
+        adjusted[i] = running
+    return adjusted
+
+
+def pairwise_tests(labels: Sequence[str], means: np.ndarray, samples: np.ndarray,
+                   se: Dict, level: float = 0.95) -> List[Dict]:
+    """
+    Every pair of group means: the difference, its bootstrap interval, a
+    bootstrap p-value (resampled differences recentred on zero, as
+    (count + 1) / (resamples + 1) so it is never 0), a z-test
+    p-value and the Holm-adjusted bootstrap p-value.
+    """
+    rows = []
+    for a, b in combinations(range(len(labels)), 2):
+        diff = float(means[a] - means[b])
+        resampled = samples[a] - samples[b]
+        low, high = np.quantile(resampled, [(1 - level) / 2, (1 + level) / 2])
+        # (k + 1) / (B + 1) : jamais 0, la résolution du test est 1 / (B + 1)
+        extreme = int(np.count_nonzero(np.abs(resampled - diff) >= abs(diff)))
+        p_bootstrap = (extreme + 1) / (len(resampled) + 1)
+        se_diff = math.sqrt(se[labels[a]] ** 2 + se[labels[b]] ** 2)
+        p_z = math.erfc(abs(diff) / se_diff / math.sqrt(2)) if se_diff > 0 else float(diff == 0)
+        rows.append({'strategy_a': labels[a], 'strategy_b': labels[b], 'diff': diff,
+                     'ci_low': float(low), 'ci_high': float(high),
+                     'p_bootstrap': p_bootstrap, 'p_z': p_z})
+    for row, adjusted in zip(rows, holm([row['p_bootstrap'] for row in rows])):
+        row['p_holm'] = adjusted
+    return rows
@@ -0,0 +1,222 @@
+# src/simulation/memory.py
+"""
+Memory instrumentation and per-worker RSS budget.
+
+Each process that plays games owns a MemoryMonitor. It appends an RSS sample
+to `memory_workers.jsonl` and, if tracemalloc is on, the top allocation sites
+to `tracemalloc_<pid>.txt` every `interval` seconds. write_memory_summary
+then gives the peak RSS of every worker (`memory.txt`, next to stats.txt).
+
+With a budget, run_block stops a block early once the worker gets within
+`headroom` of the budget and returns the partial aggregate of the games
+already played. recycling_imap re-queues the rest of the block and replaces
+the worker with a fresh process, so no result is lost.
+"""
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional, Sequence
+
+SAMPLES_FILE = 'memory_workers.jsonl'
+SUMMARY_FILE = 'memory.txt'
+
+
+@dataclass(frozen=True)
+class MemoryConfig:
+    directory: Optional[str] = None      # None: the runner's run directory
+    interval: float = 60.0               # seconds between two snapshots
+    budget_mb: Optional[float] = None    # recycle the worker before reaching this RSS
+    headroom: float = 0.9                # ... i.e. once RSS > headroom * budget
+    tracemalloc: bool = True             # top allocation sites (slows games down)
+    top: int = 15
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process (falls back to the peak where /proc is missing)."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilo-octets sous Linux, octets sous macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class MemoryMonitor:
+    """Per-process sampler; tick() after every game is cheap between snapshots."""
+
+    def __init__(self, config: MemoryConfig):
+        self.config = config
+        self.pid = os.getpid()
+        self.games = 0
+        self.started = time.time()
+        self._last = 0.0
+        os.makedirs(config.directory, exist_ok=True)
+        if config.tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def tick(self) -> None:
+        self.games += 1
+        if time.time() - self._last >= self.config.interval:
+            self.report()
+
+    def over_budget(self) -> bool:
+        budget = self.config.budget_mb
+        return budget is not None and current_rss_mb() > self.config.headroom * budget
+
+    def report(self, event: str = 'sample') -> None:
+        self._last = time.time()
+        sample = {
+            'time': round(self._last, 3),
+            'pid': self.pid,
+            'event': event,
+            'games': self.games,
+            'rss_mb': round(current_rss_mb(), 2),
+            'peak_rss_mb': round(peak_rss_mb(), 2),
+        }
+        if tracemalloc.is_tracing():
+            traced, traced_peak = tracemalloc.get_traced_memory()
+            sample['traced_mb'] = round(traced / (1024 * 1024), 2)
+            sample['traced_peak_mb'] = round(traced_peak / (1024 * 1024), 2)
+            self._write_top()
+        # Lignes courtes en mode ajout : pas de mélange entre processus
+        with open(os.path.join(self.config.directory, SAMPLES_FILE), 'a') as f:
+            f.write(json.dumps(sample) + '\n')
+
+    def _write_top(self) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        path = os.path.join(self.config.directory, f'tracemalloc_{self.pid}.txt')
+        with open(path, 'a') as f:
+            f.write(f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} pid={self.pid} games={self.games} ===\n")
+            for stat in snapshot.statistics('lineno')[:self.config.top]:
+                f.write(f"{stat}\n")
+            f.write('\n')
+
+
+_monitors: Dict[MemoryConfig, MemoryMonitor] = {}
+
+
+def get_memory_monitor(config: MemoryConfig) -> MemoryMonitor:
+    """Return this process's monitor for a configuration, creating it on first use."""
+    monitor = _monitors.get(config)
+    if monitor is None or monitor.pid != os.getpid():
+        monitor = _monitors[config] = MemoryMonitor(config)
+    return monitor
+
+
+def write_memory_summary(directory: str) -> Optional[str]:
+    """Peak RSS and games per worker from the samples of a run directory."""
+    path = os.path.join(directory, SAMPLES_FILE)
+    if not os.path.exists(path):
+        return None
+    workers: Dict[int, Dict] = {}
+    with open(path) as f:
+        for line in f:
+            sample = json.loads(line)
+            worker = workers.setdefault(sample['pid'], {'peak_rss_mb': 0.0, 'games': 0, 'recycled': False})
+            worker['peak_rss_mb'] = max(worker['peak_rss_mb'], sample['peak_rss_mb'], sample['rss_mb'])
+            worker['games'] = max(worker['games'], sample['games'])
+            worker['recycled'] = worker['recycled'] or sample['event'] == 'recycle'
+    summary_path = os.path.join(directory, SUMMARY_FILE)
+    with open(summary_path, 'w') as f:
+        f.write("=== Memory per worker ===\n")
+        f.write(f"{'pid':>8} {'peak RSS (MB)':>14} {'games':>8}  recycled\n")
+        for pid, worker in sorted(workers.items()):
+            f.write(f"{pid:>8} {worker['peak_rss_mb']:>14.1f} {worker['games']:>8}  "
+                    f"{'yes' if worker['recycled'] else ''}\n")
+        f.write(f"\nWorkers: {len(workers)}, recycled: {sum(w['recycled'] for w in workers.values())}, "
+                f"max peak RSS: {max(w['peak_rss_mb'] for w in workers.values()):.1f} MB\n")
+    return summary_path
+
+
+# --- Pool avec recyclage sur budget mémoire ----------------------------------
+
+def _worker_loop(func, tasks, results, initializer, initargs, config: MemoryConfig) -> None:
+    if initializer:
+        initializer(*initargs)
+    monitor = get_memory_monitor(config)
+    while True:
+        item = tasks.get()
+        if item is None:
+            break
+        index, job = item
+        try:
+            results.put(('result', index, func(job)))
+        except Exception as error:
+            results.put(('error', index, repr(error)))
+            return
+        if monitor.over_budget():
+            monitor.report('recycle')
+            results.put(('recycle', os.getpid(), None))
+            return
+    monitor.report('exit')
+
+
+def recycling_imap(func: Callable, jobs: Sequence, processes: Optional[int], config: MemoryConfig,
+                   remainder: Callable, initializer=None, initargs=()) -> Iterator:
+    """
+    imap_unordered over jobs with workers that leave once over budget.
+    `remainder(job, result)` returns the job of the games a stopped-early
+    block did not play (or None); it is queued again.
+    """
+    processes = processes or os.cpu_count() or 1
+    tasks = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    pending = {index: job for index, job in enumerate(jobs)}
+    for item in pending.items():
+        tasks.put(item)
+    next_index = len(pending)
+
+    def start_worker():
+        worker = multiprocessing.Process(target=_worker_loop, daemon=True,
+                                         args=(func, tasks, results, initializer, initargs, config))
+        worker.start()
+        return worker
+
+    workers = [start_worker() for _ in range(min(processes, len(pending)) or 1)]
+    try:
+        while pending:
+            try:
+                kind, index, result = results.get(timeout=1.0)
+            except queue.Empty:
+                # Un worker tué (OOM killer...) sans message : sa tâche est perdue
+                dead = [w for w in workers if w.exitcode not in (None, 0)]
+                if dead:
+                    raise RuntimeError(f"Worker {dead[0].pid} died with exit code {dead[0].exitcode}")
+                continue
+            if kind == 'error':
+                raise RuntimeError(f"Worker failed on job {index}: {result}")
+            if kind == 'recycle':
+                workers = [w for w in workers if w.pid != index] + [start_worker()]
+                continue
+            job = pending.pop(index)
+            rest = remainder(job, result)
+            if rest is not None:
+                pending[next_index] = rest
+                tasks.put((next_index, rest))
+                next_index += 1
+            yield result
+    finally:
+        for _ in workers:
+            tasks.put(None)
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
@@ -0,0 +1,58 @@
+# src/simulation/pairing.py
+"""
+Paired-difference estimates for runs using common random numbers.
+
+With common random numbers, game k of every match-up of a case shares the
+same food-spawn stream. Comparing two strategies against the same opponent
+game by game then cancels most of the food-placement noise: the standard
+error of the paired difference is much smaller than the one obtained by
+treating both cells as independent samples.
+"""
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+MatchupKey = Tuple[str, str, str]  # (case, strategy1, strategy2)
+
+
+def mean_and_se(values: np.ndarray) -> Tuple[float, float]:
+    """Sample mean and its standard error."""
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return float(values.mean()) if len(values) else float('nan'), float('nan')
+    return float(values.mean()), float(values.std(ddof=1) / np.sqrt(len(values)))
+
+
+def paired_differences(outcomes: Dict[MatchupKey, np.ndarray]) -> List[Dict]:
+    """
+    For every case, opponent and pair of strategies (A, B) facing it, compare
+    A's and B's per-seed outcomes (1 = win, 0 = loss, 0.5 for a split mirrored
+    pair). Outcome arrays must be indexed by the same seeds.
+    """
+    rows = []
+    cases = sorted({case for case, _, _ in outcomes})
+    for case in cases:
+        opponents = sorted({s2 for c, _, s2 in outcomes if c == case})
+        for opponent in opponents:
+            players = sorted(s1 for c, s1, s2 in outcomes if c == case and s2 == opponent)
+            for strategy_a, strategy_b in combinations(players, 2):
+                y_a = np.asarray(outcomes[(case, strategy_a, opponent)], dtype=float)
+                y_b = np.asarray(outcomes[(case, strategy_b, opponent)], dtype=float)
+                n = min(len(y_a), len(y_b))
+                y_a, y_b = y_a[:n], y_b[:n]
+                diff, se_paired = mean_and_se(y_a - y_b)
+                se_unpaired = float(np.sqrt((y_a.var(ddof=1) + y_b.var(ddof=1)) / n)) if n > 1 else float('nan')
+                rows.append({
+                    'case': case,
+                    'opponent': opponent,
+                    'strategy_a': strategy_a,
+                    'strategy_b': strategy_b,
+                    'runs': n,
+                    'win_rate_a': f"{y_a.mean():.4f}",
+                    'win_rate_b': f"{y_b.mean():.4f}",
+                    'diff': f"{diff:.4f}",
+                    'se_paired': f"{se_paired:.4f}",
+                    'se_unpaired': f"{se_unpaired:.4f}",
+                })
+    return rows
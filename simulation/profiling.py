@@ -0,0 +1,166 @@
+# src/simulation/profiling.py
+"""
+Opt-in sampling profiler for simulation workers.
+
+Only some games are profiled: every Nth game index, or as many games as
+keep the profiled wall time under a fraction of the process's elapsed time.
+During a profiled game cProfile is enabled and, where SIGPROF exists, a
+stack sampler records the Python stack every few milliseconds of CPU time.
+Each process dumps its own files into the profile directory; merge_profiles
+combines them into one pstats file and one collapsed-stack file
+(`frame;frame;frame count`, the input of flamegraph.pl / speedscope).
+"""
+import cProfile
+import glob
+import os
+import pstats
+import signal
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+MERGED_PSTATS = 'profile.pstats'
+MERGED_COLLAPSED = 'profile.collapsed'
+MERGED_SUMMARY = 'profile_top.txt'
+
+
+@dataclass(frozen=True)
+class ProfileConfig:
+    directory: str
+    every: int = 0                   # profile games whose index is a multiple of `every`
+    fraction: Optional[float] = None  # or: keep profiled time under this share of wall time
+    sample_interval: float = 0.005    # seconds of CPU time between two stack samples
+
+    def __post_init__(self):
+        if not self.every and not self.fraction:
+            raise ValueError("ProfileConfig needs `every` or `fraction`")
+
+
+class GameProfiler:
+    """Per-process profiler; one instance per (process, directory)."""
+
+    def __init__(self, config: ProfileConfig):
+        self.config = config
+        os.makedirs(config.directory, exist_ok=True)
+        token = f"{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self.pstats_path = os.path.join(config.directory, f"worker_{token}.prof")
+        self.collapsed_path = os.path.join(config.directory, f"worker_{token}.collapsed")
+        self.pid = os.getpid()
+        self.profile = cProfile.Profile()
+        self.stacks: Counter = Counter()
+        self.started = time.perf_counter()
+        self.profiled_seconds = 0.0
+        self.games = 0
+        self._dirty = False
+        self._last_dump = self.started
+        self._sampler = hasattr(signal, 'setitimer') and hasattr(signal, 'SIGPROF')
+
+    def should_profile(self, game_index: Optional[int]) -> bool:
+        if self.config.every:
+            return game_index is not None and game_index % self.config.every == 0
+        elapsed = time.perf_counter() - self.started
+        return self.profiled_seconds <= self.config.fraction * elapsed
+
+    def run(self, func, *args):
+        """Call func(*args) under the profiler."""
+        started = time.perf_counter()
+        previous = self._start_sampler()
+        self.profile.enable()
+        try:
+            return func(*args)
+        finally:
+            self.profile.disable()
+            self._stop_sampler(previous)
+            now = time.perf_counter()
+            self.profiled_seconds += now - started
+            self.games += 1
+            self._dirty = True
+            # Écriture au plus toutes les 2 s : un worker tué ne perd que la fin
+            if now - self._last_dump > 2.0:
+                self.dump()
+
+    def _sample(self, signum, frame) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        self.stacks[';'.join(reversed(stack))] += 1
+
+    def _start_sampler(self):
+        if not self._sampler:
+            return None
+        try:
+            previous = signal.signal(signal.SIGPROF, self._sample)
+        except ValueError:
+            # Pas dans le thread principal : cProfile seul
+            self._sampler = False
+            return None
+        interval = self.config.sample_interval
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        return previous
+
+    def _stop_sampler(self, previous) -> None:
+        if not self._sampler:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, previous or signal.SIG_DFL)
+
+    def dump(self) -> None:
+        if not self._dirty:
+            return
+        self.profile.dump_stats(self.pstats_path)
+        if self.stacks:
+            tmp_path = f"{self.collapsed_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                for stack, count in self.stacks.items():
+                    f.write(f"{stack} {count}\n")
+            os.replace(tmp_path, self.collapsed_path)
+        self._dirty = False
+        self._last_dump = time.perf_counter()
+
+
+_profilers: Dict[ProfileConfig, GameProfiler] = {}
+
+
+def get_profiler(config: ProfileConfig) -> GameProfiler:
+    """Return this process's profiler for a configuration, creating it on first use."""
+    profiler = _profilers.get(config)
+    # Un worker forké hérite du dictionnaire du parent : un profileur par processus
+    if profiler is None or profiler.pid != os.getpid():
+        profiler = _profilers[config] = GameProfiler(config)
+    return profiler
+
+
+def flush_profilers() -> None:
+    for profiler in _profilers.values():
+        if profiler.pid == os.getpid():
+            profiler.dump()
+
+
+def merge_profiles(directory: str, top: int = 40) -> Optional[str]:
+    """Merge every worker file of a directory; returns the merged pstats path (None if empty)."""
+    flush_profilers()
+    pstats_files = sorted(glob.glob(os.path.join(directory, 'worker_*.prof')))
+    if not pstats_files:
+        return None
+    merged_path = os.path.join(directory, MERGED_PSTATS)
+    stats = pstats.Stats(*pstats_files)
+    stats.dump_stats(merged_path)
+    with open(os.path.join(directory, MERGED_SUMMARY), 'w') as f:
+        pstats.Stats(merged_path, stream=f).sort_stats('cumulative').print_stats(top)
+
+    stacks: Counter = Counter()
+    for path in glob.glob(os.path.join(directory, 'worker_*.collapsed')):
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack:
+                    stacks[stack] += int(count)
+    if stacks:
+        with open(os.path.join(directory, MERGED_COLLAPSED), 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+    return merged_path
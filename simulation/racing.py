@@ -0,0 +1,235 @@
+# src/simulation/racing.py
+"""
+Adaptive budget allocation across tournament cells (racing).
+
+A fixed tournament plays the same number of games in every (case,
+strategy1, strategy2) cell. Racing answers one question instead:
+
+- 'best': which strategy has the highest average win rate;
+- 'rank': the full order of the strategies.
+
+A strategy's score is its mean win rate as strategy1 over the cells where
+it faces another strategy (every case, every opponent; self-play cells do
+not rank anything and are never played). Every cell first gets one block;
+then, round after round, blocks go to the cells of the strategies whose
+order is still uncertain, picking the cells whose next block removes the
+most variance from their strategy's score. A strategy whose pairwise
+difference with the others is significant stops receiving games
+(successive elimination).
+
+The z-test is repeated after every round and the race stops at the first
+separation, so a fixed threshold would not hold its level (optional
+stopping). Round r tests at delta / (r (r + 1)), Bonferroni over the
+pairs: these sum to delta over all rounds, so the probability that any
+declared difference is wrong, at whatever round the race stops, is at
+most `delta` (under the normal approximation of the win-rate means). The
+reported intervals use the threshold of the last round and hold with the
+same guarantee.
+
+Cells keep their tournament seeds and game indices, so the games played
+are exactly the first games of the same cells in run_tournament.
+"""
+import multiprocessing
+import random
+from dataclasses import dataclass, field, replace
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..common.scenarios import Scenario
+from .aggregate import MatchupAggregate
+from .batch import BlockJob, CellKey, block_results, cell_seed, run_block
+
+QUESTIONS = ('best', 'rank')
+
+
+@dataclass
+class StrategyEstimate:
+    name: str
+    mean: float      # moyenne des taux de victoire de ses cellules
+    se: float
+    games: int
+    low: float = 0.0
+    high: float = 0.0
+
+
+@dataclass
+class RaceResult:
+    question: str
+    ranking: List[StrategyEstimate]
+    resolved: bool                 # réponse significative au niveau delta (valable quel que soit l'arrêt)
+    games: int                     # parties jouées
+    budget: int
+    rounds: int
+    aggregates: Dict[CellKey, MatchupAggregate] = field(default_factory=dict)
+    uniform_games: Optional[int] = None   # parties d'une grille uniforme aussi précise (estimation)
+
+    @property
+    def saved(self) -> Optional[int]:
+        """Games saved against the uniform grid reaching the same answer."""
+        return None if self.uniform_games is None else self.uniform_games - self.games
+
+
+def cell_variance(aggregate: MatchupAggregate) -> float:
+    """Per-seed variance of strategy1's win indicator, floored so a 0/n cell is never 'certain'."""
+    n = aggregate.seeds
+    mean = aggregate.sum_seed_wins1 / n
+    variance = (aggregate.sum_sq_seed_wins1 - n * mean * mean) / (n - 1) if n > 1 else 0.25
+    return max(variance, 0.25 / (n + 1))
+
+
+def strategy_estimates(aggregates: Dict[CellKey, MatchupAggregate],
+                       cells: Dict[str, List[CellKey]]) -> Dict[str, StrategyEstimate]:
+    estimates = {}
+    for name, keys in cells.items():
+        k = len(keys)
+        means = [aggregates[key].sum_seed_wins1 / aggregates[key].seeds for key in keys]
+        variance = sum(cell_variance(aggregates[key]) / aggregates[key].seeds for key in keys) / (k * k)
+        estimates[name] = StrategyEstimate(name, sum(means) / k, variance ** 0.5,
+                                           sum(aggregates[key].games for key in keys))
+    return estimates
+
+
+def separated(a: StrategyEstimate, b: StrategyEstimate, z: float) -> bool:
+    return abs(a.mean - b.mean) > z * (a.se ** 2 + b.se ** 2) ** 0.5
+
+
+def round_z(delta: float, pairs: int, round_index: int) -> float:
+    """Two-sided z of round `round_index` (from 1): level delta / (r (r + 1)), Bonferroni over the pairs."""
+    return NormalDist().inv_cdf(1 - delta / (2 * pairs * round_index * (round_index + 1)))
+
+
+def open_comparisons(question: str, ranking: List[StrategyEstimate]) -> List[Tuple[str, str]]:
+    """Comparisons the answer depends on (leader vs each other, or adjacent pairs)."""
+    if question == 'best':
+        return [(ranking[0].name, other.name) for other in ranking[1:]]
+    return [(a.name, b.name) for a, b in zip(ranking, ranking[1:])]
+
+
+def uniform_estimate(question: str, ranking: List[StrategyEstimate], aggregates, cells, z: float,
+                     total_cells: int, minimum: int) -> Optional[int]:
+    """
+    Games a uniform grid (every cell, self-play included, at least `minimum`
+    games per cell) would need for the same comparisons to be significant,
+    from the measured cell variances.
+    """
+    per_game = {name: sum(cell_variance(aggregates[key]) for key in keys) / len(keys) ** 2
+                for name, keys in cells.items()}
+    means = {estimate.name: estimate.mean for estimate in ranking}
+    needed = 0.0
+    for a, b in open_comparisons(question, ranking):
+        gap = abs(means[a] - means[b])
+        if gap == 0:
+            return None
+        needed = max(needed, z * z * (per_game[a] + per_game[b]) / (gap * gap))
+    return max(int(needed + 1), minimum) * total_cells
+
+
+def race(scenarios: Sequence[Scenario], strategies: Sequence[type], budget: int,
+         question: str = 'best', seed: Optional[int] = None, crn: bool = False, delta: float = 0.05,
+         block_size: int = 50, processes: Optional[int] = None, detect_cycles: bool = True,
+         stall_limit: Optional[int] = None, progress: bool = True) -> RaceResult:
+    """
+    Spend at most `budget` games to answer `question` ('best' or 'rank') at
+    level `delta`, valid whichever round it stops at; stops early once the
+    answer is significant.
+    """
+    if question not in QUESTIONS:
+        raise ValueError(f"Question inconnue : {question} ({', '.join(QUESTIONS)})")
+    if len(strategies) < 2:
+        raise ValueError("Racing needs at least two strategies")
+    if seed is None:
+        seed = random.getrandbits(63)
+
+    # Cellules notées : chaque stratégie en siège 1 contre chaque autre, sur chaque cas
+    jobs_for: Dict[CellKey, BlockJob] = {}
+    cells: Dict[str, List[CellKey]] = {strategy.__name__: [] for strategy in strategies}
+    for scenario in scenarios:
+        mirror = crn and scenario.is_mirror_symmetric()
+        for i, strategy1_class in enumerate(strategies):
+            for j, strategy2_class in enumerate(strategies):
+                if i == j:
+                    continue
+                job = BlockJob(scenario, strategy1_class, strategy2_class,
+                               cell_seed(seed, scenario, i, j, crn), 0, 0, crn, mirror,
+                               detect_cycles=detect_cycles, stall_limit=stall_limit)
+                jobs_for[job.key] = job
+                cells[strategy1_class.__name__].append(job.key)
+
+    pairs = len(strategies) * (len(strategies) - 1) // 2
+    width = max(processes or multiprocessing.cpu_count(), 1)
+    next_start = {key: 0 for key in jobs_for}
+    aggregates: Dict[CellKey, MatchupAggregate] = {}
+    played = rounds = 0
+
+    def size(key: CellKey) -> int:
+        # En miroir, une paire (2k, 2k+1) reste dans le même bloc
+        return block_size + (block_size % 2) if jobs_for[key].mirror else block_size
+
+    def block(key: CellKey) -> BlockJob:
+        job = jobs_for[key]
+        start = next_start[key]
+        next_start[key] = start + size(key)
+        return replace(job, start=start, stop=next_start[key])
+
+    if budget < sum(size(key) for key in jobs_for):
+        raise ValueError(f"Budget {budget} < one block of {block_size} games for each of the {len(jobs_for)} cells")
+
+    pool = multiprocessing.Pool(processes) if processes != 1 else None
+    try:
+        jobs = [block(key) for key in jobs_for]
+        while jobs:
+            rounds += 1
+            z = round_z(delta, pairs, rounds)
+            results = pool.imap_unordered(run_block, jobs) if pool else block_results(jobs, 1)
+            for key, _, aggregate, _ in results:
+                if key in aggregates:
+                    aggregates[key].merge(aggregate)
+                else:
+                    aggregates[key] = aggregate
+                played += aggregate.games
+
+            estimates = strategy_estimates(aggregates, cells)
+            ranking = sorted(estimates.values(), key=lambda estimate: -estimate.mean)
+            active = {name for comparison in open_comparisons(question, ranking)
+                      if not separated(estimates[comparison[0]], estimates[comparison[1]], z)
+                      for name in comparison}
+            if progress:
+                print(f"Round {rounds}: {played}/{budget} games, "
+                      f"{len(active)} strategies still uncertain")
+
+            # Blocs suivants : cellules des stratégies incertaines qui réduisent le plus la variance
+            def gain(key: CellKey) -> float:
+                aggregate = aggregates[key]
+                return cell_variance(aggregate) * (1 / aggregate.seeds - 1 / (aggregate.seeds + block_size))
+            candidates = sorted((key for name in active for key in cells[name]), key=gain, reverse=True)
+            jobs, planned = [], played
+            for key in candidates[:width]:
+                if planned + size(key) > budget:
+                    break
+                planned += size(key)
+                jobs.append(block(key))
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    for estimate in ranking:
+        estimate.low, estimate.high = estimate.mean - z * estimate.se, estimate.mean + z * estimate.se
+    total_cells = len(scenarios) * len(strategies) ** 2
+    return RaceResult(question, ranking, not active, played, budget, rounds, aggregates,
+                      uniform_estimate(question, ranking, aggregates, cells, z, total_cells,
+                                       block_size))
+
+
+def format_race(result: RaceResult, delta: float) -> str:
+    lines = [f"{'Best strategy' if result.question == 'best' else 'Ranking'} "
+             f"({'significant' if result.resolved else 'NOT significant'} at {1 - delta:.0%} "
+             f"over all rounds, "
+             f"{result.games}/{result.budget} games, {result.rounds} rounds)"]
+    for position, estimate in enumerate(result.ranking, 1):
+        lines.append(f"{position}. {estimate.name:<36} {estimate.mean:.3f}  "
+                     f"[{estimate.low:.3f}, {estimate.high:.3f}]  {estimate.games} games")
+    if result.uniform_games is not None and result.resolved:
+        lines.append(f"A uniform grid would need about {result.uniform_games:,} games "
+                     f"({result.saved:,} saved, {result.saved / result.uniform_games:.0%})")
+    return '\n'.join(lines)
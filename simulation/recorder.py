@@ -0,0 +1,241 @@
+# src/simulation/recorder.py
+"""
+Compact binary trajectory recording for simulated games.
+
+Every process owns its own chunk files, so pool workers write directly to
+disk without going through the parent. A chunk is a set of fixed-capacity,
+memory-mapped ``.npy`` files sharing a prefix:
+
+    <prefix>.games.npy   one GAME_DTYPE record per game
+    <prefix>.events.npy  EVENT_DTYPE records (food spawns, food eaten, resets)
+    <prefix>.moves.npy   uint8, 2 bits per snake per step (2 steps per byte)
+    <prefix>.counts.npy  uint64[3] fill counters (games, events, move bytes)
+
+Moves are delta-encoded against the previous move of the same snake
+(0 = straight, 1 = right turn, 2 = reverse, 3 = left turn), which makes
+them cheap to pack and highly compressible.
+"""
+import glob
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..common.enums import Direction
+
+# Clockwise order: a +1 step is a right turn, a +2 step a reversal
+CLOCKWISE = (Direction.UP, Direction.RIGHT, Direction.DOWN, Direction.LEFT)
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(CLOCKWISE)}
+
+EVENT_FOOD = 0   # Food spawned at (x, y)
+EVENT_EAT = 1    # Snake ate; (x, y) is the newly spawned food
+EVENT_RESET = 2  # Snake(s) reset; snake is a bitmask (1, 2 or 3)
+
+GAME_DTYPE = np.dtype([
+    ('game', '<u8'),
+    ('seed', '<u8'),
+    ('n_steps', '<u4'),
+    ('moves_offset', '<u8'),
+    ('events_offset', '<u8'),
+    ('n_events', '<u4'),
+    ('direction1', 'u1'),
+    ('direction2', 'u1'),
+    ('winner', 'i1'),        # 1, 2, or 0 for a draw
+    ('score1', '<i4'),
+    ('score2', '<i4'),
+    ('length1', '<u2'),
+    ('length2', '<u2'),
+])
+
+EVENT_DTYPE = np.dtype([
+    ('step', '<u4'),
+    ('kind', 'u1'),
+    ('snake', 'u1'),
+    ('x', 'u1'),
+    ('y', 'u1'),
+    ('score1', '<i4'),
+    ('score2', '<i4'),
+])
+
+META_FILE = 'meta.json'
+
+
+def write_meta(directory: str, meta: Dict) -> None:
+    """Describe what a recording directory contains (written once by the parent)."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+class TrajectoryRecorder:
+    """Per-process writer of chunked, memory-mapped trajectory records."""
+
+    def __init__(self, directory: str, games_per_chunk: int = 1 << 16,
+                 events_per_chunk: int = 1 << 20, move_bytes_per_chunk: int = 1 << 24):
+        self.directory = directory
+        self.capacity = (games_per_chunk, events_per_chunk, move_bytes_per_chunk)
+        self._token = f"{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self._chunk_index = 0
+        os.makedirs(directory, exist_ok=True)
+        self._open_chunk()
+
+    def _open_chunk(self) -> None:
+        prefix = os.path.join(self.directory, f"chunk_{self._token}_{self._chunk_index:04d}")
+        games_cap, events_cap, moves_cap = self.capacity
+        # open_memmap only touches the last byte, so unused capacity stays sparse
+        self._games = np.lib.format.open_memmap(prefix + '.games.npy', mode='w+', dtype=GAME_DTYPE, shape=(games_cap,))
+        self._events = np.lib.format.open_memmap(prefix + '.events.npy', mode='w+', dtype=EVENT_DTYPE, shape=(events_cap,))
+        self._moves = np.lib.format.open_memmap(prefix + '.moves.npy', mode='w+', dtype=np.uint8, shape=(moves_cap,))
+        self._counts = np.lib.format.open_memmap(prefix + '.counts.npy', mode='w+', dtype=np.uint64, shape=(3,))
+        self._chunk_index += 1
+
+    def begin_game(self, game_index: int, seed: int, direction1: Direction, direction2: Direction,
+                   food: Tuple[int, int], score1: int, score2: int) -> None:
+        self._game_index = game_index
+        self._seed = seed
+        self._initial = (DIRECTION_INDEX[direction1], DIRECTION_INDEX[direction2])
+        self._prev1, self._prev2 = self._initial
+        self._codes = bytearray()
+        self._game_events: List[Tuple] = [(0, EVENT_FOOD, 0, food[0], food[1], score1, score2)]
+
+    def record_moves(self, direction1: Direction, direction2: Direction) -> None:
+        """Record the directions chosen by both strategies for the current step."""
+        i1 = DIRECTION_INDEX[direction1]
+        i2 = DIRECTION_INDEX[direction2]
+        self._codes.append(((i1 - self._prev1) & 3) | (((i2 - self._prev2) & 3) << 2))
+        self._prev1, self._prev2 = i1, i2
+
+    def record_event(self, kind: int, snake: int, position: Tuple[int, int], score1: int, score2: int) -> None:
+        """Record an event happening during the last recorded step."""
+        self._game_events.append((len(self._codes) - 1, kind, snake, position[0], position[1], score1, score2))
+
+    def end_game(self, winner: int, score1: int, score2: int, length1: int, length2: int) -> None:
+        codes = np.frombuffer(self._codes, dtype=np.uint8)
+        if len(codes) % 2:
+            codes = np.append(codes, np.uint8(0))
+        packed = codes[0::2] | (codes[1::2] << 4)
+
+        n_games, n_events, n_moves = (int(c) for c in self._counts)
+        games_cap, events_cap, moves_cap = self.capacity
+        if (n_games + 1 > games_cap or n_events + len(self._game_events) > events_cap
+                or n_moves + len(packed) > moves_cap):
+            self._flush()
+            self._open_chunk()
+            n_games = n_events = n_moves = 0
+
+        self._moves[n_moves:n_moves + len(packed)] = packed
+        self._events[n_events:n_events + len(self._game_events)] = self._game_events
+        self._games[n_games] = (
+            self._game_index, self._seed, len(self._codes), n_moves, n_events, len(self._game_events),
+            self._initial[0], self._initial[1], winner, score1, score2, length1, length2
+        )
+        # Counters last: a reader never sees a half-written game
+        self._counts[:] = (n_games + 1, n_events + len(self._game_events), n_moves + len(packed))
+
+    def _flush(self) -> None:
+        for array in (self._games, self._events, self._moves, self._counts):
+            array.flush()
+
+    def close(self) -> None:
+        self._flush()
+
+
+_recorders: Dict[str, TrajectoryRecorder] = {}
+
+
+def get_recorder(directory: str) -> TrajectoryRecorder:
+    """Return this process's recorder for a directory, creating it on first use."""
+    recorder = _recorders.get(directory)
+    if recorder is None:
+        recorder = _recorders[directory] = TrajectoryRecorder(directory)
+    return recorder
+
+
+@dataclass
+class RecordedGame:
+    game_index: int
+    seed: int
+    winner: int
+    moves: List[Tuple[Direction, Direction]]
+    events: np.ndarray
+    score1: int
+    score2: int
+    length1: int
+    length2: int
+
+    @property
+    def n_steps(self) -> int:
+        return len(self.moves)
+
+    def food_positions(self) -> List[Tuple[int, int]]:
+        """Food positions in spawn order (initial food first)."""
+        spawns = self.events[self.events['kind'] != EVENT_RESET]
+        return [(int(x), int(y)) for x, y in zip(spawns['x'], spawns['y'])]
+
+
+def decode_moves(packed: np.ndarray, n_steps: int, direction1: int, direction2: int) -> List[Tuple[Direction, Direction]]:
+    codes = np.empty(len(packed) * 2, dtype=np.uint8)
+    codes[0::2] = packed & 0x0F
+    codes[1::2] = packed >> 4
+    codes = codes[:n_steps]
+    index1 = (direction1 + np.cumsum(codes & 3)) & 3
+    index2 = (direction2 + np.cumsum(codes >> 2)) & 3
+    return [(CLOCKWISE[a], CLOCKWISE[b]) for a, b in zip(index1.tolist(), index2.tolist())]
+
+
+class TrajectoryStore:
+    """Read-only, memory-mapped view over every chunk of a recording directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        meta_path = os.path.join(directory, META_FILE)
+        self.meta: Dict = {}
+        if os.path.isfile(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        self.chunks = []
+        for counts_path in sorted(glob.glob(os.path.join(directory, 'chunk_*.counts.npy'))):
+            prefix = counts_path[:-len('.counts.npy')]
+            n_games, n_events, n_moves = (int(c) for c in np.load(counts_path))
+            if n_games == 0:
+                continue
+            self.chunks.append((
+                np.load(prefix + '.games.npy', mmap_mode='r')[:n_games],
+                np.load(prefix + '.events.npy', mmap_mode='r')[:n_events],
+                np.load(prefix + '.moves.npy', mmap_mode='r')[:n_moves],
+            ))
+
+    def __len__(self) -> int:
+        return sum(len(games) for games, _, _ in self.chunks)
+
+    def games(self) -> np.ndarray:
+        """All game records (copied into one array)."""
+        if not self.chunks:
+            return np.empty(0, dtype=GAME_DTYPE)
+        return np.concatenate([games for games, _, _ in self.chunks])
+
+    def load_game(self, game_index: int) -> Optional[RecordedGame]:
+        for games, events, moves in self.chunks:
+            hits = np.flatnonzero(games['game'] == game_index)
+            if len(hits) == 0:
+                continue
+            g = games[hits[0]]
+            n_steps = int(g['n_steps'])
+            moves_offset = int(g['moves_offset'])
+            packed = np.asarray(moves[moves_offset:moves_offset + (n_steps + 1) // 2])
+            events_offset = int(g['events_offset'])
+            return RecordedGame(
+                game_index=int(g['game']),
+                seed=int(g['seed']),
+                winner=int(g['winner']),
+                moves=decode_moves(packed, n_steps, int(g['direction1']), int(g['direction2'])),
+                events=np.array(events[events_offset:events_offset + int(g['n_events'])]),
+                score1=int(g['score1']),
+                score2=int(g['score2']),
+                length1=int(g['length1']),
+                length2=int(g['length2']),
+            )
+        return None
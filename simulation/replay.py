@@ -0,0 +1,160 @@
+# src/simulation/replay.py
+from typing import List, Optional, Tuple
+
+from ..common.enums import Direction
+from ..common.constants import GameConfig, CASE
+from ..common.scenarios import Scenario, get_scenario
+from ..core.engine import GameEngine
+from .recorder import TrajectoryStore, EVENT_EAT
+
+Position = Tuple[int, int]
+
+
+class MemoryRecorder:
+    """Recorder with the TrajectoryRecorder interface that keeps one game in memory."""
+
+    def begin_game(self, game_index: int, seed: int, direction1: Direction, direction2: Direction,
+                   food: Position, score1: int, score2: int) -> None:
+        self.game_index = game_index
+        self.seed = seed
+        self.moves: List[Tuple[Direction, Direction]] = []
+        self.foods: List[Position] = [food]
+        self.winner = 0
+
+    def record_moves(self, direction1: Direction, direction2: Direction) -> None:
+        self.moves.append((direction1, direction2))
+
+    def record_event(self, kind: int, snake: int, position: Position, score1: int, score2: int) -> None:
+        if kind == EVENT_EAT:
+            self.foods.append(position)
+
+    def end_game(self, winner: int, score1: int, score2: int, length1: int, length2: int) -> None:
+        self.winner = winner
+
+
+class GameReplay:
+    """
+    Seekable replay of one game.
+
+    Only the joint moves and food spawns are needed: positions are rebuilt
+    with the same GameEngine rules as the runner. A keyframe is kept every
+    `keyframe_interval` steps, so seeking anywhere costs at most that many
+    forward steps.
+    """
+
+    def __init__(self,
+                 scenario: Scenario,
+                 moves: List[Tuple[Direction, Direction]],
+                 foods: List[Position],
+                 winner: int = 0,
+                 keyframe_interval: int = 256,
+                 config: Optional[GameConfig] = None):
+        self.moves = moves
+        self.foods = foods
+        self.winner = winner
+        self.keyframe_interval = keyframe_interval
+        self._food_cursor = 1
+        self.scenario = scenario
+        self.engine = GameEngine.from_scenario(scenario, foods[0], place_food=self._next_food, config=config)
+
+        # Un seul passage complet pour construire les keyframes
+        self.keyframes = []
+        for step in range(len(moves) + 1):
+            if step % keyframe_interval == 0:
+                self.keyframes.append((self.engine.keyframe(), self._food_cursor))
+            if step < len(moves):
+                self.engine.step(*moves[step])
+        self.seek(0)
+
+    def _next_food(self, snake1_body: List[Position], snake2_body: List[Position]) -> Position:
+        position = self.foods[self._food_cursor]
+        self._food_cursor += 1
+        return position
+
+    @property
+    def step(self) -> int:
+        return self.engine.steps
+
+    @property
+    def n_steps(self) -> int:
+        return len(self.moves)
+
+    @property
+    def finished(self) -> bool:
+        return self.engine.steps >= len(self.moves)
+
+    def seek(self, step: int) -> None:
+        """Move to any step: nearest keyframe at or before it, then forward simulation."""
+        step = max(0, min(step, len(self.moves)))
+        if step < self.engine.steps or step - self.engine.steps > self.keyframe_interval:
+            keyframe, self._food_cursor = self.keyframes[step // self.keyframe_interval]
+            self.engine.restore(keyframe)
+        while self.engine.steps < step:
+            self.engine.step(*self.moves[self.engine.steps])
+
+    def advance(self, steps: int = 1) -> None:
+        self.seek(self.engine.steps + steps)
+
+    @classmethod
+    def from_store(cls, directory: str, game_index: int, **kwargs) -> 'GameReplay':
+        """Load a game recorded by ScenarioSimulationRunner(record_dir=...)."""
+        store = TrajectoryStore(directory)
+        game = store.load_game(game_index)
+        if game is None:
+            raise KeyError(f"Game {game_index} not found in {directory}")
+        return cls(
+            Scenario.from_dict(store.meta['scenario']),
+            game.moves,
+            game.food_positions(),
+            winner=game.winner,
+            **kwargs
+        )
+
+    @classmethod
+    def from_seed(cls, strategy1_class, strategy2_class, seed: int, game_index: int,
+                  scenario: Optional[Scenario] = None, crn: bool = False, mirror: bool = False,
+                  detect_cycles: bool = True, stall_limit: Optional[int] = None,
+                  **kwargs) -> 'GameReplay':
+        """
+        Re-simulate one game of a seeded run (seed=..., game i) and replay it.
+        crn, mirror, detect_cycles and stall_limit must be those of the run:
+        they change the food stream, the seats (odd games of a mirrored run
+        put strategy1 in seat 2) and where the game stops.
+        """
+        from .runner import ScenarioSimulationRunner
+
+        runner = ScenarioSimulationRunner(strategy1_class, strategy2_class, num_runs=1, silent=True,
+                                          seed=seed, scenario=scenario, crn=crn, mirror=mirror,
+                                          detect_cycles=detect_cycles, stall_limit=stall_limit)
+        recorder = MemoryRecorder()
+        runner.run_single_game(None, game_index, recorder=recorder)
+        return cls(
+            runner.scenario,
+            recorder.moves,
+            recorder.foods,
+            winner=recorder.winner,
+            **kwargs
+        )
+
+    @classmethod
+    def from_results(cls, directory: str, strategy1_class, strategy2_class, game_index: int,
+                     scenario: Optional[Scenario] = None, **kwargs) -> 'GameReplay':
+        """
+        Re-simulate game `game_index` of a cell of a results store
+        (ScenarioSimulationRunner(results_dir=...)) with the seed and run
+        options stored alongside it.
+        """
+        from .results_store import ResultsStore
+
+        scenario = scenario or get_scenario(CASE)
+        store = ResultsStore(directory).select(case=scenario.name, strategy1=strategy1_class.__name__,
+                                               strategy2=strategy2_class.__name__)
+        if not len(store):
+            raise KeyError(f"No games of {strategy1_class.__name__} vs {strategy2_class.__name__} "
+                           f"({scenario.name}) in {directory}")
+        run = store.run_options()
+        if run is None or run['base_seed'] is None:
+            raise ValueError(f"{directory} does not record the run seed and options of these games")
+        return cls.from_seed(strategy1_class, strategy2_class, run['base_seed'], game_index,
+                             scenario=scenario, crn=run['crn'], mirror=run['mirror'],
+                             detect_cycles=run['detect_cycles'], stall_limit=run['stall_limit'], **kwargs)
@@ -0,0 +1,186 @@
+# src/simulation/results_store.py
+"""
+Columnar per-game results store.
+
+A store is a directory of chunks. Each chunk is a directory holding one
+memory-mapped ``.npy`` file per column (fixed capacity, sparse on disk),
+a ``rows.npy`` fill counter and a ``chunk.json`` with the attributes that
+are constant for the whole chunk (case and strategies, plus the run options
+needed to re-simulate its games under ``run``: base seed, crn, mirror,
+detect_cycles, stall_limit). Every process
+appends to its own chunks, so pool workers never send rows to the parent,
+and readers only map the columns they ask for.
+"""
+import glob
+import json
+import os
+import uuid
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+COLUMNS = {
+    'game': '<u8',
+    'seed': '<u8',
+    'winner': 'i1',      # 1, 2, or 0 for a draw (strategy1 / strategy2, whatever the seat)
+    'mirrored': 'u1',    # 1 if strategy1 played in seat 2 (mirrored pairing)
+    'score1': '<i4',
+    'score2': '<i4',
+    'length1': '<u2',
+    'length2': '<u2',
+    'steps': '<u4',
+    'resets1': '<u2',
+    'resets2': '<u2',
+}
+CHUNK_ATTRIBUTES = ('case', 'strategy1', 'strategy2')
+
+
+class ResultsWriter:
+    """Per-process appender for one (case, strategy1, strategy2) combination."""
+
+    def __init__(self, directory: str, attributes: Dict[str, str], rows_per_chunk: int = 1 << 16):
+        self.directory = directory
+        self.attributes = {key: str(attributes[key]) for key in CHUNK_ATTRIBUTES}
+        if attributes.get('run') is not None:
+            self.attributes['run'] = dict(attributes['run'])
+        self.rows_per_chunk = rows_per_chunk
+        self._token = f"{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self._chunk_index = 0
+        self._open_chunk()
+
+    def _open_chunk(self) -> None:
+        path = os.path.join(self.directory, f"chunk_{self._token}_{self._chunk_index:04d}")
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, 'chunk.json'), 'w') as f:
+            json.dump(self.attributes, f)
+        self._columns = {
+            name: np.lib.format.open_memmap(os.path.join(path, f'{name}.npy'), mode='w+',
+                                            dtype=dtype, shape=(self.rows_per_chunk,))
+            for name, dtype in COLUMNS.items()
+        }
+        self._rows = np.lib.format.open_memmap(os.path.join(path, 'rows.npy'), mode='w+',
+                                               dtype=np.uint64, shape=(1,))
+        self._n = 0
+        self._chunk_index += 1
+
+    def append(self, **row) -> None:
+        if self._n >= self.rows_per_chunk:
+            self.close()
+            self._open_chunk()
+        n = self._n
+        for name, column in self._columns.items():
+            column[n] = row[name]
+        self._n = n + 1
+        # Counter last: readers never see a half-written row
+        self._rows[0] = self._n
+
+    def close(self) -> None:
+        for column in self._columns.values():
+            column.flush()
+        self._rows.flush()
+
+
+_writers: Dict[Tuple, ResultsWriter] = {}
+
+
+def get_results_writer(directory: str, **attributes) -> ResultsWriter:
+    """Return this process's writer for a store and chunk attributes, creating it on first use."""
+    run = attributes.get('run')
+    key = (directory,) + tuple(str(attributes[k]) for k in CHUNK_ATTRIBUTES) + (
+        tuple(sorted(run.items())) if run else None,)
+    writer = _writers.get(key)
+    if writer is None:
+        writer = _writers[key] = ResultsWriter(directory, attributes)
+    return writer
+
+
+def write_chunk(directory: str, attributes: Dict[str, str], columns: Dict[str, np.ndarray]) -> str:
+    """Write a whole chunk at once (same layout as ResultsWriter) and return its path."""
+    rows = len(columns['game'])
+    path = os.path.join(directory, f"chunk_{os.getpid()}_{uuid.uuid4().hex[:8]}_0000")
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, 'chunk.json'), 'w') as f:
+        json.dump({key: str(attributes[key]) for key in CHUNK_ATTRIBUTES}, f)
+    for name, dtype in COLUMNS.items():
+        np.save(os.path.join(path, f'{name}.npy'), np.asarray(columns[name], dtype=dtype))
+    # Counter last: readers never see a half-written chunk
+    np.save(os.path.join(path, 'rows.npy'), np.array([rows], dtype=np.uint64))
+    return path
+
+
+class ResultsStore:
+    """Lazy reader: only the requested columns of the selected chunks are mapped."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.chunks: List[Tuple[str, Dict[str, str], int]] = []
+        for rows_path in sorted(glob.glob(os.path.join(directory, 'chunk_*', 'rows.npy'))):
+            path = os.path.dirname(rows_path)
+            rows = int(np.load(rows_path)[0])
+            if rows == 0:
+                continue
+            with open(os.path.join(path, 'chunk.json')) as f:
+                attributes = json.load(f)
+            self.chunks.append((path, attributes, rows))
+
+    def __len__(self) -> int:
+        return sum(rows for _, _, rows in self.chunks)
+
+    def categories(self, attribute: str) -> List[str]:
+        """Sorted distinct values of a chunk attribute (case, strategy1, strategy2)."""
+        return sorted({attributes[attribute] for _, attributes, _ in self.chunks})
+
+    def select(self, **filters) -> 'ResultsStore':
+        """Sub-store restricted to chunks whose attributes match, e.g. select(case='Classic Start')."""
+        subset = ResultsStore.__new__(ResultsStore)
+        subset.directory = self.directory
+        subset.chunks = [
+            chunk for chunk in self.chunks
+            if all(chunk[1][key] == str(value) for key, value in filters.items())
+        ]
+        return subset
+
+    def run_options(self) -> Optional[Dict]:
+        """
+        Run options of the selected chunks ({'base_seed', 'crn', 'mirror', ...}),
+        None if they were not stored; ValueError if the chunks come from different runs.
+        """
+        runs = {json.dumps(attributes['run'], sort_keys=True)
+                for _, attributes, _ in self.chunks if 'run' in attributes}
+        if len(runs) > 1:
+            raise ValueError(f"{self.directory} mixes {len(runs)} runs of these games")
+        return json.loads(runs.pop()) if runs else None
+
+    def iter_chunks(self, columns: Sequence[str]) -> Iterator[Tuple[Dict[str, str], Dict[str, np.ndarray]]]:
+        """Yield (attributes, {column: memmap}) chunk by chunk without copying."""
+        for path, attributes, rows in self.chunks:
+            yield attributes, {
+                name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')[:rows]
+                for name in columns
+            }
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        One column over all selected chunks. Chunk attributes are returned
+        as integer codes into categories(name).
+        """
+        if name in CHUNK_ATTRIBUTES:
+            codes = {value: i for i, value in enumerate(self.categories(name))}
+            parts = [np.full(rows, codes[attributes[name]], dtype=np.uint16)
+                     for _, attributes, rows in self.chunks]
+            return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint16)
+        parts = [columns[name] for _, columns in self.iter_chunks([name])]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=COLUMNS[name])
+
+    def to_dataframe(self, columns: Optional[Sequence[str]] = None):
+        """Load the requested columns into a pandas DataFrame (attributes as categoricals)."""
+        import pandas as pd
+
+        columns = list(columns or list(CHUNK_ATTRIBUTES) + list(COLUMNS))
+        data = {}
+        for name in columns:
+            values = self.column(name)
+            if name in CHUNK_ATTRIBUTES:
+                values = pd.Categorical.from_codes(values.astype(np.int32), self.categories(name))
+            data[name] = values
+        return pd.DataFrame(data)
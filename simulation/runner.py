@@ -1,35 +1,42 @@
-from typing import Tuple, List, Dict, Any
-from tqdm import tqdm
+from typing import Tuple, List, Dict, Any, NamedTuple, Optional, TYPE_CHECKING
 from datetime import datetime
+from functools import partial
+import copy
 import os
 import random
 import statistics
 import ast
+import dataclasses
 import multiprocessing
 
 from ..common.enums import Direction
-from ..core.snake import Snake
 from ..core.game_state import GameState
-from ..common.constants import GameConfig
-#################### A MODIFIER POUR LES SIMULATIONS ####################
-from ..common.constants import (
-    CUSTOM_SNAKE1_POSITION,
-    CUSTOM_SNAKE2_POSITION,
-    CUSTOM_SNAKE1_DIRECTION,
-    CUSTOM_SNAKE2_DIRECTION
-)
-from ..common.constants import (
-    DEFAULT_SNAKE1_POSITION,
-    DEFAULT_SNAKE2_POSITION,
-    DEFAULT_SNAKE1_DIRECTION,
-    DEFAULT_SNAKE2_DIRECTION
-)
-from ..common.constants import (
-    SNAKE1_LENGTH,
-    SNAKE2_LENGTH,
-    STARTING_SCORE_SNAKE1,
-    STARTING_SCORE_SNAKE2
-)
+from ..core.engine import GameEngine, RESET1, RESET2, EAT1, EAT2
+from ..core.adjudication import Adjudicator
+from ..common.constants import GameConfig, CASE
+from ..common.scenarios import Scenario, get_scenario
+from ..common.rng import derive_seed
+from .aggregate import GameResult
+from . import spectate
+
+# Chemin headless : tqdm, numpy (recorder, results_store), cProfile et tracemalloc
+# ne sont importés qu'à la première utilisation
+if TYPE_CHECKING:
+    from .profiling import ProfileConfig
+    from .memory import MemoryConfig
+
+# Flux aléatoire réservé à la nourriture (common random numbers)
+FOOD_STREAM = 0xF00D
+MAX_STEPS = 10000
+
+
+class Opening(NamedTuple):
+    """State at the start of the first tick that draws a random number (or ends the game)."""
+    steps: int
+    keyframe: tuple
+    strategies: tuple
+    adjudicator: Optional[Adjudicator]
+
 
 class InitialPosition:
     def __init__(self, x: int, y: int, direction: Direction, description: str):
@@ -41,6 +48,7 @@ class InitialPosition:
 class ScenarioSimulationRunner:
     def run_parallel(self, num_processes: int = None):
         import time
+        from tqdm import tqdm
 
         num_processes = 8
         snake2_pos = InitialPosition(
@@ -57,15 +65,15 @@ class ScenarioSimulationRunner:
             print("\n🔹 Petit volume détecté : exécution séquentielle...")
             results_iter = []
             with tqdm(total=self.num_runs, desc="Simulations Progress", dynamic_ncols=True, unit="sim") as progress_bar:
-                for _ in range(self.num_runs):
-                    results_iter.append(self.run_single_game_wrapper(snake2_pos))
+                for game_index in range(self.num_runs):
+                    results_iter.append(self.run_single_game_wrapper(snake2_pos, game_index))
                     progress_bar.update(1)
         else:
             print("\n🔹 Lancement en mode multiprocessing...")
             with multiprocessing.Pool(processes=num_processes) as pool:
                 results_iter = pool.imap_unordered(
-                    self.run_single_game_wrapper,
-                    [snake2_pos] * self.num_runs,
+                    partial(self.run_single_game_wrapper, snake2_pos),
+                    range(self.num_runs),
                     chunksize=50
                 )
                 results_iter = tqdm(results_iter, total=self.num_runs, desc="Simulations Progress", dynamic_ncols=True, unit="sim")
@@ -83,6 +91,12 @@ class ScenarioSimulationRunner:
                 self.stats['draws'] = self.stats.get('draws', 0) + 1
 
         total_time = time.time() - start_time
+        if self.profile:
+            from .profiling import merge_profiles
+            merge_profiles(self.profile.directory)
+        if self.memory:
+            from .memory import write_memory_summary
+            write_memory_summary(self.memory.directory)
         time_per_sim = total_time / self.num_runs
         sim_per_sec = self.num_runs / total_time
 
@@ -101,24 +115,67 @@ class ScenarioSimulationRunner:
         print("==========================================\n")
 
 
-    def run_single_game_wrapper(self, snake2_pos):
-        return self.run_single_game(snake2_pos)
+    def run_single_game_wrapper(self, snake2_pos, game_index: Optional[int] = None):
+        return self.run_single_game(snake2_pos, game_index)
     
-    def __init__(self, strategy1_class, strategy2_class, num_runs: int, silent: True):
+    def __init__(self, strategy1_class, strategy2_class, num_runs: int, silent: True,
+                 seed: Optional[int] = None, record_dir: Optional[str] = None,
+                 results_dir: Optional[str] = None, crn: bool = False, mirror: bool = False,
+                 scenario: Optional[Scenario] = None, profile: Optional['ProfileConfig'] = None,
+                 memory: Optional['MemoryConfig'] = None, detect_cycles: bool = True,
+                 stall_limit: Optional[int] = None, share_prefix: bool = True):
         self.strategy1_class = strategy1_class  # <-- stocke la classe, pas l'instance
         self.strategy2_class = strategy2_class
+        # Scénario explicite (common/scenarios.json) ; par défaut celui de CASE
+        self.scenario = scenario or get_scenario(CASE)
         self.num_runs = num_runs
         self.silent = silent
         self.save_results = False
         self.config = GameConfig()
+        # Seed de base : la partie i utilise derive_seed(seed, i), donc rejouable
+        self.seed = seed
+        # Enregistrement binaire optionnel des trajectoires (un dossier par match-up)
+        self.record_dir = record_dir
+        if record_dir:
+            from .recorder import write_meta
+            write_meta(record_dir, {
+                'strategy1': strategy1_class.__name__,
+                'strategy2': strategy2_class.__name__,
+                'scenario': self.scenario.to_dict(),
+                **self.run_options(seed, crn, mirror, detect_cycles, stall_limit),
+            })
+        # Stockage colonnaire optionnel d'une ligne par partie (voir results_store.py)
+        self.results_dir = results_dir
+        self.case_name = self.scenario.name
+        # Réduction de variance : la partie i de chaque match-up partage le même flux de nourriture
+        # (crn) ; en mode miroir, les parties impaires rejouent la paire précédente sièges inversés
+        self.crn = crn
+        self.mirror = mirror
+        if mirror and not self.scenario.is_mirror_symmetric(self.config.GRID_WIDTH):
+            raise ValueError(f"Le mode miroir nécessite un cas symétrique ({self.scenario.name})")
+        self._food_rng = None
+        self._mirror_food = False
+        # Profilage échantillonné optionnel (une partie sur N, ou une fraction du temps)
+        self.profile = profile
+        # Nul déclaré dès qu'une position se répète (stratégies sans aléa), ou optionnellement
+        # après stall_limit ticks sans nourriture
+        self.detect_cycles = detect_cycles
+        self.stall_limit = stall_limit
+        # Début de partie sans aléa simulé une fois par placement des sièges, puis repris
+        # par chaque partie (résultats identiques bit pour bit)
+        self.share_prefix = share_prefix
+        self._openings: Dict[bool, Optional[Opening]] = {}
         
+        # Dossier de rapport créé seulement quand on écrit dedans (un runner par bloc de parties)
         self.sim_dir = 'scenario_simulations'
-        os.makedirs(self.sim_dir, exist_ok=True)
-        
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.run_dir = os.path.join(self.sim_dir, f'sim_{timestamp}')
-        os.makedirs(self.run_dir, exist_ok=True)
         
+        # Suivi mémoire optionnel (RSS, tracemalloc), par défaut dans le dossier du run
+        if memory and memory.directory is None:
+            memory = dataclasses.replace(memory, directory=self.run_dir)
+        self.memory = memory
+
         self.results_file = os.path.join(self.run_dir, 'results.txt')
         self.stats_file = os.path.join(self.run_dir, 'stats.txt')
         
@@ -135,131 +192,223 @@ class ScenarioSimulationRunner:
             'position_stats': {}
         }
 
+    @staticmethod
+    def run_options(seed, crn, mirror, detect_cycles, stall_limit) -> Dict:
+        """What GameReplay.from_seed needs besides the strategies and scenario to replay game i."""
+        return {'base_seed': seed, 'crn': crn, 'mirror': mirror,
+                'detect_cycles': detect_cycles, 'stall_limit': stall_limit}
+
     def init_specific_scenario(self, snake2_pos: InitialPosition) -> GameState:
-        food = self._place_food(CUSTOM_SNAKE1_POSITION, CUSTOM_SNAKE2_POSITION)
+        scenario = self.scenario
+        # Première nourriture fixée par le scénario (ex. au centre pour le cas 1), sinon aléatoire
+        food = scenario.food_position or self._place_food(scenario.snake1, scenario.snake2)
         
         state = GameState(
-        #################### A MODIFIER POUR LES SIMULATIONS ####################
-            snake1=CUSTOM_SNAKE1_POSITION.copy(),
-            snake2=CUSTOM_SNAKE2_POSITION.copy(),
+            snake1=list(scenario.snake1),
+            snake2=list(scenario.snake2),
             food_position=food,
             grid_width=self.config.GRID_WIDTH,
             grid_height=self.config.GRID_HEIGHT,
-            score1=STARTING_SCORE_SNAKE1,
-            score2=STARTING_SCORE_SNAKE2
+            score1=scenario.score1,
+            score2=scenario.score2
         )
         
         return state
 
     def _place_food(self, snake1_body: List[Tuple[int, int]], snake2_body: List[Tuple[int, int]]) -> Tuple[int, int]:
-        # Si la position des serpents correspond au cas spécifique, on place la food au centre
-        if snake1_body == [(6, 12), (5, 12)] and snake2_body == [(44, 12), (45, 12)]:
-            return (25, 12)
-        # Sinon comportement normal
+        rng = self._food_rng or random
         while True:
-            x = random.randint(0, self.config.GRID_WIDTH - 1)
-            y = random.randint(0, self.config.GRID_HEIGHT - 1)
+            x = rng.randint(0, self.config.GRID_WIDTH - 1)
+            y = rng.randint(0, self.config.GRID_HEIGHT - 1)
+            if self._mirror_food:
+                x = self.config.GRID_WIDTH - 1 - x
             if (x, y) not in snake1_body and (x, y) not in snake2_body:
                 return (x, y)
 
 
-    def run_single_game(self, snake2_pos: InitialPosition) -> Tuple[str, bool]:
-        # Création des instances fraîches UNE SEULE FOIS par partie
-        strategy1 = self.strategy1_class()
-        strategy2 = self.strategy2_class()
+    def game_seed(self, game_index: Optional[int]) -> Optional[int]:
+        """Seed of a given game, or None if the run is not seeded."""
+        if game_index is None:
+            return None
+        return derive_seed(self.seed, game_index)
 
+    def init_engine(self, snake2_pos: InitialPosition) -> GameEngine:
         game_state = self.init_specific_scenario(snake2_pos)
+        return GameEngine.from_scenario(self.scenario, game_state.food_position,
+                                        place_food=self._place_food, config=self.config)
+
+    def run_single_game(self, snake2_pos: InitialPosition, game_index: Optional[int] = None,
+                        recorder=None) -> Tuple[str, bool]:
+        result = self.play_game(game_index, recorder)
+        final_state = ([result.score1, result.length1], [result.score2, result.length2])
+        return final_state, result.winner == 0
+
+    def play_game(self, game_index: Optional[int] = None, recorder=None) -> GameResult:
+        """Play one game and return its outcome from strategy1's side."""
+        if self.memory:
+            from .memory import get_memory_monitor
+            get_memory_monitor(self.memory).tick()
+        if self.profile:
+            from .profiling import get_profiler
+            profiler = get_profiler(self.profile)
+            if profiler.should_profile(game_index):
+                return profiler.run(self._play_game, game_index, recorder)
+        return self._play_game(game_index, recorder)
+
+    def _play_game(self, game_index: Optional[int], recorder) -> GameResult:
+        seed = self.game_seed(game_index)
+        if recorder is None and self.record_dir:
+            from .recorder import get_recorder
+            recorder = get_recorder(self.record_dir)
+        if seed is None and (recorder or self.results_dir):
+            # Une partie enregistrée doit toujours être reproductible
+            seed = random.getrandbits(63)
+        if seed is not None:
+            random.seed(seed)
+
+        mirrored = self.mirror and game_index is not None and game_index % 2 == 1
+        pair_index = game_index // 2 if self.mirror and game_index is not None else game_index
+        food_seed = derive_seed(self.seed, pair_index, FOOD_STREAM) if self.crn and pair_index is not None else None
+        self._food_rng = random.Random(food_seed) if food_seed is not None else None
+        self._mirror_food = mirrored
 
-        snake1 = Snake(game_state.snake1.copy(), CUSTOM_SNAKE1_DIRECTION)
-        snake2 = Snake(game_state.snake2.copy(), CUSTOM_SNAKE2_DIRECTION)
+        # Création des instances fraîches UNE SEULE FOIS par partie
+        if mirrored:
+            strategy1 = self.strategy2_class()
+            strategy2 = self.strategy1_class()
+        else:
+            strategy1 = self.strategy1_class()
+            strategy2 = self.strategy2_class()
+
+        engine = self.init_engine(None)
+        # Partie éventuellement diffusée au viewer d'un batch (simulation.spectate)
+        streamed = spectate.claim_game(self.case_name, strategy1.__class__.__name__,
+                                       strategy2.__class__.__name__, game_index, seed)
+        # Les parties enregistrées ou diffusées gardent tous leurs coups : pas de reprise d'ouverture
+        opening = self.opening(mirrored) if self.share_prefix and not (recorder or streamed) else None
+        if opening:
+            engine.restore(opening.keyframe)
+            strategy1, strategy2 = copy.deepcopy(opening.strategies)
+        game_state = engine.state
+
+        if recorder:
+            from .recorder import EVENT_EAT, EVENT_RESET
+            recorder.begin_game(-1 if game_index is None else game_index, seed,
+                                self.scenario.direction1, self.scenario.direction2,
+                                game_state.food_position, game_state.score1, game_state.score2)
 
-        history = []
         # Supposons que max_steps soit initialisé en haut
-        max_steps = 10000
-        is_draw = False
+        max_steps = MAX_STEPS
+        adjudicator = None
+        if opening and opening.adjudicator:
+            adjudicator = opening.adjudicator.fork(engine, (strategy1, strategy2))
+        elif self.detect_cycles or self.stall_limit:
+            adjudicator = Adjudicator(engine, (strategy1, strategy2), self.detect_cycles, self.stall_limit)
+        adjudication = 0
+        if streamed:
+            spectate.send_tick(engine)
 
         while True:
             direction1 = strategy1.get_next_move(game_state, 1)
             direction2 = strategy2.get_next_move(game_state, 2)
 
-            next_head1 = (snake1.head[0] + direction1.value[0], snake1.head[1] + direction1.value[1])
-            next_head2 = (snake2.head[0] + direction2.value[0], snake2.head[1] + direction2.value[1])
-
-            hit_wall1 = not (0 <= next_head1[0] < game_state.grid_width and 0 <= next_head1[1] < game_state.grid_height)
-            hit_wall2 = not (0 <= next_head2[0] < game_state.grid_width and 0 <= next_head2[1] < game_state.grid_height)
+            events = engine.step(direction1, direction2)
 
-            snake1_body = set(snake1.body[:-1])
-            snake2_body = set(snake2.body[:-1])
-
-            collide1 = next_head1 in snake1_body or next_head1 in snake2.body
-            collide2 = next_head2 in snake2_body or next_head2 in snake1.body
-
-            head_on_collision = next_head1 == next_head2
-
-
-            if head_on_collision:
-                # Reset Snake1
-                game_state.snake1 = DEFAULT_SNAKE1_POSITION.copy()
-                snake1 = Snake(game_state.snake1, DEFAULT_SNAKE1_DIRECTION)
-                snake1.body = DEFAULT_SNAKE1_POSITION.copy()
-
-                # Reset Snake2
-                game_state.snake2 = DEFAULT_SNAKE2_POSITION.copy()
-                snake2 = Snake(game_state.snake2, DEFAULT_SNAKE2_DIRECTION)
-                snake2.body = DEFAULT_SNAKE2_POSITION.copy()
-            else:
-                if hit_wall1 or collide1:
-                    game_state.snake1 = DEFAULT_SNAKE1_POSITION.copy()
-                    snake1 = Snake(game_state.snake1, DEFAULT_SNAKE1_DIRECTION)
-                    snake1.body = DEFAULT_SNAKE1_POSITION.copy()
-                else:
-                    snake1.set_direction(direction1)
-                    snake1.move(game_state.grid_width, game_state.grid_height, snake2)
-
-                if hit_wall2 or collide2:
-                    game_state.snake2 = DEFAULT_SNAKE2_POSITION.copy()
-                    snake2 = Snake(game_state.snake2, DEFAULT_SNAKE2_DIRECTION)
-                    snake2.body = DEFAULT_SNAKE2_POSITION.copy()
-                else:
-                    snake2.set_direction(direction2)
-                    snake2.move(game_state.grid_width, game_state.grid_height, snake1)
-
-            game_state.snake1 = snake1.body
-            game_state.snake2 = snake2.body
-
-            # Nourriture
-            if snake1.head == game_state.food_position:
-                points = self.config.calculate_points(len(snake1.body))
-                snake1.grow()
-                game_state.score1 = game_state.score1 + points
-                game_state.score2 = max(0, game_state.score2 - points)    # Pas de score négatif
-                game_state.food_position = self._place_food(game_state.snake1, game_state.snake2)
-
-            elif snake2.head == game_state.food_position:
-                points = self.config.calculate_points(len(snake2.body))
-                snake2.grow()
-                game_state.score2 = game_state.score2 + points 
-                game_state.score1 = max(0, game_state.score1 - points)    # Pas de score négatif
-                game_state.food_position = self._place_food(game_state.snake1, game_state.snake2)
-
-            history.append(([game_state.score1, len(snake1.body)], [game_state.score2, len(snake2.body)]))
+            if recorder:
+                recorder.record_moves(direction1, direction2)
+                if events & (RESET1 | RESET2):
+                    recorder.record_event(EVENT_RESET, events & (RESET1 | RESET2), (0, 0),
+                                          game_state.score1, game_state.score2)
+                if events & (EAT1 | EAT2):
+                    recorder.record_event(EVENT_EAT, 1 if events & EAT1 else 2, game_state.food_position,
+                                          game_state.score1, game_state.score2)
+            if streamed:
+                streamed = spectate.send_tick(engine)
 
             # === FIN DE PARTIE ? ===
-            if game_state.score1 >= self.config.WINNING_SCORE:
-                winner = 1
+            winner = engine.winner
+            if winner:
                 break
-            elif game_state.score2 >= self.config.WINNING_SCORE:
-                winner = 2
+            elif engine.steps >= max_steps:
                 break
-            elif len(history) >= max_steps:
-                is_draw = True
-                break
-
-        #print(f"FIN DE PARTIE : score1={game_state.score1}, score2={game_state.score2}, steps={len(history)}")
-        final_state = ([game_state.score1, len(snake1.body)], [game_state.score2, len(snake2.body)])
-        return final_state, is_draw
-
-
+            elif adjudicator:
+                adjudication = adjudicator.check(events)
+                if adjudication:
+                    break
+
+        snake1, snake2 = engine.snake1, engine.snake2
+        if streamed:
+            spectate.end_game(winner)
+        if recorder:
+            recorder.end_game(winner, game_state.score1, game_state.score2,
+                              len(snake1.body), len(snake2.body))
+
+        # Résultats toujours exprimés du point de vue de strategy1 (sièges inversés en miroir)
+        result1 = [game_state.score1, len(snake1.body), engine.resets1]
+        result2 = [game_state.score2, len(snake2.body), engine.resets2]
+        if mirrored:
+            result1, result2 = result2, result1
+            winner = {1: 2, 2: 1}.get(winner, 0)
+        result = GameResult(-1 if game_index is None else game_index, seed, winner,
+                            result1[0], result2[0], result1[1], result2[1],
+                            engine.steps, result1[2], result2[2], mirrored,
+                            adjudication, max_steps - engine.steps if adjudication else 0)
+
+        if self.results_dir:
+            from .results_store import get_results_writer
+            writer = get_results_writer(self.results_dir, case=self.case_name,
+                                        strategy1=self.stats['strategy1_name'],
+                                        strategy2=self.stats['strategy2_name'],
+                                        run=self.run_options(self.seed, self.crn, self.mirror,
+                                                             self.detect_cycles, self.stall_limit))
+            writer.append(game=-1 if game_index is None else game_index, seed=seed, winner=winner,
+                          mirrored=mirrored, score1=result1[0], score2=result2[0],
+                          length1=result1[1], length2=result2[1],
+                          steps=engine.steps, resets1=result1[2], resets2=result2[2])
+        return result
+
+
+
+    def opening(self, mirrored: bool = False) -> Optional[Opening]:
+        """
+        Longest start of a game that draws no random number, whatever the seed:
+        played once per seating with the RNG watched, and cached. None when the
+        very first tick (or the initial food) is random.
+        """
+        if mirrored in self._openings:
+            return self._openings[mirrored]
+        saved = random.getstate(), self._food_rng, self._mirror_food
+        # Nourriture tirée du RNG global pendant la découverte : tout tirage est détecté
+        self._food_rng, self._mirror_food = None, mirrored
+        random.seed(0)
+        untouched = random.getstate()
+        opening = None
+        try:
+            if mirrored:
+                strategy1, strategy2 = self.strategy2_class(), self.strategy1_class()
+            else:
+                strategy1, strategy2 = self.strategy1_class(), self.strategy2_class()
+            engine = self.init_engine(None)
+            adjudicator = None
+            if self.detect_cycles or self.stall_limit:
+                adjudicator = Adjudicator(engine, (strategy1, strategy2), self.detect_cycles, self.stall_limit)
+            while random.getstate() == untouched:
+                candidate = Opening(engine.steps, engine.keyframe(), copy.deepcopy((strategy1, strategy2)),
+                                    copy.copy(adjudicator))
+                events = engine.step(strategy1.get_next_move(engine.state, 1),
+                                     strategy2.get_next_move(engine.state, 2))
+                # Même ordre de fin de partie que _play_game
+                ended = engine.winner or engine.steps >= MAX_STEPS or (adjudicator and adjudicator.check(events))
+                if ended or random.getstate() != untouched:
+                    opening = candidate
+                    break
+        finally:
+            random.setstate(saved[0])
+            self._food_rng, self._mirror_food = saved[1:]
+        if opening and not opening.steps:
+            opening = None
+        self._openings[mirrored] = opening
+        return opening
 
     def run(self):
         center_y = self.config.GRID_HEIGHT // 2
@@ -278,9 +427,10 @@ class ScenarioSimulationRunner:
             'avg_score2': [],
         }
 
+        from tqdm import tqdm
         print(f"\nRunning simulations for Snake 2 {snake2_start_pos.description}")
-        for _ in tqdm(range(self.num_runs), desc="Progress"):
-            final_state, is_draw = self.run_single_game(snake2_start_pos)
+        for game_index in tqdm(range(self.num_runs), desc="Progress"):
+            final_state, is_draw = self.run_single_game(snake2_start_pos, game_index)
             score1, length1 = final_state[0]
             score2, length2 = final_state[1]
 
@@ -311,6 +461,7 @@ class ScenarioSimulationRunner:
             self.save_and_print_report()
 
     def save_and_print_report(self):
+        os.makedirs(self.run_dir, exist_ok=True)
         with open(self.stats_file, 'w') as f:
             f.write(f"=== Specific Scenario Simulation Report ===\n")
             f.write(f"Strategies: {self.stats['strategy1_name']} vs {self.stats['strategy2_name']}\n")
@@ -0,0 +1,171 @@
+# src/simulation/shards.py
+"""
+Sharded tournaments for multi-node runs.
+
+A tournament (scenarios, strategies, games per cell, seed, crn, block size)
+is cut into the deterministic block list of batch.plan_blocks. Shard i of N
+plays blocks i, i+N, i+2N, ... and writes a self-describing partial file
+(full configuration + MatchupAggregate counters). merge_partials checks that
+every shard of the same tournament is present exactly once and sums them.
+"""
+import json
+import os
+import socket
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..common.scenarios import Scenario
+from ..strategies.registry import get_strategy_class
+from .aggregate import MatchupAggregate
+from .batch import BlockJob, CellKey, plan_blocks, block_results, worker_setup
+from .memory import write_memory_summary
+
+PARTIAL_FORMAT = 'chainduel-partial-aggregate'
+PARTIAL_VERSION = 1
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """'3/16' -> (3, 16); shards are numbered from 0 to N-1."""
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard invalide : {text!r} (attendu i/N)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard invalide : {text!r} (0 <= i < N)")
+    return index, count
+
+
+def resolve_strategies(names: Sequence[str]) -> List[type]:
+    """Strategy classes from names, with or without the 'Strategy' suffix."""
+    return [get_strategy_class(name) for name in names]
+
+
+def tournament_config(scenarios: Sequence[Scenario], strategies: Sequence[type], num_runs: int,
+                      seed: int, crn: bool, block_size: int, num_shards: int,
+                      detect_cycles: bool = True, stall_limit: Optional[int] = None) -> Dict:
+    """Everything that determines which games a shard plays."""
+    return {
+        'scenarios': [scenario.to_dict() for scenario in scenarios],
+        'strategies': [strategy.__name__ for strategy in strategies],
+        'games': num_runs,
+        'seed': seed,
+        'crn': crn,
+        'block_size': block_size,
+        'num_shards': num_shards,
+        'detect_cycles': detect_cycles,
+        'stall_limit': stall_limit,
+    }
+
+
+def shard_blocks(jobs: Sequence[BlockJob], index: int, count: int) -> List[BlockJob]:
+    """Round-robin slice: neighbouring blocks (same cell) land on different shards."""
+    return list(jobs[index::count])
+
+
+def run_shard(config: Dict, index: int, processes: Optional[int] = None, progress: bool = True,
+              monitor=None, profile=None, memory=None, spectator=None) -> Dict:
+    """Play one shard of a tournament and return its partial-aggregate document."""
+    from tqdm import tqdm
+
+    scenarios = [Scenario.from_dict(data) for data in config['scenarios']]
+    strategies = resolve_strategies(config['strategies'])
+    jobs = plan_blocks(scenarios, strategies, config['games'], config['seed'],
+                       config['crn'], config['block_size'], profile=profile, memory=memory,
+                       detect_cycles=config.get('detect_cycles', True), stall_limit=config.get('stall_limit'))
+    mine = shard_blocks(jobs, index, config['num_shards'])
+
+    started = time.time()
+    aggregates: Dict[CellKey, MatchupAggregate] = {}
+    with tqdm(total=sum(job.stop - job.start for job in mine), desc=f"Shard {index}/{config['num_shards']}",
+              unit="game", dynamic_ncols=True, disable=not progress) as progress_bar:
+        initializer, initargs = worker_setup(monitor, spectator)
+        if monitor:
+            monitor.start(len(mine))
+        if spectator:
+            spectator.start()
+        try:
+            for key, _, aggregate, _ in block_results(mine, processes, initializer, initargs, memory):
+                if monitor:
+                    monitor.block_done(aggregate)
+                if key in aggregates:
+                    aggregates[key].merge(aggregate)
+                else:
+                    aggregates[key] = aggregate
+                progress_bar.update(aggregate.games)
+        finally:
+            if monitor:
+                monitor.stop()
+            if spectator:
+                spectator.stop()
+    if memory:
+        write_memory_summary(memory.directory)
+
+    return {
+        'format': PARTIAL_FORMAT,
+        'version': PARTIAL_VERSION,
+        'config': config,
+        'shard': index,
+        'blocks': len(mine),
+        'games': sum(aggregate.games for aggregate in aggregates.values()),
+        'host': socket.gethostname(),
+        'elapsed_seconds': round(time.time() - started, 3),
+        'aggregates': [aggregate.to_dict() for aggregate in aggregates.values()],
+    }
+
+
+def partial_path(directory: str, index: int, count: int) -> str:
+    return os.path.join(directory, f"partial_{index:05d}_of_{count:05d}.json")
+
+
+def write_partial(partial: Dict, path: str) -> None:
+    """Atomic write, so a killed job never leaves a truncated shard behind."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(partial, f)
+    os.replace(tmp_path, path)
+
+
+def load_partial(path: str) -> Dict:
+    with open(path) as f:
+        partial = json.load(f)
+    if partial.get('format') != PARTIAL_FORMAT:
+        raise ValueError(f"{path} n'est pas un fichier d'agrégats partiels")
+    if partial.get('version') != PARTIAL_VERSION:
+        raise ValueError(f"{path} : version {partial.get('version')} non supportée")
+    return partial
+
+
+def merge_partials(partials: Sequence[Dict], allow_missing: bool = False):
+    """
+    Combine the shards of one tournament.
+    Returns (config, {(case, strategy1, strategy2): MatchupAggregate}) in tournament order.
+    """
+    if not partials:
+        raise ValueError("Aucun fichier partiel à fusionner")
+    config = partials[0]['config']
+    seen = set()
+    for partial in partials:
+        if partial['config'] != config:
+            raise ValueError(f"Shard {partial['shard']} appartient à un autre tournoi (config différente)")
+        if partial['shard'] in seen:
+            raise ValueError(f"Shard {partial['shard']} présent plusieurs fois")
+        seen.add(partial['shard'])
+    missing = sorted(set(range(config['num_shards'])) - seen)
+    if missing and not allow_missing:
+        raise ValueError(f"Shards manquants : {missing}")
+
+    merged: Dict[CellKey, MatchupAggregate] = {}
+    for partial in sorted(partials, key=lambda p: p['shard']):
+        for data in partial['aggregates']:
+            aggregate = MatchupAggregate.from_dict(data)
+            if aggregate.key in merged:
+                merged[aggregate.key].merge(aggregate)
+            else:
+                merged[aggregate.key] = aggregate
+
+    order = [(scenario['name'], name1, name2)
+             for scenario in config['scenarios']
+             for name1 in config['strategies']
+             for name2 in config['strategies']]
+    return config, {key: merged[key] for key in order if key in merged}
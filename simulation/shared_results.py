@@ -0,0 +1,130 @@
+# src/simulation/shared_results.py
+"""
+Per-game results in shared memory.
+
+The parent allocates one ``multiprocessing.shared_memory`` segment per
+column of results_store.COLUMNS, shaped (cells, games). Pool workers attach
+by name and write every game in place at [cell, game_index], so per-game
+outcomes never go through pickling; the parent reads them back as NumPy
+views and can write them to the columnar store in one pass.
+"""
+import os
+import uuid
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .aggregate import GameResult
+from .results_store import COLUMNS, write_chunk
+
+CellKey = Tuple[str, str, str]
+FILLED = 'filled'   # 1 once the game has been written
+
+
+@dataclass(frozen=True)
+class SharedResultsSpec:
+    """Picklable handle: what a worker needs to attach to the buffers."""
+    segments: Tuple[Tuple[str, str], ...]   # (column, shared memory name)
+    cells: Tuple[CellKey, ...]
+    games: int
+
+
+class SharedResults:
+    """Owner (parent) or attachment (worker) of a set of shared result columns."""
+
+    def __init__(self, cells: Sequence[CellKey], games: int, spec: Optional[SharedResultsSpec] = None):
+        self.owner = spec is None
+        dtypes = dict(COLUMNS, **{FILLED: 'u1'})
+        shape = (len(cells), games)
+        if spec is None:
+            prefix = f"chainduel_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+            segments = tuple((name, f"{prefix}_{name}") for name in dtypes)
+            spec = SharedResultsSpec(segments, tuple(cells), games)
+        self.spec = spec
+        self.cell_index: Dict[CellKey, int] = {cell: i for i, cell in enumerate(spec.cells)}
+        self._segments = {}
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, segment_name in spec.segments:
+            dtype = np.dtype(dtypes[name])
+            if self.owner:
+                size = max(1, dtype.itemsize * shape[0] * shape[1])
+                segment = shared_memory.SharedMemory(segment_name, create=True, size=size)
+            else:
+                segment = shared_memory.SharedMemory(segment_name)
+            self._segments[name] = segment
+            self.columns[name] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        if self.owner:
+            # Mémoire partagée non initialisée sur certaines plateformes
+            self.columns[FILLED][:] = 0
+            _attached[spec] = self
+
+    def write(self, cell: int, result: GameResult) -> None:
+        """Store one game at its index; columns are written before the filled flag."""
+        game = result.game_index
+        columns = self.columns
+        columns['game'][cell, game] = game
+        columns['seed'][cell, game] = result.seed or 0
+        columns['winner'][cell, game] = result.winner
+        columns['mirrored'][cell, game] = result.mirrored
+        columns['score1'][cell, game] = result.score1
+        columns['score2'][cell, game] = result.score2
+        columns['length1'][cell, game] = result.length1
+        columns['length2'][cell, game] = result.length2
+        columns['steps'][cell, game] = result.steps
+        columns['resets1'][cell, game] = result.resets1
+        columns['resets2'][cell, game] = result.resets2
+        columns[FILLED][cell, game] = 1
+
+    def column(self, name: str, cell: Optional[CellKey] = None) -> np.ndarray:
+        """Zero-copy view of a column: (cells, games), or (games,) for one cell."""
+        values = self.columns[name]
+        return values if cell is None else values[self.cell_index[cell]]
+
+    def filled(self, cell: Optional[CellKey] = None) -> np.ndarray:
+        return self.column(FILLED, cell).astype(bool)
+
+    def to_store(self, directory: str) -> int:
+        """Write every filled game to a columnar store (one chunk per cell); returns the row count."""
+        total = 0
+        for (case, strategy1, strategy2), i in self.cell_index.items():
+            mask = self.columns[FILLED][i].astype(bool)
+            rows = int(mask.sum())
+            if not rows:
+                continue
+            write_chunk(directory, {'case': case, 'strategy1': strategy1, 'strategy2': strategy2},
+                        {name: self.columns[name][i][mask] for name in COLUMNS})
+            total += rows
+        return total
+
+    def close(self) -> None:
+        """Detach, and free the segments if this process owns them."""
+        self.columns.clear()
+        for segment in self._segments.values():
+            try:
+                segment.close()
+            except BufferError:
+                # Des vues sont encore utilisées : le mapping tombe avec elles
+                pass
+            if self.owner:
+                segment.unlink()
+        self._segments.clear()
+        _attached.pop(self.spec, None)
+
+    def __enter__(self) -> 'SharedResults':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_attached: Dict[SharedResultsSpec, SharedResults] = {}
+
+
+def attach(spec: SharedResultsSpec) -> SharedResults:
+    """This process's view of the buffers (the owner itself in the parent)."""
+    results = _attached.get(spec)
+    if results is None:
+        results = _attached[spec] = SharedResults(spec.cells, spec.games, spec)
+    return results
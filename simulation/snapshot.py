@@ -0,0 +1,210 @@
+# src/simulation/snapshot.py
+"""
+Compact game-state snapshots.
+
+A snapshot packs everything GameEngine.step and the strategies depend on:
+scores, counters, food, both snakes (head, then 2 bits per body segment),
+directions, the movement history and SNAPSHOT_FLOATS of each strategy, and
+optionally the RNG. Without the RNG a mid-game position is about 60-100
+bytes. The RNG can be stored as a 64-bit reseed value (8 bytes, for forks
+that should get their own stream) or as the full Mersenne Twister state
+(about 2.5 KB, to resume a game exactly).
+
+The CRN food stream of a runner is not part of the engine and is not saved.
+"""
+import math
+import random
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from ..common.enums import Direction
+from ..core.engine import GameEngine
+from ..strategies.registry import STRATEGIES
+
+MAGIC = b'CS'
+VERSION = 1
+RNG_SEED = 1
+RNG_FULL = 2
+
+# magic, version, flags, width, height, steps, resets1, resets2, score1, score2, food x, food y, scenario id
+_HEADER = struct.Struct('<2sBBBBIHHiiBBH')
+# direction, next direction, growing | raw body << 1, head x, head y, length
+_SNAKE = struct.Struct('<BBBBBH')
+_STRATEGY = struct.Struct('<BBB')     # class index, history length, number of floats
+_RNG_FULL = struct.Struct('<625Id')   # MT19937 words + position, gauss_next (NaN if None)
+
+DIRECTIONS = list(Direction)
+_DIRECTION_CODE = {direction: code for code, direction in enumerate(DIRECTIONS)}
+_STEP_CODE = {direction.value: code for code, direction in enumerate(DIRECTIONS)}
+_NONE = 255
+_CLASSES = list(STRATEGIES.values())
+
+
+@dataclass
+class GameSnapshot:
+    keyframe: tuple                                   # GameEngine.keyframe()
+    strategies: Tuple[Tuple[type, tuple, tuple], ...] = ()   # (class, history, floats)
+    grid: Tuple[int, int] = (0, 0)
+    scenario_id: int = 0
+    rng_seed: Optional[int] = None
+    rng_state: Optional[tuple] = None                 # random.getstate()
+
+    def to_bytes(self) -> bytes:
+        (body1, dir1, next1, grow1, body2, dir2, next2, grow2,
+         food, score1, score2, steps, resets1, resets2) = self.keyframe
+        flags = (RNG_SEED if self.rng_seed is not None else 0) | (RNG_FULL if self.rng_state is not None else 0)
+        parts = [_HEADER.pack(MAGIC, VERSION, flags, self.grid[0], self.grid[1], steps, resets1, resets2,
+                              score1, score2, food[0], food[1], self.scenario_id)]
+        parts += [_pack_snake(body1, dir1, next1, grow1), _pack_snake(body2, dir2, next2, grow2)]
+
+        parts.append(bytes([len(self.strategies)]))
+        for strategy_class, history, values in self.strategies:
+            parts.append(_STRATEGY.pack(_CLASSES.index(strategy_class), len(history), len(values)))
+            parts.append(bytes(_DIRECTION_CODE[direction] for direction in history))
+            parts.append(struct.pack(f'<{len(values)}d', *values))
+
+        if self.rng_seed is not None:
+            parts.append(struct.pack('<Q', self.rng_seed))
+        if self.rng_state is not None:
+            _, words, gauss = self.rng_state
+            parts.append(_RNG_FULL.pack(*words, math.nan if gauss is None else gauss))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'GameSnapshot':
+        (magic, version, flags, width, height, steps, resets1, resets2,
+         score1, score2, food_x, food_y, scenario_id) = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Snapshot invalide (magic={magic!r}, version={version})")
+        offset = _HEADER.size
+        body1, dir1, next1, grow1, offset = _unpack_snake(data, offset)
+        body2, dir2, next2, grow2, offset = _unpack_snake(data, offset)
+
+        strategies = []
+        count = data[offset]
+        offset += 1
+        for _ in range(count):
+            index, history_length, value_count = _STRATEGY.unpack_from(data, offset)
+            offset += _STRATEGY.size
+            history = tuple(DIRECTIONS[code] for code in data[offset:offset + history_length])
+            offset += history_length
+            values = struct.unpack_from(f'<{value_count}d', data, offset)
+            offset += 8 * value_count
+            strategies.append((_CLASSES[index], history, values))
+
+        rng_seed = rng_state = None
+        if flags & RNG_SEED:
+            rng_seed, = struct.unpack_from('<Q', data, offset)
+            offset += 8
+        if flags & RNG_FULL:
+            *words, gauss = _RNG_FULL.unpack_from(data, offset)
+            rng_state = (3, tuple(words), None if math.isnan(gauss) else gauss)
+
+        keyframe = (body1, dir1, next1, grow1, body2, dir2, next2, grow2,
+                    (food_x, food_y), score1, score2, steps, resets1, resets2)
+        return cls(keyframe, tuple(strategies), (width, height), scenario_id, rng_seed, rng_state)
+
+
+def _pack_snake(body: List[Tuple[int, int]], direction, next_direction, growing: bool) -> bytes:
+    codes = []
+    for (x0, y0), (x1, y1) in zip(body, body[1:]):
+        code = _STEP_CODE.get((x1 - x0, y1 - y0))
+        if code is None:
+            break
+        codes.append(code)
+    raw = len(codes) != len(body) - 1
+    header = _SNAKE.pack(_direction_code(direction), _direction_code(next_direction),
+                         int(growing) | (raw << 1), body[0][0], body[0][1], len(body))
+    if raw:
+        # Corps non contigu (scénario à la main) : coordonnées brutes
+        return header + bytes(value for cell in body[1:] for value in cell)
+    packed = bytearray((len(codes) + 3) // 4)
+    for i, code in enumerate(codes):
+        packed[i >> 2] |= code << ((i & 3) * 2)
+    return header + bytes(packed)
+
+
+def _unpack_snake(data: bytes, offset: int):
+    direction, next_direction, flags, head_x, head_y, length = _SNAKE.unpack_from(data, offset)
+    offset += _SNAKE.size
+    body = [(head_x, head_y)]
+    if flags & 2:
+        cells = data[offset:offset + 2 * (length - 1)]
+        body += [(cells[i], cells[i + 1]) for i in range(0, len(cells), 2)]
+        offset += 2 * (length - 1)
+    else:
+        x, y = head_x, head_y
+        for i in range(length - 1):
+            dx, dy = DIRECTIONS[(data[offset + (i >> 2)] >> ((i & 3) * 2)) & 3].value
+            x, y = x + dx, y + dy
+            body.append((x, y))
+        offset += (length - 1 + 3) // 4
+    return body, _direction(direction), _direction(next_direction), bool(flags & 1), offset
+
+
+def _direction_code(direction: Optional[Direction]) -> int:
+    return _NONE if direction is None else _DIRECTION_CODE[direction]
+
+
+def _direction(code: int) -> Optional[Direction]:
+    return None if code == _NONE else DIRECTIONS[code]
+
+
+def take_snapshot(engine: GameEngine, strategies: Sequence = (), scenario_id: int = 0,
+                  rng_seed: Optional[int] = None, full_rng: bool = False) -> GameSnapshot:
+    """
+    Capture a running game. `rng_seed` makes restore_snapshot reseed the
+    global RNG with it; `full_rng` stores the current RNG state instead.
+    """
+    return GameSnapshot(
+        engine.keyframe(),
+        tuple((type(strategy),) + strategy.snapshot_state() for strategy in strategies),
+        (engine.config.GRID_WIDTH, engine.config.GRID_HEIGHT),
+        scenario_id,
+        rng_seed,
+        random.getstate() if full_rng else None,
+    )
+
+
+def restore_snapshot(snapshot: GameSnapshot, engine: GameEngine) -> tuple:
+    """
+    Put `engine` (built for the same scenario) in the snapshot's position,
+    set the global RNG if the snapshot has one, and return fresh strategy
+    instances carrying the saved state.
+    """
+    if snapshot.grid != (engine.config.GRID_WIDTH, engine.config.GRID_HEIGHT):
+        raise ValueError(f"Snapshot pour une grille {snapshot.grid}, moteur en "
+                         f"{engine.config.GRID_WIDTH}x{engine.config.GRID_HEIGHT}")
+    engine.restore(snapshot.keyframe)
+    if snapshot.rng_state is not None:
+        random.setstate(snapshot.rng_state)
+    elif snapshot.rng_seed is not None:
+        random.seed(snapshot.rng_seed)
+    strategies = []
+    for strategy_class, history, values in snapshot.strategies:
+        strategy = strategy_class()
+        strategy.restore_state(history, values)
+        strategies.append(strategy)
+    return tuple(strategies)
+
+
+def save_snapshots(path: str, snapshots: Sequence[GameSnapshot]) -> None:
+    """Position corpus: length-prefixed snapshots in one file."""
+    with open(path, 'wb') as f:
+        for snapshot in snapshots:
+            data = snapshot.to_bytes()
+            f.write(struct.pack('<I', len(data)))
+            f.write(data)
+
+
+def load_snapshots(path: str) -> List[GameSnapshot]:
+    with open(path, 'rb') as f:
+        data = f.read()
+    snapshots, offset = [], 0
+    while offset < len(data):
+        size, = struct.unpack_from('<I', data, offset)
+        offset += 4
+        snapshots.append(GameSnapshot.from_bytes(data[offset:offset + size]))
+        offset += size
+    return snapshots
@@ -0,0 +1,185 @@
+# src/simulation/spectate.py
+"""
+Turbo spectate: watch one live game of a running batch.
+
+The parent creates a Spectator and passes its initializer/initargs to the
+worker pool. A shared flag says whether the viewer wants a game: the first
+worker that starts a game while it is open claims it and puts one frame per
+tick (bodies, food, scores) on a bounded queue with put_nowait. A full
+queue drops the frame, so a slow or closed viewer never blocks a worker;
+every other game costs one look at the flag. The claimed game is played
+from its first tick, without the shared opening (runner.opening), so the
+viewer sees it whole.
+
+The viewer runs in its own process (the parent's result loop is untouched),
+drains the queue from its Tk after() loop, plays the game back at a
+watchable speed and reopens the flag once it is done with it.
+"""
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+# Drapeau partagé : OPEN = le viewer attend une partie, CLOSED = batch terminé, sinon pid du worker
+OPEN, CLOSED = 0, -1
+START, TICK, END = range(3)
+
+# État du worker courant (positionné par init_worker)
+_frames = None
+_claim = None
+_pid = 0
+
+
+def init_worker(frames, claim) -> None:
+    """Pool initializer: remember the frame queue and the claim flag."""
+    global _frames, _claim, _pid
+    _frames, _claim, _pid = frames, claim, os.getpid()
+    # Un worker ne doit jamais attendre le viewer en sortant (frames encore en tampon)
+    frames.cancel_join_thread()
+
+
+def _send(frame: tuple) -> None:
+    try:
+        _frames.put_nowait(frame)
+    except queue.Full:
+        pass   # viewer en retard : la frame est perdue, pas la partie
+
+
+def claim_game(case: str, strategy1: str, strategy2: str, game_index: Optional[int], seed: Optional[int]) -> bool:
+    """True if this game is the one streamed to the viewer (its header is sent)."""
+    # Lecture sans verrou d'abord : le verrou n'est pris que si le viewer attend une partie
+    if _claim is None or _claim.get_obj().value != OPEN:
+        return False
+    with _claim.get_lock():
+        if _claim.value != OPEN:
+            return False
+        _claim.value = _pid
+    _send((START, case, strategy1, strategy2, game_index, seed))
+    return True
+
+
+def send_tick(engine) -> bool:
+    """Stream the current tick; False once the viewer has moved on to another game."""
+    # Lecture sans verrou : seul le viewer peut retirer la partie à ce worker
+    if _claim.get_obj().value != _pid:
+        return False
+    state = engine.state
+    _send((TICK, engine.steps, tuple(state.snake1), tuple(state.snake2),
+           state.food_position, state.score1, state.score2))
+    return True
+
+
+def end_game(winner: int) -> None:
+    if _claim.get_obj().value == _pid:
+        _send((END, winner))
+
+
+class Spectator:
+    """Parent side: the queue, the claim flag and the viewer process."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.frames = multiprocessing.Queue(maxsize)
+        self.claim = multiprocessing.Value('i', OPEN)
+        self._viewer = None
+
+    @property
+    def initializer(self):
+        return init_worker
+
+    @property
+    def initargs(self):
+        return (self.frames, self.claim)
+
+    def start(self) -> 'Spectator':
+        self._viewer = multiprocessing.Process(target=run_viewer, args=(self.frames, self.claim),
+                                               name='spectate-viewer', daemon=True)
+        self._viewer.start()
+        return self
+
+    def stop(self) -> None:
+        """No more games are streamed; the viewer window is closed with the batch."""
+        with self.claim.get_lock():
+            self.claim.value = CLOSED
+        if self._viewer is not None and self._viewer.is_alive():
+            self._viewer.terminate()
+        self.frames.cancel_join_thread()
+
+
+# --- Viewer -------------------------------------------------------------------
+
+class SpectateFeed:
+    """Viewer side: ticks of the watched game, buffered in order."""
+
+    def __init__(self, frames, claim, timeout: float = 2.0):
+        self.frames = frames
+        self.claim = claim
+        self.timeout = timeout
+        self.header: Optional[Tuple] = None   # (case, strategy1, strategy2, game_index, seed)
+        self.ticks: deque = deque()
+        self.ended = False
+        self.winner = None
+        self.dropped = 0
+        self._last_step = None
+        self._last_frame = time.time()
+
+    def poll(self) -> None:
+        """Move every queued frame into the local buffer (never blocks)."""
+        while True:
+            try:
+                frame = self.frames.get_nowait()
+            except queue.Empty:
+                return
+            self._last_frame = time.time()
+            if frame[0] == START:
+                self.header = frame[1:]
+                self.ticks.clear()
+                self.ended, self.winner, self.dropped, self._last_step = False, None, 0, None
+            elif self.header is None or self.ended:
+                continue   # reste d'une partie abandonnée
+            elif frame[0] == TICK:
+                if self._last_step is not None:
+                    self.dropped += frame[1] - self._last_step - 1
+                self._last_step = frame[1]
+                self.ticks.append(frame[1:])
+            else:
+                self.ended, self.winner = True, frame[1]
+
+    def advance(self, steps: int):
+        """The frame `steps` ticks further (the last one buffered at most), or None."""
+        frame = None
+        for _ in range(min(steps, len(self.ticks))):
+            frame = self.ticks.popleft()
+        return frame
+
+    @property
+    def finished(self) -> bool:
+        """Whole game shown, or its end lost (no frame for `timeout` seconds)."""
+        if self.header is None or self.ticks:
+            return False
+        return self.ended or time.time() - self._last_frame > self.timeout
+
+    def next_game(self) -> None:
+        """Ask the workers for a new game (unless the batch is over)."""
+        self.header = None
+        with self.claim.get_lock():
+            if self.claim.value != CLOSED:
+                self.claim.value = OPEN
+
+
+def run_viewer(frames, claim) -> None:
+    """Viewer process: a GameCanvas fed by the frame queue."""
+    import tkinter as tk
+    from ..common.constants import GameConfig
+    from ..common.enums import GameMode
+    from ..ui.game_canvas import GameCanvas
+
+    root = tk.Tk()
+    root.title("Chain Duel - live batch game")
+    config = GameConfig()
+    game = GameCanvas(root, GameMode.SIMULATION, config, feed=SpectateFeed(frames, claim))
+    game.pack(expand=True, fill='both')
+    tk.Label(root, text="Space: Pause | Up/Down: Speed | N: Next game | ESC: Quit",
+             bg=config.BACKGROUND_COLOR, fg=config.TEXT_COLOR).pack(side='bottom')
+    root.mainloop()
@@ -0,0 +1,202 @@
+# src/simulation/splitting.py
+"""
+Rare-outcome probabilities by multilevel splitting.
+
+A rare event (the underdog winning, a game ending as a draw) is reached
+through intermediate milestones of an importance function: the underdog's
+score passing 60k, 70k, ..., or the game passing 2500, 5000, ... ticks.
+
+Fixed-effort splitting: stage 0 plays `effort` games from the start until
+they pass the first milestone or end; every game that passes is saved as a
+snapshot (simulation.snapshot). Stage k restarts `effort` trials from the
+stage k-1 entrances (round-robin), each with its own fresh RNG stream,
+until they pass milestone k or end. The product of the stage success rates
+is an unbiased estimate of the event probability. The whole procedure is
+repeated `replications` times with independent seeds; the mean and standard
+error over replications give the estimate and its error bar.
+
+Cost is counted in ticks. A brute-force estimate with the same standard
+error would need about p(1-p)/se² games; `brute_force_ticks` converts that
+into ticks with the mean game length, by default the mean length of the
+stage 0 trials. Those stop at the first milestone, so the default is a
+lower bound and the reported speedup is conservative; pass the length
+measured by brute_force_estimate for an exact comparison.
+"""
+import math
+import random
+from dataclasses import dataclass, field, replace
+from statistics import NormalDist
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..common.rng import derive_seed
+from ..common.scenarios import Scenario
+from ..core.adjudication import Adjudicator
+from ..core.engine import GameEngine
+from .runner import MAX_STEPS, ScenarioSimulationRunner
+from .snapshot import GameSnapshot, restore_snapshot, take_snapshot
+
+REACHED, FAILED, CERTAIN = 1, 0, 2
+SPLIT_STREAM = 0x5B17   # flux de seeds distinct de celui des parties normales
+
+
+class RareEvent(NamedTuple):
+    name: str
+    importance: Callable[[GameEngine], float]
+    thresholds: Tuple[float, ...]   # milestones; reaching the last one is the event
+    on_cycle: bool                  # a repeated position (the game can only end as a draw) counts as the event
+
+
+def win_event(player: int, levels: int = 4, start_score: int = 50000,
+              winning_score: int = 100000) -> RareEvent:
+    """`player` (1 or 2, the runner's seats) wins; milestones evenly spaced on its score."""
+    step = (winning_score - start_score) / levels
+    thresholds = tuple(start_score + round(step * k) for k in range(1, levels)) + (winning_score,)
+    score = 'score1' if player == 1 else 'score2'
+    return RareEvent(f'win{player}', lambda engine: getattr(engine.state, score), thresholds, False)
+
+
+def draw_event(levels: int = 4, max_steps: int = MAX_STEPS) -> RareEvent:
+    """The game reaches the step cap undecided (a draw); milestones on the tick count."""
+    thresholds = tuple(round(max_steps * k / levels) for k in range(1, levels + 1))
+    return RareEvent('draw', lambda engine: -1 if engine.winner else engine.steps, thresholds, True)
+
+
+@dataclass
+class SplittingResult:
+    event: str
+    probability: float
+    se: float
+    low: float
+    high: float
+    replications: int
+    effort: int
+    ticks: int
+    stage_rates: List[float] = field(default_factory=list)   # taux moyen de passage de chaque palier
+    mean_game_ticks: float = 0.0
+
+    @property
+    def brute_force_ticks(self) -> Optional[float]:
+        """Ticks of plain simulation for the same standard error."""
+        if not self.se or not 0 < self.probability < 1:
+            return None
+        return self.probability * (1 - self.probability) / self.se ** 2 * self.mean_game_ticks
+
+    @property
+    def speedup(self) -> Optional[float]:
+        brute = self.brute_force_ticks
+        return brute / self.ticks if brute and self.ticks else None
+
+
+def _trial(engine: GameEngine, strategies, threshold: float, event: RareEvent) -> Tuple[int, int]:
+    """Play until the milestone is passed or the game ends; returns (status, ticks)."""
+    strategy1, strategy2 = strategies
+    adjudicator = Adjudicator(engine, strategies)
+    started = engine.steps
+    while True:
+        if event.importance(engine) >= threshold:
+            return REACHED, engine.steps - started
+        if engine.winner or engine.steps >= MAX_STEPS:
+            return FAILED, engine.steps - started
+        events = engine.step(strategy1.get_next_move(engine.state, 1),
+                             strategy2.get_next_move(engine.state, 2))
+        if adjudicator.check(events):
+            # Position répétée : nul certain, donc tous les paliers suivants aussi pour un nul
+            return (CERTAIN if event.on_cycle else FAILED), engine.steps - started
+
+
+def _replication(runner: ScenarioSimulationRunner, event: RareEvent, effort: int,
+                 seed: int) -> Tuple[float, List[float], int, float]:
+    """One independent splitting run: (estimate, stage rates, ticks, mean stage 0 game ticks)."""
+    estimate, rates, ticks, stage0_ticks = 1.0, [], 0, 0
+    entrances: List[Optional[bytes]] = [None]       # None = départ de partie ; CERTAIN = b''
+    for stage, threshold in enumerate(event.thresholds):
+        reached = []
+        for i in range(effort):
+            entrance = entrances[i % len(entrances)]
+            if entrance == b'':
+                reached.append(b'')
+                continue
+            trial_seed = derive_seed(seed, stage, i)
+            random.seed(trial_seed)
+            engine = runner.init_engine(None)
+            if entrance is None:
+                strategies = (runner.strategy1_class(), runner.strategy2_class())
+            else:
+                # Clone du point d'entrée avec un flux aléatoire neuf
+                snapshot = replace(GameSnapshot.from_bytes(entrance), rng_seed=trial_seed)
+                strategies = restore_snapshot(snapshot, engine)
+            status, played = _trial(engine, strategies, threshold, event)
+            ticks += played
+            if stage == 0:
+                stage0_ticks += played
+            if status == CERTAIN:
+                reached.append(b'')
+            elif status == REACHED:
+                reached.append(take_snapshot(engine, strategies).to_bytes())
+        rates.append(len(reached) / effort)
+        estimate *= rates[-1]
+        if not reached:
+            rates += [0.0] * (len(event.thresholds) - stage - 1)
+            break
+        entrances = reached
+    return estimate, rates, ticks, stage0_ticks / effort
+
+
+def split_estimate(strategy1_class, strategy2_class, event: RareEvent, scenario: Optional[Scenario] = None,
+                   effort: int = 200, replications: int = 10, seed: Optional[int] = None,
+                   confidence: float = 0.95, mean_game_ticks: Optional[float] = None) -> SplittingResult:
+    """Probability of `event` in strategy1_class vs strategy2_class (default scenario: CASE)."""
+    if seed is None:
+        seed = random.getrandbits(63)
+    runner = ScenarioSimulationRunner(strategy1_class, strategy2_class, 1, True, scenario=scenario)
+    estimates, stage_rates, ticks, game_ticks = [], [], 0, []
+    for replication in range(replications):
+        estimate, rates, played, mean_ticks = _replication(
+            runner, event, effort, derive_seed(seed, SPLIT_STREAM, replication))
+        estimates.append(estimate)
+        stage_rates.append(rates)
+        ticks += played
+        game_ticks.append(mean_ticks)
+    return summarize_estimates(event.name, estimates, stage_rates, effort, ticks,
+                               mean_game_ticks or sum(game_ticks) / len(game_ticks), confidence)
+
+
+def summarize_estimates(name: str, estimates: Sequence[float], stage_rates: Sequence[Sequence[float]],
+                        effort: int, ticks: int, mean_game_ticks: float,
+                        confidence: float = 0.95) -> SplittingResult:
+    n = len(estimates)
+    mean = sum(estimates) / n
+    se = math.sqrt(sum((x - mean) ** 2 for x in estimates) / (n - 1) / n) if n > 1 else float('nan')
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rates = [sum(column) / n for column in zip(*stage_rates)]
+    return SplittingResult(name, mean, se, max(0.0, mean - z * se), min(1.0, mean + z * se), n, effort,
+                           ticks, rates, mean_game_ticks)
+
+
+def brute_force_estimate(strategy1_class, strategy2_class, event: RareEvent, games: int,
+                         scenario: Optional[Scenario] = None, seed: Optional[int] = None,
+                         confidence: float = 0.95) -> SplittingResult:
+    """Plain simulation of the same event (one stage, one 'replication' per game) for comparison."""
+    if seed is None:
+        seed = random.getrandbits(63)
+    runner = ScenarioSimulationRunner(strategy1_class, strategy2_class, 1, True, scenario=scenario)
+    plain = event._replace(thresholds=event.thresholds[-1:])
+    outcomes, ticks = [], 0
+    for game in range(games):
+        estimate, _, played, _ = _replication(runner, plain, 1, derive_seed(seed, SPLIT_STREAM, game))
+        outcomes.append(estimate)
+        ticks += played
+    return summarize_estimates(event.name, outcomes, [[x] for x in outcomes], 1, ticks,
+                               ticks / games, confidence)
+
+
+def format_splitting(result: SplittingResult) -> str:
+    lines = [f"P({result.event}) = {result.probability:.5f} ± {result.se:.5f}  "
+             f"[{result.low:.5f}, {result.high:.5f}]  ({result.replications} x {result.effort}, "
+             f"{result.ticks:,} ticks)"]
+    if result.stage_rates and len(result.stage_rates) > 1:
+        lines.append("Stage pass rates: " + ', '.join(f"{rate:.3f}" for rate in result.stage_rates))
+    if result.speedup:
+        lines.append(f"Plain simulation would need about {result.brute_force_ticks:,.0f} ticks "
+                     f"for this error bar ({result.speedup:.1f}x)")
+    return '\n'.join(lines)
@@ -0,0 +1,266 @@
+# src/simulation/telemetry.py
+"""
+Live throughput telemetry for long simulation runs.
+
+Workers add to per-process counters (games, steps, busy seconds) held in a
+shared array and only touch it every `flush_every` games, so there is no
+per-game message. Each live worker owns one slot (its pid is in `owners`);
+a worker hands its slot back when it exits, and the slot of a worker that
+died without exiting cleanly is taken over once its pid is gone, so a
+replacement worker never shares a slot with a live one. A thread in the parent samples the array every
+`interval` seconds, adds queue depth and running win rates of the finished
+blocks, and writes one JSON line plus a Prometheus text-exposition file
+(node_exporter textfile format, rewritten atomically).
+"""
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing.util import Finalize
+from typing import Dict, Optional
+
+from .aggregate import MatchupAggregate
+
+GAMES, STEPS, BUSY = range(3)
+FIELDS = 3
+
+# Compteurs du processus courant (positionnés par init_worker)
+_counters = None
+_slot = 0
+_pending = [0, 0, 0.0]
+_last_flush = 0.0
+_flush_every = 32
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def init_worker(counters, owners, slots: int, flush_every: int = 32) -> None:
+    """Pool initializer: take a free counter slot for this process (given back at exit)."""
+    global _counters, _slot, _flush_every, _last_flush
+    pid = os.getpid()
+    with owners.get_lock():
+        table = owners.get_obj()
+        free = [slot for slot in range(slots) if table[slot] == 0 or not _alive(table[slot])]
+        if not free:
+            return   # plus de workers vivants que de slots : celui-ci n'est pas compté
+        _slot = free[0]
+        table[_slot] = pid
+    _counters = counters
+    _flush_every = flush_every
+    _last_flush = time.perf_counter()
+    Finalize(None, _release, args=(owners, _slot, pid), exitpriority=10)
+
+
+def _release(owners, slot: int, pid: int) -> None:
+    """At worker exit: flush what is left and hand the slot back."""
+    flush()
+    with owners.get_lock():
+        table = owners.get_obj()
+        if table[slot] == pid:
+            table[slot] = 0
+
+
+def record_game(steps: int, busy_seconds: float) -> None:
+    """Count one game locally; the shared counters are updated in batches."""
+    if _counters is None:
+        return
+    _pending[GAMES] += 1
+    _pending[STEPS] += steps
+    _pending[BUSY] += busy_seconds
+    if _pending[GAMES] >= _flush_every or time.perf_counter() - _last_flush > 1.0:
+        flush()
+
+
+def flush() -> None:
+    global _last_flush
+    if _counters is None or not _pending[GAMES]:
+        return
+    base = _slot * FIELDS
+    # Un seul écrivain par slot : pas de verrou nécessaire
+    _counters[base + GAMES] += _pending[GAMES]
+    _counters[base + STEPS] += _pending[STEPS]
+    _counters[base + BUSY] += _pending[BUSY]
+    _pending[:] = [0, 0, 0.0]
+    _last_flush = time.perf_counter()
+
+
+def win_rate_interval(aggregate: MatchupAggregate, z: float = 1.96):
+    """Strategy1 win rate and its normal-approximation confidence interval."""
+    n = max(aggregate.games, 1)
+    p = aggregate.wins1 / n
+    se = aggregate.se_win_rate1
+    if se is None:
+        se = math.sqrt(p * (1 - p) / n)
+    return p, max(0.0, p - z * se), min(1.0, p + z * se)
+
+
+class Telemetry:
+    """Parent-side sampler; pass `initializer`/`initargs` to the worker pool."""
+
+    def __init__(self, directory: str, interval: float = 5.0, slots: Optional[int] = None,
+                 flush_every: int = 32, name: str = 'telemetry'):
+        self.directory = directory
+        self.interval = interval
+        self.slots = slots or 4 * (os.cpu_count() or 1)
+        self.counters = multiprocessing.Array('d', self.slots * FIELDS, lock=False)
+        self.owners = multiprocessing.Array('i', self.slots)   # pid du worker de chaque slot, 0 = libre
+        self.flush_every = flush_every
+        self.jsonl_path = os.path.join(directory, f'{name}.jsonl')
+        self.prom_path = os.path.join(directory, f'{name}.prom')
+        self.aggregates: Dict = {}
+        self.blocks_total = 0
+        self.blocks_done = 0
+        self.queue_depth = None
+        self._block_games = 0
+        self._block_steps = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._previous = None
+
+    @property
+    def initializer(self):
+        return init_worker
+
+    @property
+    def initargs(self):
+        return (self.counters, self.owners, self.slots, self.flush_every)
+
+    def start(self, blocks_total: int) -> 'Telemetry':
+        os.makedirs(self.directory, exist_ok=True)
+        self.blocks_total = blocks_total
+        self._started = time.time()
+        self._previous = (time.time(), 0.0, 0.0, [0.0] * self.slots)
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def block_done(self, aggregate: MatchupAggregate) -> None:
+        with self._lock:
+            self.blocks_done += 1
+            self._block_games += aggregate.games
+            self._block_steps += aggregate.sum_steps
+            if aggregate.key in self.aggregates:
+                self.aggregates[aggregate.key].merge(MatchupAggregate.from_dict(aggregate.to_dict()))
+            else:
+                self.aggregates[aggregate.key] = MatchupAggregate.from_dict(aggregate.to_dict())
+
+    def set_queue_depth(self, depth: int) -> None:
+        self.queue_depth = depth
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.emit()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.emit()
+
+    def snapshot(self) -> Dict:
+        now = time.time()
+        values = list(self.counters)
+        games = sum(values[GAMES::FIELDS])
+        steps = sum(values[STEPS::FIELDS])
+        busy = values[BUSY::FIELDS]
+        if not games:
+            # Workers distants (coordinateur) : seuls les blocs terminés sont connus
+            games, steps = float(self._block_games), float(self._block_steps)
+        then, games_before, steps_before, busy_before = self._previous
+        elapsed = max(now - then, 1e-9)
+        self._previous = (now, games, steps, busy)
+
+        with self._lock:
+            blocks_done = self.blocks_done
+            # Cellules terminées par blocs entiers : pas besoin des compteurs par partie
+            cells = []
+            for (case, strategy1, strategy2), aggregate in self.aggregates.items():
+                p, low, high = win_rate_interval(aggregate)
+                cells.append({'case': case, 'strategy1': strategy1, 'strategy2': strategy2,
+                              'games': aggregate.games, 'win_rate1': round(p, 5),
+                              'ci_low': round(low, 5), 'ci_high': round(high, 5),
+                              'draw_rate': round(aggregate.draws / max(aggregate.games, 1), 5)})
+
+        # Un bloc interrompu (worker recyclé) rend un résultat partiel de plus : jamais négatif
+        queue_depth = (self.queue_depth if self.queue_depth is not None
+                       else max(0, self.blocks_total - blocks_done))
+        return {
+            'time': round(now, 3),
+            'elapsed': round(now - self._started, 3),
+            'games': int(games),
+            'steps': int(steps),
+            'games_per_sec': round((games - games_before) / elapsed, 2),
+            'steps_per_sec': round((steps - steps_before) / elapsed, 1),
+            'workers': {str(slot): round(min(1.0, (busy[slot] - busy_before[slot]) / elapsed), 3)
+                        for slot in range(self.slots) if busy[slot] > 0},
+            'blocks_done': blocks_done,
+            'blocks_total': self.blocks_total,
+            'queue_depth': queue_depth,
+            'cells': cells,
+        }
+
+    def emit(self) -> Dict:
+        record = self.snapshot()
+        with open(self.jsonl_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        tmp_path = f"{self.prom_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(to_prometheus(record))
+        os.replace(tmp_path, self.prom_path)
+        return record
+
+
+def _labels(**labels) -> str:
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def to_prometheus(record: Dict) -> str:
+    lines = [
+        '# HELP chainduel_games_total Games finished since the start of the run.',
+        '# TYPE chainduel_games_total counter',
+        f"chainduel_games_total {record['games']}",
+        '# HELP chainduel_steps_total Game ticks simulated since the start of the run.',
+        '# TYPE chainduel_steps_total counter',
+        f"chainduel_steps_total {record['steps']}",
+        '# HELP chainduel_games_per_second Games finished per second over the last interval.',
+        '# TYPE chainduel_games_per_second gauge',
+        f"chainduel_games_per_second {record['games_per_sec']}",
+        '# HELP chainduel_steps_per_second Game ticks simulated per second over the last interval.',
+        '# TYPE chainduel_steps_per_second gauge',
+        f"chainduel_steps_per_second {record['steps_per_sec']}",
+        '# HELP chainduel_queue_depth Blocks still to be played.',
+        '# TYPE chainduel_queue_depth gauge',
+        f"chainduel_queue_depth {record['queue_depth']}",
+        '# HELP chainduel_blocks_done Blocks finished since the start of the run.',
+        '# TYPE chainduel_blocks_done gauge',
+        f"chainduel_blocks_done {record['blocks_done']}",
+        '# HELP chainduel_worker_utilisation Busy fraction of each worker over the last interval.',
+        '# TYPE chainduel_worker_utilisation gauge',
+    ]
+    for worker, utilisation in record['workers'].items():
+        lines.append(f"chainduel_worker_utilisation{_labels(worker=worker)} {utilisation}")
+    # Une famille = un bloc HELP/TYPE suivi de tous ses échantillons, sans entrelacement
+    for field, metric, help_text in (
+            ('win_rate1', 'chainduel_win_rate', 'Running strategy1 win rate of finished blocks.'),
+            ('ci_low', 'chainduel_win_rate_ci_low', 'Lower bound of the 95% CI of chainduel_win_rate.'),
+            ('ci_high', 'chainduel_win_rate_ci_high', 'Upper bound of the 95% CI of chainduel_win_rate.')):
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} gauge')
+        for cell in record['cells']:
+            labels = _labels(case=cell['case'], strategy1=cell['strategy1'], strategy2=cell['strategy2'])
+            lines.append(f"{metric}{labels} {cell[field]}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,237 @@
+# src/simulation/winprob.py
+"""
+Win-probability table learned from simulated positions.
+
+Every sampled tick of a simulated game is reduced to a discrete cell:
+(score1 - score2, length of each snake, Manhattan distance of each head to
+the food), and the final outcome of the game (strategy1 wins, strategy2
+wins, draw) is counted in that cell, per match-up. A lookup is an integer
+cell index and at most three array reads: WinProbabilityTable.lookup() is
+O(1), cheap enough for a UI overlay or as a leaf evaluator in searches.
+
+When a cell has fewer than `min_count` positions, the lookup backs off to
+the marginal over food distances, then to the score difference alone;
+`count` and `level` of the estimate say which one answered.
+
+The table is one uint32 array (match-ups, 3 outcomes, cells), saved with
+np.savez_compressed (most cells are empty).
+"""
+import multiprocessing
+import os
+import random
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..common.scenarios import Scenario
+from ..core.adjudication import Adjudicator
+from ..core.game_state import GameState
+from .batch import cell_seed
+from .runner import MAX_STEPS, ScenarioSimulationRunner
+
+DEFAULT_TABLE = 'win_probability.npz'
+
+# Discrétisation des positions
+SCORE_BIN = 10000
+SCORE_RANGE = 100000
+LENGTH_EDGES = (3, 4, 5, 6, 8, 11, 15)            # bornes basses des classes 1..7
+DISTANCE_EDGES = (1, 2, 3, 5, 8, 12, 18, 27, 40)   # bornes basses des classes 1..9
+SCORES = 2 * SCORE_RANGE // SCORE_BIN + 1
+LENGTHS = len(LENGTH_EDGES) + 1
+DISTANCES = len(DISTANCE_EDGES) + 1
+SHAPE = (SCORES, LENGTHS, LENGTHS, DISTANCES, DISTANCES)
+CELLS = SCORES * LENGTHS * LENGTHS * DISTANCES * DISTANCES
+OUTCOMES = {1: 0, 2: 1, 0: 2}   # winner -> index (wins1, wins2, draws)
+
+
+def _bins(edges: Sequence[int], size: int) -> List[int]:
+    """Class of every integer 0..size-1 (the last class for anything above)."""
+    return [sum(value >= edge for edge in edges) for value in range(size)]
+
+
+_LENGTH_BINS = _bins(LENGTH_EDGES, LENGTH_EDGES[-1] + 1)
+_DISTANCE_BINS = _bins(DISTANCE_EDGES, DISTANCE_EDGES[-1] + 1)
+
+
+def cell_index(score1: int, score2: int, length1: int, length2: int, distance1: int, distance2: int) -> int:
+    score = (min(max(score1 - score2, -SCORE_RANGE), SCORE_RANGE) + SCORE_RANGE) // SCORE_BIN
+    last_length, last_distance = len(_LENGTH_BINS) - 1, len(_DISTANCE_BINS) - 1
+    return ((((score * LENGTHS + _LENGTH_BINS[min(length1, last_length)]) * LENGTHS
+              + _LENGTH_BINS[min(length2, last_length)]) * DISTANCES
+             + _DISTANCE_BINS[min(distance1, last_distance)]) * DISTANCES
+            + _DISTANCE_BINS[min(distance2, last_distance)])
+
+
+def state_cell(state: GameState) -> int:
+    """Cell of a game state (GameEngine.state, or the UI's GameState)."""
+    food_x, food_y = state.food_position
+    (x1, y1), (x2, y2) = state.snake1[0], state.snake2[0]
+    return cell_index(state.score1, state.score2, len(state.snake1), len(state.snake2),
+                      abs(x1 - food_x) + abs(y1 - food_y), abs(x2 - food_x) + abs(y2 - food_y))
+
+
+class WinEstimate(NamedTuple):
+    win1: float
+    win2: float
+    draw: float
+    count: int      # positions behind the estimate
+    level: int      # 0 = exact cell, 1 = without food distances, 2 = score difference only
+
+    @property
+    def expected1(self) -> float:
+        """Expected result of strategy1 (win = 1, draw = 1/2): a leaf value for searches."""
+        return self.win1 + 0.5 * self.draw
+
+    @property
+    def se(self) -> float:
+        """Binomial standard error of win1."""
+        return (self.win1 * (1 - self.win1) / self.count) ** 0.5 if self.count else float('nan')
+
+
+def matchup_name(strategy1: str, strategy2: str) -> str:
+    return f"{strategy1}|{strategy2}"
+
+
+class WinProbabilityTable:
+    """Outcome counts per (match-up, cell); see the module docstring."""
+
+    def __init__(self, matchups: Sequence[str], counts: Optional[np.ndarray] = None, min_count: int = 30):
+        self.matchups = list(matchups)
+        self.index = {name: i for i, name in enumerate(self.matchups)}
+        self.counts = counts if counts is not None else np.zeros((len(self.matchups), 3, CELLS), dtype=np.uint32)
+        self.min_count = min_count
+        self._prepare()
+
+    def _prepare(self) -> None:
+        """Marginal counts of the two backoff levels (the exact level is self.counts)."""
+        shaped = self.counts.reshape((len(self.matchups), 3) + SHAPE).astype(np.int64)
+        no_distance = shaped.sum(axis=(5, 6))
+        self._levels = [
+            self.counts,
+            no_distance.reshape(len(self.matchups), 3, -1),
+            no_distance.sum(axis=(3, 4)).reshape(len(self.matchups), 3, -1),
+        ]
+
+    def add(self, matchup: str, counts: np.ndarray) -> None:
+        self.counts[self.index[matchup]] += counts.astype(np.uint32)
+
+    def lookup_cell(self, matchup: str, cell: int) -> Optional[WinEstimate]:
+        row = self.index.get(matchup)
+        if row is None:
+            return None
+        per_score = LENGTHS * LENGTHS * DISTANCES * DISTANCES
+        for level, key in enumerate((cell, cell // (DISTANCES * DISTANCES), cell // per_score)):
+            wins1, wins2, draws = self._levels[level][row, :, key].tolist()
+            total = wins1 + wins2 + draws
+            if total >= self.min_count or (level == 2 and total):
+                return WinEstimate(wins1 / total, wins2 / total, draws / total, total, level)
+        return None
+
+    def lookup(self, strategy1: str, strategy2: str, score1: int, score2: int, length1: int, length2: int,
+               distance1: int, distance2: int) -> Optional[WinEstimate]:
+        """Outcome probabilities from strategy1's side, or None for an unknown match-up or no data."""
+        return self.lookup_cell(matchup_name(strategy1, strategy2),
+                                cell_index(score1, score2, length1, length2, distance1, distance2))
+
+    def estimate(self, strategy1: str, strategy2: str, state: GameState) -> Optional[WinEstimate]:
+        return self.lookup_cell(matchup_name(strategy1, strategy2), state_cell(state))
+
+    def evaluator(self, strategy1: str, strategy2: str):
+        """Leaf evaluator for searches: GameState -> expected result of strategy1 (0.5 without data)."""
+        row = matchup_name(strategy1, strategy2)
+
+        def evaluate(state: GameState) -> float:
+            estimate = self.lookup_cell(row, state_cell(state))
+            return estimate.expected1 if estimate else 0.5
+        return evaluate
+
+    @property
+    def positions(self) -> int:
+        return int(self.counts.sum())
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, counts=self.counts, matchups=np.array(self.matchups),
+                            shape=np.array(SHAPE), score_bin=SCORE_BIN,
+                            length_edges=np.array(LENGTH_EDGES), distance_edges=np.array(DISTANCE_EDGES))
+
+    @classmethod
+    def load(cls, path: str, min_count: int = 30) -> 'WinProbabilityTable':
+        with np.load(path) as data:
+            if tuple(data['shape']) != SHAPE or int(data['score_bin']) != SCORE_BIN:
+                raise ValueError(f"{path}: table built with another discretization")
+            return cls([str(name) for name in data['matchups']], data['counts'], min_count)
+
+
+def load_table(path: str = DEFAULT_TABLE) -> Optional[WinProbabilityTable]:
+    """The table at `path` if it exists (the UI shows win probabilities only then)."""
+    return WinProbabilityTable.load(path) if os.path.exists(path) else None
+
+
+# --- Construction --------------------------------------------------------------
+
+@dataclass(frozen=True)
+class PositionJob:
+    """Games [start, stop) of one (scenario, match-up), sampled every `every` ticks."""
+    scenario: Scenario
+    strategy1_class: type
+    strategy2_class: type
+    seed: int
+    start: int
+    stop: int
+    every: int = 5
+
+    @property
+    def matchup(self) -> str:
+        return matchup_name(self.strategy1_class.__name__, self.strategy2_class.__name__)
+
+
+def collect_positions(job: PositionJob) -> Tuple[str, int, np.ndarray]:
+    """Play the games of a job; returns (match-up, games, counts shaped (3, CELLS))."""
+    runner = ScenarioSimulationRunner(job.strategy1_class, job.strategy2_class, 1, True,
+                                      seed=job.seed, scenario=job.scenario)
+    counts = np.zeros((3, CELLS), dtype=np.int64)
+    for game_index in range(job.start, job.stop):
+        random.seed(runner.game_seed(game_index))
+        engine = runner.init_engine(None)
+        strategy1, strategy2 = job.strategy1_class(), job.strategy2_class()
+        adjudicator = Adjudicator(engine, (strategy1, strategy2))
+        cells = []
+        while not engine.winner and engine.steps < MAX_STEPS:
+            if engine.steps % job.every == 0:
+                cells.append(state_cell(engine.state))
+            events = engine.step(strategy1.get_next_move(engine.state, 1),
+                                 strategy2.get_next_move(engine.state, 2))
+            if adjudicator.check(events):
+                break
+        counts[OUTCOMES[engine.winner]] += np.bincount(cells, minlength=CELLS)
+    return job.matchup, job.stop - job.start, counts
+
+
+def build_table(scenarios: Sequence[Scenario], strategies: Sequence[type], games: int, seed: int,
+                every: int = 5, block_size: int = 200, processes: Optional[int] = None,
+                table: Optional[WinProbabilityTable] = None, progress: bool = True) -> WinProbabilityTable:
+    """
+    Simulate `games` games per scenario and match-up in a worker pool and
+    count their sampled positions (into `table` if given, to extend it).
+    """
+    from tqdm import tqdm
+
+    matchups = [matchup_name(s1.__name__, s2.__name__) for s1 in strategies for s2 in strategies]
+    if table is None:
+        table = WinProbabilityTable(matchups)
+    # Mêmes seeds que les cellules d'un tournoi : mêmes parties que run_tournament
+    jobs = [PositionJob(scenario, s1, s2, cell_seed(seed, scenario, i, j, False), start,
+                        min(start + block_size, games), every)
+            for scenario in scenarios
+            for i, s1 in enumerate(strategies)
+            for j, s2 in enumerate(strategies)
+            for start in range(0, games, block_size)]
+    with multiprocessing.Pool(processes) as pool, \
+            tqdm(total=len(scenarios) * len(matchups) * games, desc="Positions", unit="game",
+                 disable=not progress) as bar:
+        for matchup, played, counts in pool.imap_unordered(collect_positions, jobs):
+            table.add(matchup, counts)
+            bar.update(played)
+    table._prepare()
+    return table
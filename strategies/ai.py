@@ -117,6 +117,7 @@ class AggressiveAnticipationStrategy(SnakeStrategy):
 
 class NoisyAdaptiveAggressiveStrategy(SnakeStrategy):
     """An aggressive strategy that adapts to the situation with random noise for unpredictability."""
+    SNAPSHOT_FLOATS = ('aggression_level',)
     
     def __init__(self):
         self.movement_history = MovementHistory()
@@ -1,5 +1,6 @@
 # src/strategies/base.py
 from abc import ABC, abstractmethod
+from typing import Sequence, Tuple
 from ..common.enums import Direction
 from ..common.types import GameState
 
@@ -19,3 +20,28 @@ class SnakeStrategy(ABC):
             Direction: The direction to move in
         """
         pass
+
+    # Attributs numériques modifiés en cours de partie (capturés par les snapshots)
+    SNAPSHOT_FLOATS: Tuple[str, ...] = ()
+
+    def state_signature(self) -> tuple:
+        """
+        Internal state that influences the next moves (used to detect repeated
+        positions): the movement history and the SNAPSHOT_FLOATS attributes.
+        """
+        history, values = self.snapshot_state()
+        return history + values
+
+    def snapshot_state(self) -> Tuple[Tuple[Direction, ...], Tuple[float, ...]]:
+        """(movement history, SNAPSHOT_FLOATS values) for simulation.snapshot."""
+        history = getattr(self, 'movement_history', None)
+        return (tuple(history.history) if history is not None else (),
+                tuple(getattr(self, name) for name in self.SNAPSHOT_FLOATS))
+
+    def restore_state(self, history: Sequence[Direction], values: Sequence[float]) -> None:
+        movement_history = getattr(self, 'movement_history', None)
+        if movement_history is not None:
+            movement_history.history.clear()
+            movement_history.history.extend(history)
+        for name, value in zip(self.SNAPSHOT_FLOATS, values):
+            setattr(self, name, value)
@@ -0,0 +1,33 @@
+# src/strategies/registry.py
+"""
+Static strategy registry.
+
+Strategies are listed by hand instead of being discovered with
+inspect.getmembers, so looking one up costs a dict access and importing the
+registry only loads the strategy modules. Add new strategies here.
+"""
+from typing import Dict, Type
+
+from .base import SnakeStrategy
+from .ai import (
+    AggressiveAnticipationStrategy,
+    NoisyAdaptiveAggressiveStrategy,
+    SafeFoodSeekingStrategy,
+    SuperiorAdaptiveStrategy,
+)
+
+# Nom affiché (sans le suffixe Strategy) -> classe, dans l'ordre des menus
+STRATEGIES: Dict[str, Type[SnakeStrategy]] = {
+    'AggressiveAnticipation': AggressiveAnticipationStrategy,
+    'NoisyAdaptiveAggressive': NoisyAdaptiveAggressiveStrategy,
+    'SafeFoodSeeking': SafeFoodSeekingStrategy,
+    'SuperiorAdaptive': SuperiorAdaptiveStrategy,
+}
+
+
+def get_strategy_class(name: str) -> Type[SnakeStrategy]:
+    """Strategy class from its name, with or without the 'Strategy' suffix."""
+    strategy_class = STRATEGIES.get(name[:-len('Strategy')] if name.endswith('Strategy') else name)
+    if strategy_class is None:
+        raise ValueError(f"Stratégie inconnue : {name}")
+    return strategy_class
@@ -0,0 +1,63 @@
+# src/ui/ai_worker.py
+"""
+AI moves computed off the Tk thread.
+
+GameCanvas submits the position of the next tick as soon as the current one
+is applied; a daemon thread runs the strategies while the frame is drawn and
+the tick delay elapses, and puts (generation, tick, directions, seconds) on a
+result queue that the canvas polls from its after() loop. The strategies are
+only ever called from the worker thread, one job after another, so their
+internal history needs no lock.
+"""
+import queue
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+
+from src.common.enums import Direction
+from src.common.types import GameState
+
+
+class AIMove(NamedTuple):
+    generation: int                  # incrémenté à chaque restart : les anciens résultats sont ignorés
+    tick: int
+    direction1: Optional[Direction]  # None : ce joueur n'est pas une IA
+    direction2: Optional[Direction]
+    seconds: float                   # temps passé dans get_next_move
+
+
+class AIWorker:
+    """One background thread computing the next move of strategy1 and/or strategy2."""
+
+    def __init__(self, strategy1: Optional[Any], strategy2: Optional[Any]) -> None:
+        self.strategy1 = strategy1
+        self.strategy2 = strategy2
+        self._jobs: 'queue.Queue[Optional[tuple]]' = queue.Queue()
+        self._results: 'queue.Queue[AIMove]' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='ai-worker', daemon=True)
+        self._thread.start()
+
+    def submit(self, generation: int, tick: int, state: GameState) -> None:
+        """Queue the position of `tick`; `state` must not be mutated afterwards."""
+        self._jobs.put((generation, tick, state))
+
+    def poll(self) -> Optional[AIMove]:
+        """The oldest finished move, or None (never blocks)."""
+        try:
+            return self._results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def stop(self) -> None:
+        self._jobs.put(None)
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            generation, tick, state = job
+            started = time.perf_counter()
+            direction1 = self.strategy1.get_next_move(state, 1) if self.strategy1 else None
+            direction2 = self.strategy2.get_next_move(state, 2) if self.strategy2 else None
+            self._results.put(AIMove(generation, tick, direction1, direction2, time.perf_counter() - started))
@@ -7,10 +7,9 @@ from src.utils.debug import DebugLogger
 from src.common.enums import GameMode, Direction
 from src.common.types import GameState
 from src.common.constants import GameConfig
-#################### A MODIFIER POUR LES SIMULATIONS ####################
-from src.common.constants import CUSTOM_SNAKE1_POSITION, CUSTOM_SNAKE2_POSITION, CUSTOM_SNAKE1_DIRECTION, CUSTOM_SNAKE2_DIRECTION
-from src.common.constants import DEFAULT_SNAKE1_POSITION, DEFAULT_SNAKE2_POSITION, DEFAULT_SNAKE1_DIRECTION, DEFAULT_SNAKE2_DIRECTION
-from src.common.constants import STARTING_SCORE_SNAKE1, STARTING_SCORE_SNAKE2
+from src.common.constants import CASE
+from src.common.scenarios import Scenario, get_scenario
+from src.ui.ai_worker import AIWorker
 
 
 
@@ -23,9 +22,14 @@ class GameCanvas(tk.Canvas):
                  config: GameConfig = None,
                  strategy1: Optional[Any] = None,
                  strategy2: Optional[Any] = None,
-                 debug: Optional[DebugLogger] = None) -> None:
+                 debug: Optional[DebugLogger] = None,
+                 replay: Optional[Any] = None,
+                 scenario: Optional[Scenario] = None,
+                 win_table: Optional[Any] = None,
+                 feed: Optional[Any] = None) -> None:
         # Initialize configuration
         self.config = config or GameConfig()
+        self.scenario = scenario or (replay.scenario if replay is not None else get_scenario(CASE))
         
         # Setup canvas
         super().__init__(
@@ -42,6 +46,20 @@ class GameCanvas(tk.Canvas):
         self.strategy2 = strategy2
         self.debug = debug or DebugLogger(False)
         
+        # Replay settings (GameMode.REPLAY): steps per second, fractional steps carried over
+        self.replay = replay
+        self.replay_speed = 10.0
+        self.replay_credit = 0.0
+        
+        # Partie en direct d'un batch (simulation.spectate) : rejouée à replay_speed
+        self.feed = feed
+        self.feed_hold = None
+        if feed is not None:
+            self.replay_speed = 100.0
+        
+        # Probabilité de victoire en direct (simulation.winprob), si une table est fournie
+        self.win_table = win_table
+        
         # Canvas dimensions
         self.width = self.config.WINDOW_WIDTH
         self.height = self.config.WINDOW_HEIGHT
@@ -53,6 +71,17 @@ class GameCanvas(tk.Canvas):
         self.last_move_time = time.time()
         self.after_id = None
         self.is_paused = False
+        self.status_text = ''
+        self.build_scene()
+        
+        # Coups IA calculés dans un thread (ui.ai_worker) ; temps moyens affichés par l'overlay debug
+        ai_strategies = (strategy1 if mode == GameMode.AI_VS_AI else None, strategy2)
+        self.ai_worker = AIWorker(*ai_strategies) \
+            if replay is None and mode in (GameMode.AI_VS_AI, GameMode.PLAYER_VS_AI) and any(ai_strategies) else None
+        self.ai_generation = 0
+        self.frame_time = 0.0
+        self.ai_time = 0.0
+        self.show_timings = self.debug.debug_enabled
         
         # Initialize game and start updates
         self.init_game_state()
@@ -64,28 +93,41 @@ class GameCanvas(tk.Canvas):
         """Start or restart the game update loop."""
         if self.after_id:
             self.after_cancel(self.after_id)
-        self.after_id = self.after(16, self.update_game)
+        if self.feed is not None:
+            loop = self.update_spectate
+        else:
+            loop = self.update_replay if self.replay is not None else self.update_game
+        self.after_id = self.after(16, loop)
 
     def init_game_state(self) -> None:
         """Initialize or reset the game state."""
         self.game_over = False
         self.winner = None
-        self.score1 = STARTING_SCORE_SNAKE1
-        self.score2 = STARTING_SCORE_SNAKE2
-        #################### A MODIFIER POUR LES SIMULATIONS ####################
-        self.snake1 = CUSTOM_SNAKE1_POSITION.copy()
-        self.snake2 = CUSTOM_SNAKE2_POSITION.copy()
-        self.direction1 = CUSTOM_SNAKE1_DIRECTION
-        self.direction2 = CUSTOM_SNAKE2_DIRECTION
-        self.food_pos = self._place_food()
+        if self.replay is not None:
+            self.replay.seek(0)
+            self.replay_credit = 0.0
+            self.sync_replay()
+            return
+        self.score1 = self.scenario.score1
+        self.score2 = self.scenario.score2
+        self.snake1 = list(self.scenario.snake1)
+        self.snake2 = list(self.scenario.snake2)
+        self.direction1 = self.scenario.direction1
+        self.direction2 = self.scenario.direction2
+        # Première nourriture fixée par le scénario (ex. au centre pour le cas 1), sinon aléatoire
+        self.food_pos = self.scenario.food_position or self._place_food()
         assert self.food_pos is not None, "Erreur critique : self.food_pos est None"
+        self.step_counter = 0
+        if self.ai_worker is not None:
+            self.ai_generation += 1
+            self.request_ai_move()
 
 
     def handle_keypress(self, event: tk.Event) -> None:
         """Handle keyboard input for player controls and game management."""
         key = event.keysym
         
-        if key == 'r':
+        if key == 'r' and self.feed is None:
             self.init_game_state()
             self.step_counter = 0
             self.start_game_loop()
@@ -98,6 +140,15 @@ class GameCanvas(tk.Canvas):
         if key == 'space':
             self.is_paused = not self.is_paused  # Bascule entre pause et reprise
             return
+        if key == 'd':
+            self.show_timings = not self.show_timings
+            return
+        if self.replay is not None:
+            self.handle_replay_key(key)
+            return
+        if self.feed is not None:
+            self.handle_spectate_key(key)
+            return
     
         if not self.game_over and self.mode == GameMode.PLAYER_VS_AI:
             key_to_direction = {
@@ -111,11 +162,101 @@ class GameCanvas(tk.Canvas):
                 if not Direction.opposite(new_dir) == self.direction1:
                     self.direction1 = new_dir
 
+    def handle_replay_key(self, key: str) -> None:
+        """Seek and speed controls of the replay mode."""
+        seek_offsets = {'Left': -1, 'Right': 1, 'Prior': -1000, 'Next': 1000}
+        if key in seek_offsets:
+            self.replay.advance(seek_offsets[key])
+        elif key == 'Home':
+            self.replay.seek(0)
+        elif key == 'End':
+            self.replay.seek(self.replay.n_steps)
+        elif key == 'Up':
+            self.replay_speed = min(self.replay_speed * 2, 64000.0)
+        elif key == 'Down':
+            self.replay_speed = max(self.replay_speed / 2, 0.5)
+        self.sync_replay()
+
+    def sync_replay(self) -> None:
+        """Copy the replay engine state into the attributes used for drawing."""
+        engine = self.replay.engine
+        self.snake1 = list(engine.snake1.body)
+        self.snake2 = list(engine.snake2.body)
+        self.direction1 = engine.snake1.direction
+        self.direction2 = engine.snake2.direction
+        self.food_pos = engine.state.food_position
+        self.score1 = engine.state.score1
+        self.score2 = engine.state.score2
+        self.step_counter = engine.steps
+
+    def update_replay(self) -> None:
+        """Replay loop: advance by elapsed time * speed, draw only the last state (frame skip)."""
+        current_time = time.time()
+        if not self.is_paused and not self.replay.finished:
+            self.replay_credit += (current_time - self.last_move_time) * self.replay_speed
+            steps = int(self.replay_credit)
+            if steps:
+                self.replay_credit -= steps
+                self.replay.advance(steps)
+                self.sync_replay()
+        self.last_move_time = current_time
+        
+        if self.replay.finished:
+            outcome = {1: "Blue wins", 2: "Red wins"}.get(self.replay.winner, "Draw")
+            status = f"Replay: {outcome} after {self.replay.n_steps} steps"
+        else:
+            status = f"Replay step {self.step_counter}/{self.replay.n_steps} | {self.replay_speed:g} steps/s"
+        self.status_text = status
+        self.draw_game()
+        self.after_id = self.after(16, self.update_replay)
+
+    def handle_spectate_key(self, key: str) -> None:
+        if key == 'Up':
+            self.replay_speed = min(self.replay_speed * 2, 64000.0)
+        elif key == 'Down':
+            self.replay_speed = max(self.replay_speed / 2, 0.5)
+        elif key == 'n':
+            self.feed.next_game()
+
+    def update_spectate(self) -> None:
+        """Live batch game: drain the frame queue, play the ticks back at replay_speed."""
+        current_time = time.time()
+        feed = self.feed
+        feed.poll()
+        if not self.is_paused:
+            self.replay_credit += (current_time - self.last_move_time) * self.replay_speed
+            steps = int(self.replay_credit)
+            self.replay_credit -= steps
+            frame = feed.advance(steps)
+            if frame is not None:
+                (self.step_counter, snake1, snake2, self.food_pos, self.score1, self.score2) = frame
+                self.snake1, self.snake2 = list(snake1), list(snake2)
+            if not feed.ticks:
+                self.replay_credit = 0.0   # pas d'accumulation pendant l'attente des frames
+        self.last_move_time = current_time
+        
+        # Partie terminée : on la laisse affichée un instant, puis on en demande une autre
+        if feed.finished:
+            self.feed_hold = self.feed_hold or current_time
+            if current_time - self.feed_hold > 1.5:
+                feed.next_game()
+                self.feed_hold = None
+        if feed.header is None:
+            status = "Waiting for a game from the batch..."
+        else:
+            case, strategy1, strategy2, game_index, _ = feed.header
+            status = f"Live {case}: {strategy1} vs {strategy2}, game {game_index} | step {self.step_counter}"
+            if feed.finished:
+                status += " | " + {1: "Blue wins", 2: "Red wins"}.get(feed.winner, "Draw")
+            else:
+                status += f" | {self.replay_speed:g} steps/s"
+            if feed.dropped:
+                status += f" | {feed.dropped} dropped"
+        self.status_text = status
+        self.draw_game()
+        self.after_id = self.after(16, self.update_spectate)
+
     def _place_food(self) -> Position:
-        # Si la position des serpents correspond au cas spécifique, on place la food au centre
-        if self.snake1 == [(6, 12), (5, 12)] and self.snake2 == [(44, 12), (45, 12)]:
-            return (25, 12)
-        # Sinon comportement normal
         while True:
             x = random.randint(0, self.grid_width - 1)
             y = random.randint(0, self.grid_height - 1)
@@ -145,11 +286,11 @@ class GameCanvas(tk.Canvas):
     def reset_snake(self, snake_id: int) -> None:
         """Reset a snake to its starting position and initial direction."""
         if snake_id == 1:
-            self.snake1 = DEFAULT_SNAKE1_POSITION.copy()
-            self.direction1 = DEFAULT_SNAKE1_DIRECTION
+            self.snake1 = list(self.scenario.reset1)
+            self.direction1 = self.scenario.reset_direction1
         else:
-            self.snake2 = DEFAULT_SNAKE2_POSITION.copy()
-            self.direction2 = DEFAULT_SNAKE2_DIRECTION
+            self.snake2 = list(self.scenario.reset2)
+            self.direction2 = self.scenario.reset_direction2
         
     def check_collisions(self) -> None:
         """Check and handle all types of collisions."""
@@ -181,8 +322,41 @@ class GameCanvas(tk.Canvas):
         if head2 in self.snake1:
             self.reset_snake(2)
 
+    def request_ai_move(self) -> None:
+        """Hand the current position to the AI worker; the move is computed while frames are drawn."""
+        self.ai_worker.submit(self.ai_generation, self.step_counter, GameState(
+            snake1=self.snake1.copy(),
+            snake2=self.snake2.copy(),
+            food_position=self.food_pos,
+            grid_width=self.grid_width,
+            grid_height=self.grid_height,
+            score1=self.score1,
+            score2=self.score2
+        ))
+
+    def receive_ai_move(self) -> bool:
+        """Apply the worker's move for the current tick if it is ready (stale results are dropped)."""
+        while True:
+            move = self.ai_worker.poll()
+            if move is None:
+                return False
+            if move.generation == self.ai_generation and move.tick == self.step_counter:
+                break
+        if move.direction1 is not None:
+            self.direction1 = move.direction1
+        if move.direction2 is not None:
+            self.direction2 = move.direction2
+        self.ai_time = 0.9 * self.ai_time + 0.1 * move.seconds if self.ai_time else move.seconds
+        return True
+
+    def destroy(self) -> None:
+        if self.ai_worker is not None:
+            self.ai_worker.stop()
+        super().destroy()
+
     def update_game(self) -> None:
         """Main game update logic."""
+        frame_started = time.perf_counter()
         current_time = time.time()
         speed_threshold = 0.001 if self.mode == GameMode.SIMULATION else 0.1
         if current_time - self.last_move_time >= speed_threshold:  # Game speed control
@@ -190,22 +364,10 @@ class GameCanvas(tk.Canvas):
                 if self.is_paused:
                     self.after_id = self.after(16, self.update_game)
                     return
-                # Get AI moves
-                if self.mode in [GameMode.AI_VS_AI, GameMode.PLAYER_VS_AI]:
-                    state = GameState(
-                        snake1=self.snake1.copy(),
-                        snake2=self.snake2.copy(),
-                        food_position=self.food_pos,
-                        grid_width=self.grid_width,
-                        grid_height=self.grid_height,
-                        score1=self.score1,
-                        score2=self.score2
-                    )
-                    
-                    if self.mode == GameMode.AI_VS_AI and self.strategy1:
-                        self.direction1 = self.strategy1.get_next_move(state, 1)
-                    if self.strategy2:
-                        self.direction2 = self.strategy2.get_next_move(state, 2)
+                # Get AI moves : coup précalculé par le worker, sinon on réessaie à la frame suivante
+                if self.ai_worker is not None and not self.receive_ai_move():
+                    self.finish_frame(frame_started)
+                    return
 
                 # Move snakes and handle food collection
                 old_len1 = len(self.snake1)
@@ -247,19 +409,120 @@ class GameCanvas(tk.Canvas):
                 
                 self.check_collisions()
                 self.last_move_time = current_time
+                if self.ai_worker is not None and not self.game_over:
+                    self.request_ai_move()
         
+        self.finish_frame(frame_started)
+
+    def finish_frame(self, frame_started: float) -> None:
+        """Draw, measure the Tk-thread time of this frame and schedule the next one."""
+        self.status_text = f"Steps: {self.step_counter}"
         self.draw_game()
-        self.create_text(
-            self.width // 2,
-            self.height - 20,
-            text=f"Steps: {self.step_counter}",
-            fill="white",
-            font=("Arial", 12)
-        )
+        elapsed = time.perf_counter() - frame_started
+        self.frame_time = 0.9 * self.frame_time + 0.1 * elapsed if self.frame_time else elapsed
+        self.draw_timings()
         self.after_id = self.after(16, self.update_game)
 
+    # --- Rendu en mode retenu -------------------------------------------------------
+    # La grille et les items fixes (nourriture, textes, barre de score) sont créés une
+    # seule fois ; chaque frame ne fait que des coords()/itemconfig() sur ce qui a changé.
+    # Les cases de serpent viennent d'un pool de rectangles réutilisés.
+
+    def build_scene(self) -> None:
+        """Create the static grid and the persistent canvas items."""
+        self._item_options: Dict[int, Dict[str, Any]] = {}
+        self._item_coords: Dict[int, Tuple[float, ...]] = {}
+        self._free_cells: List[int] = []
+        self._drawn_cells: Tuple[Dict[Position, int], Dict[Position, int]] = ({}, {})
+        self._drawn_heads: List[Optional[Position]] = [None, None]
+        self._board_hidden = False
+
+        for i in range(0, self.width + 1, self.cell_size):
+            self.create_line(i, 0, i, self.height, fill=self.config.GRID_COLOR, tags=('board', 'grid'))
+        for i in range(0, self.height + 1, self.cell_size):
+            self.create_line(0, i, self.width, i, fill=self.config.GRID_COLOR, tags=('board', 'grid'))
+
+        self._food_item = self.create_oval(0, 0, 0, 0, fill=self.config.FOOD_COLOR, tags='board')
+        self._score_items = (
+            self.create_text(100, 20, text='', fill=self.config.SNAKE1_COLOR,
+                             font=self.config.SCORE_FONT, tags='board'),
+            self.create_text(self.width - 100, 20, text='', fill=self.config.SNAKE2_COLOR,
+                             font=self.config.SCORE_FONT, tags='board'),
+        )
+        self._win_item = self.create_text(self.width // 2, 20, text='', fill=self.config.TEXT_COLOR,
+                                          font=("Arial", 12), tags='board')
+        self._game_over_item = self.create_text(self.width // 2, self.height // 2, text='', fill='white',
+                                                font=('Arial', 24, 'bold'), justify='center', state='hidden')
+        self._status_item = self.create_text(self.width // 2, self.height - 20, text='',
+                                             fill="white", font=("Arial", 12))
+        self._timings_item = self.create_text(10, self.height - 20, text='', anchor='w',
+                                              fill=self.config.TEXT_COLOR, font=("Arial", 10), state='hidden')
+
+        # Barre de score : fond fixe, deux barres redimensionnées
+        bar_y = self.height + 3
+        bar_bottom = bar_y + self.config.SCORE_BAR_HEIGHT - 6
+        self.create_rectangle(50, bar_y, self.width - 50, bar_bottom, fill=self.config.SCORE_BAR_BG)
+        self._bar_items = (
+            self.create_rectangle(50, bar_y, 50, bar_bottom, fill=self.config.SCORE_BAR1_COLOR),
+            self.create_rectangle(self.width - 50, bar_y, self.width - 50, bar_bottom,
+                                  fill=self.config.SCORE_BAR2_COLOR),
+        )
+
+    def _configure(self, item: int, **options: Any) -> None:
+        """itemconfig() limited to the options that changed since the last frame."""
+        last = self._item_options.setdefault(item, {})
+        changed = {key: value for key, value in options.items() if last.get(key) != value}
+        if changed:
+            self.itemconfig(item, **changed)
+            last.update(changed)
+
+    def _move(self, item: int, *coords: float) -> None:
+        if self._item_coords.get(item) != coords:
+            self.coords(item, *coords)
+            self._item_coords[item] = coords
+
+    def _cell_item(self) -> int:
+        """A snake cell rectangle from the pool (created just above the grid if the pool is empty)."""
+        if self._free_cells:
+            return self._free_cells.pop()
+        item = self.create_rectangle(0, 0, 0, 0, outline='')
+        self.tag_raise(item, 'grid')
+        return item
+
+    def _release_cells(self, index: int) -> None:
+        drawn = self._drawn_cells[index]
+        for item in drawn.values():
+            self._configure(item, state='hidden')
+            self._free_cells.append(item)
+        drawn.clear()
+        self._drawn_heads[index] = None
+
+    def draw_snake(self, index: int, body: List[Position], head_color: str, body_color: str) -> None:
+        """Update only the cells that the snake entered or left since the last frame."""
+        drawn = self._drawn_cells[index]
+        cells = set(body)
+        for cell in [cell for cell in drawn if cell not in cells]:
+            item = drawn.pop(cell)
+            self._configure(item, state='hidden')
+            self._free_cells.append(item)
+        size = self.cell_size
+        for cell in cells.difference(drawn):
+            item = self._cell_item()
+            x, y = cell
+            self._move(item, x * size, y * size, (x + 1) * size, (y + 1) * size)
+            self._configure(item, state='normal', fill=body_color)
+            drawn[cell] = item
+        # Tête : l'ancienne repasse en couleur de corps
+        head = body[0] if body else None
+        previous = self._drawn_heads[index]
+        if previous != head and previous in drawn:
+            self._configure(drawn[previous], fill=body_color)
+        if head is not None:
+            self._configure(drawn[head], fill=head_color)
+        self._drawn_heads[index] = head
+
     def draw_score_bar(self) -> None:
-        """Draw the score distribution bar."""
+        """Resize the score distribution bars."""
         bar_height = self.config.SCORE_BAR_HEIGHT - 6
         bar_y = self.height + 3
         total_width = self.width - 100
@@ -269,89 +532,67 @@ class GameCanvas(tk.Canvas):
         score1_width = max(0, min(total_width, (self.score1 / score_span) * total_width))
         score2_width = max(0, min(total_width, (self.score2 / score_span) * total_width))
         
-        # Background bar
-        self.create_rectangle(
-            50, bar_y,
-            50 + total_width, bar_y + bar_height,
-            fill=self.config.SCORE_BAR_BG
-        )
-        
-        # Score bars
-        self.create_rectangle(
-            50, bar_y,
-            50 + score1_width, bar_y + bar_height,
-            fill=self.config.SCORE_BAR1_COLOR
-        )
-        self.create_rectangle(
-            50 + total_width - score2_width, bar_y,
-            50 + total_width, bar_y + bar_height,
-            fill=self.config.SCORE_BAR2_COLOR
-        )
+        self._move(self._bar_items[0], 50, bar_y, 50 + score1_width, bar_y + bar_height)
+        self._move(self._bar_items[1], 50 + total_width - score2_width, bar_y, 50 + total_width, bar_y + bar_height)
+
+    def win_probability(self):
+        """Table estimate for the current position (None without table, strategies or data)."""
+        if self.win_table is None or self.strategy1 is None or self.strategy2 is None:
+            return None
+        state = GameState(snake1=self.snake1, snake2=self.snake2, food_position=self.food_pos,
+                          grid_width=self.grid_width, grid_height=self.grid_height,
+                          score1=self.score1, score2=self.score2)
+        return self.win_table.estimate(self.strategy1.__class__.__name__, self.strategy2.__class__.__name__, state)
+
+    def draw_win_probability(self) -> None:
+        estimate = self.win_probability()
+        text = '' if estimate is None else \
+            f"P(Blue) {estimate.win1:.0%} | P(Red) {estimate.win2:.0%} | n={estimate.count:,}"
+        self._configure(self._win_item, text=text)
+
+    def draw_timings(self) -> None:
+        """Debug overlay ('d'): Tk-thread time per frame and AI time per move, kept apart."""
+        if not self.show_timings:
+            self._configure(self._timings_item, state='hidden')
+            return
+        text = f"frame {self.frame_time * 1000:.1f} ms"
+        if self.ai_worker is not None:
+            text += f" | AI {self.ai_time * 1000:.1f} ms"
+        self._configure(self._timings_item, text=text, state='normal')
 
     def draw_game(self) -> None:
-        """Render the game state."""
-        self.delete('all')
+        """Render the game state (only the items whose content changed are touched)."""
+        self._configure(self._status_item, text=self.status_text)
+        self.draw_score_bar()
             
         if self.game_over:
-            self.create_text(
-                self.width // 2,
-                self.height // 2,
+            if not self._board_hidden:
+                self.itemconfig('board', state='hidden')
+                self._release_cells(0)
+                self._release_cells(1)
+                self._board_hidden = True
+            self._configure(
+                self._game_over_item,
                 text=f"Game Over!\n{self.winner} Wins!\nScore: {max(self.score1, self.score2):,} \nLength: {self.step_counter} \nPress R to restart",
-                fill='white',
-                font=('Arial', 24, 'bold'),
-                justify='center'
+                state='normal'
             )
-            self.draw_score_bar()
             return
+        if self._board_hidden:
+            self.itemconfig('board', state='normal')
+            self._configure(self._game_over_item, state='hidden')
+            self._board_hidden = False
         
-        # Draw grid
-        for i in range(0, self.width + 1, self.cell_size):
-            self.create_line(i, 0, i, self.height, fill=self.config.GRID_COLOR)
-        for i in range(0, self.height + 1, self.cell_size):
-            self.create_line(0, i, self.width, i, fill=self.config.GRID_COLOR)
-        
-        # Draw snakes
-        for snake_positions, head_color, base_color in [
-            (self.snake1, self.config.SNAKE1_COLOR, '#164a29'),
-            (self.snake2, self.config.SNAKE2_COLOR, '#a65602')
-        ]:
-            # Draw body
-            for x, y in snake_positions[1:]:
-                self.create_rectangle(
-                    x * self.cell_size, y * self.cell_size,
-                    (x + 1) * self.cell_size, (y + 1) * self.cell_size,
-                    fill=base_color, outline=''
-                )
-            # Draw head
-            if snake_positions:
-                x, y = snake_positions[0]
-                self.create_rectangle(
-                    x * self.cell_size, y * self.cell_size,
-                    (x + 1) * self.cell_size, (y + 1) * self.cell_size,
-                    fill=head_color, outline=''
-                )
+        self.draw_snake(0, self.snake1, self.config.SNAKE1_COLOR, '#164a29')
+        self.draw_snake(1, self.snake2, self.config.SNAKE2_COLOR, '#a65602')
         
-        # Draw food
         food_x, food_y = self.food_pos
-        self.create_oval(
+        self._move(
+            self._food_item,
             food_x * self.cell_size + 2, food_y * self.cell_size + 2,
-            (food_x + 1) * self.cell_size - 2, (food_y + 1) * self.cell_size - 2,
-            fill=self.config.FOOD_COLOR
+            (food_x + 1) * self.cell_size - 2, (food_y + 1) * self.cell_size - 2
         )
         
-        # Draw scores
-        self.create_text(
-            100, 20,
-            text=f'Blue: {self.score1:,}',
-            fill=self.config.SNAKE1_COLOR,
-            font=self.config.SCORE_FONT
-        )
-        self.create_text(
-            self.width - 100, 20,
-            text=f'Red: {self.score2:,}',
-            fill=self.config.SNAKE2_COLOR,
-            font=self.config.SCORE_FONT
-        )
+        self._configure(self._score_items[0], text=f'Blue: {self.score1:,}')
+        self._configure(self._score_items[1], text=f'Red: {self.score2:,}')
         
-        # Draw score bar
-        self.draw_score_bar()
+        self.draw_win_probability()
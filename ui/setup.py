@@ -1,19 +1,11 @@
 from typing import Tuple, Optional, Dict, Type
-import inspect
 from ..common.enums import GameMode
 from ..strategies.base import SnakeStrategy
-from ..strategies import ai as ai_module
+from ..strategies.registry import STRATEGIES
 
 def get_available_strategies() -> Dict[str, Type[SnakeStrategy]]:
-    strategies = {}
-    for name, obj in inspect.getmembers(ai_module):
-        if (inspect.isclass(obj) 
-            and issubclass(obj, SnakeStrategy) 
-            and obj != SnakeStrategy
-            and obj.__module__ == ai_module.__name__):
-            display_name = name.replace('Strategy', '')
-            strategies[display_name] = obj
-    return strategies
+    # Registre statique : pas d'introspection du module ai au démarrage
+    return dict(STRATEGIES)
 
 def get_strategy_choice(player_num: int) -> SnakeStrategy:
     strategies = get_available_strategies()